@@ -6,7 +6,9 @@ import jellyfish
 import nodesemver
 
 from pakk.args.install_args import InstallArgs
+from pakk.config.main_cfg import MainConfig
 from pakk.config.process import Process
+from pakk.connector.base import FetchPipeline
 from pakk.connector.base import PakkageCollection
 from pakk.helper.cli_util import split_name_version
 from pakk.helper.loader import PakkLoader
@@ -19,7 +21,9 @@ from pakk.module import Module
 from pakk.pakkage.core import Pakkage
 from pakk.pakkage.core import PakkageInstallState
 from pakk.resolver.base import ResolverException
+from pakk.resolver.resolver_conflict_driven import ResolverConflictDriven
 from pakk.resolver.resolver_fitting import ResolverFitting
+from pakk.resolver.snapshot import ResolutionSnapshot
 from pakk.types.base import TypeBase
 
 logger = logging.getLogger(__name__)
@@ -88,6 +92,12 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
     connectors = PakkLoader.get_connector_instances()
     pakkages.discover(connectors, pakkage_names)
 
+    # Skip the resolution and installation if nothing changed since the last run without changes.
+    # The check needs the discovered catalog, since newly released versions must not be skipped.
+    if ResolutionSnapshot.is_unchanged(pakkages, pakkage_names):
+        logger.info("Nothing to install, the discovered and installed pakkages did not change since the last run.")
+        return pakkages.pakkages
+
     # TODO: Handle undiscovered pakkages
 
     for n in pakkage_names:
@@ -114,7 +124,7 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
         if version is None:
             if install_args.upgrade:
                 version = list(p.versions.available.keys())[0]
-                p.versions.target = p.versions.available.get(version, None)
+                p.versions.target = p.versions.get_available(version)
             elif install_args.force_reinstall and p.versions.installed is not None:
                 p.versions.target = p.versions.installed
                 p.versions.reinstall = True
@@ -128,7 +138,7 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
                 available = list(p.versions.available.keys())
                 if len(available) > 0:
                     version = available[0]
-                    p.versions.target = p.versions.available.get(version, None)
+                    p.versions.target = p.versions.get_available(version)
                 elif p.versions.target is not None:
                     p.versions.available[p.versions.target.version] = p.versions.target
             else:
@@ -143,7 +153,7 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
 
                 # if p.versions.installed < p.versions.available.keys()[-1]
         else:
-            p.versions.target = p.versions.available.get(version, None)
+            p.versions.target = p.versions.get_available(version)
             if install_args.force_reinstall:
                 p.versions.reinstall = True
 
@@ -157,7 +167,7 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
 
     # print(pakkages.ids_to_be_installed)
 
-    resolver = ResolverFitting(pakkages)
+    resolver = _get_resolver(pakkages)
     try:
         if not install_args.no_deps:
             resolver.resolve()
@@ -180,17 +190,53 @@ def install(pakkage_names: list[str] | str, **kwargs: str | bool):
 
     installer.uninstall()
 
-    pakkages.fetch(connectors=connectors)
+    if MainConfig.get_config().install.pipelined_fetch.value:
+        # Install the pakkages while the remaining ones are still fetched
+        Process.set_from_pakkages(pakkages)
+        pakkages_installed = installer.install(FetchPipeline(pakkages, connectors).start())
+    else:
+        pakkages.fetch(connectors=connectors)
+
+        # fetcher = FetcherGitlab(pakkages_resolved)
+        # fetcher.fetch()
 
-    # fetcher = FetcherGitlab(pakkages_resolved)
-    # fetcher.fetch()
+        Process.set_from_pakkages(pakkages)
+        pakkages_installed = installer.install()
 
-    Process.set_from_pakkages(pakkages)
-    pakkages_installed = installer.install()
+    _update_snapshot(pakkages, pakkage_names, installer)
 
     return pakkages_installed
 
 
+RESOLVERS: dict[str, type[ResolverFitting]] = {
+    "fitting": ResolverFitting,
+    "conflict-driven": ResolverConflictDriven,
+}
+
+
+def _get_resolver(pakkages: PakkageCollection) -> ResolverFitting:
+    """Create the resolver selected by the install args or the main config."""
+    name = InstallArgs.get().resolver or MainConfig.get_config().install.resolver.value
+    if name not in RESOLVERS:
+        logger.warning(f"Unknown resolver '{name}', using the fitting resolver. Available: {', '.join(RESOLVERS)}")
+        name = "fitting"
+
+    return RESOLVERS[name](pakkages)
+
+
+def _update_snapshot(pakkages: PakkageCollection, pakkage_names: list[str], installer: InstallerCombining):
+    """Store the snapshot of the installed state, so the next installation with the same inputs can be skipped."""
+    if not ResolutionSnapshot.is_applicable():
+        return
+
+    failed = [p for p in installer.pakkages_to_install if p.versions.installed is not p.versions.target]
+    if len(failed) > 0:
+        ResolutionSnapshot.clear()
+        return
+
+    ResolutionSnapshot.save(ResolutionSnapshot.compute_key(pakkages, pakkage_names))
+
+
 if __name__ == "__main__":
     # pakkages_resolved = install("ros2-basic-user-actions", "0.1.1")
     # install("rose-base-dependencies", pakkages=pakkages_resolved)
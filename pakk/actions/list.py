@@ -13,6 +13,7 @@ from pakk.helper.loader import PakkLoader
 from pakk.helper.lockfile import PakkLock
 from pakk.logger import Logger
 from pakk.pakkage.core import PakkageInstallState
+from pakk.pakkage.core import PakkageVersionDescriptor
 
 logger = logging.getLogger(__name__)
 
@@ -48,8 +49,11 @@ def list(**kwargs):
     pakkages_discovered = pakkages.discover(discoverer_list)
 
     # To avoid problems in the type initialization... Maybe there is a better way
+    # (Versions only described by a descriptor are skipped, they get their local path when materialized)
     for pakkage in pakkages_discovered.values():
         for version in pakkage.versions.available.values():
+            if isinstance(version, PakkageVersionDescriptor) and not version.is_materialized:
+                continue
             version.local_path = version.local_path or ""
 
     x = kwargs.get("extended", False)
@@ -108,6 +112,7 @@ def list(**kwargs):
 
         if flag_types and (iv or len(av_list) > 0):
             v = iv or av_list[0]
+            v.local_path = v.local_path or ""
             types = v.pakk_types
             is_startable = v.is_startable()
             type_names = [
@@ -1,20 +1,11 @@
 from __future__ import annotations
 
-import builtins
 import logging
-import os
-import re
-import subprocess
 
-from rich.table import Table
-
-import pakk.config.pakk_config as config
 from pakk.args.base_args import BaseArgs
 from pakk.config.process import Process
-from pakk.discoverer.base import DiscoveredPakkagesMerger
-from pakk.discoverer.discoverer_gitlab import DiscovererGitlabCached
-from pakk.discoverer.discoverer_local import DiscovererLocal
-from pakk.logger import Logger
+from pakk.connector.base import PakkageCollection
+from pakk.connector.local import LocalConnector
 from pakk.types.base import TypeBase
 
 logger = logging.getLogger(__name__)
@@ -26,11 +17,10 @@ def source(**kwargs: dict[str, str]):
 
     TypeBase.initialize()
 
-    local_discoverer = [DiscovererLocal()]
-    discoverer = DiscoveredPakkagesMerger(local_discoverer, quiet=not flag_verbose)
-    pakkages_discovered = discoverer.merge()
+    pakkages = PakkageCollection()
+    pakkages.discover([LocalConnector()], quiet=not flag_verbose)
 
-    Process.set_from_pakkages(pakkages_discovered)
+    Process.set_from_pakkages(pakkages)
     cmd = Process.get_cmd_env_var_setup(use_linebreak=True)
     print(cmd)
     # p = subprocess.run(cmd, shell=True)
@@ -22,3 +22,4 @@ class InstallArgs(BaseArgs):
         self.ignore_installed: bool = bool(kwargs.get("ignore_installed", False))
         self.clear_cache: bool = bool(kwargs.get("clear_cache", False))
         self.repair: bool = bool(kwargs.get("repair", False))
+        self.resolver: str | None = str(kwargs["resolver"]) if kwargs.get("resolver") else None
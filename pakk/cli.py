@@ -89,7 +89,7 @@ def catched_execution(function, *args, **kwargs):
         if kwargs["verbose"]:
             Logger.get_console().print_exception()
         Logger.print_exception_message(e)
-        x = e.get_msg()
+        e.print_msg()
 
         # Logger.get_console().print_exception()
     except SetupRequiredException as e:
@@ -197,6 +197,12 @@ def cli(ctx: Context, **kwargs):
     default=False,
     help="Clear the complete cache before installing. Use if you don't find versions that should be actually available.",
 )
+@click.option(
+    "--resolver",
+    type=click.Choice(["fitting", "conflict-driven"]),
+    default=None,
+    help="Resolver selecting the versions to install. Overrides the resolver of the main config [default: fitting].",
+)
 @click.option("--rebuild-base-images", is_flag=True, default=False, help="Rebuilds the base environment docker images.")
 @click.pass_context
 def install(ctx: Context, **kwargs):
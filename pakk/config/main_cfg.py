@@ -115,6 +115,95 @@ class AutoUpdateConfig(ConfigEntryCollection):
         )
 
 
+class DiscoveryConfig(ConfigEntryCollection):
+    """
+    Helper class to bundle the discovery configuration for pakk.
+    """
+
+    def __init__(self):
+        section = ConfigSection("Pakk.Discovery")
+        self.concurrent = section.ConfirmationOption(
+            option="concurrent",
+            default=True,
+            message="Run the discovery of all connectors concurrently",
+            inquire=False,
+        )
+        """Run the discovery of all connectors concurrently"""
+
+        self.connector_timeout = section.Option(
+            option="connector_timeout",
+            default=300,
+            message="Timeout in seconds for the discovery of a single connector (0 to disable the timeout)",
+            inquire=False,
+            value_getter=float,
+        )
+        """Timeout in seconds for the discovery of a single connector in concurrent mode"""
+
+
+class FetchConfig(ConfigEntryCollection):
+    """
+    Helper class to bundle the fetch configuration for pakk.
+    """
+
+    def __init__(self):
+        section = ConfigSection("Pakk.Fetch")
+        self.use_git_mirrors = section.ConfirmationOption(
+            option="use_git_mirrors",
+            default=True,
+            message="Keep a local mirror of fetched git repositories, so updates only download the changes",
+            inquire=False,
+        )
+        """Keep a local mirror of fetched git repositories, so updates only download the changes"""
+
+        self.git_mirrors_dir = section.Option(
+            option="git_mirrors_dir",
+            default=r"${Pakk.Subdirs:cache_dir}/git_mirrors",
+            message="Directory for the local git mirrors",
+            inquire=False,
+            is_dir=True,
+        )
+        """Directory for the local git mirrors"""
+
+
+class InstallConfig(ConfigEntryCollection):
+    """
+    Helper class to bundle the install configuration for pakk.
+    """
+
+    def __init__(self):
+        section = ConfigSection("Pakk.Install")
+        self.pipelined_fetch = section.ConfirmationOption(
+            option="pipelined_fetch",
+            default=False,
+            message="Start installing fetched pakkages while the remaining pakkages are still fetched",
+            inquire=False,
+        )
+        """Start installing fetched pakkages while the remaining pakkages are still fetched"""
+
+        self.num_install_workers = section.Option(
+            option="num_install_workers",
+            default=1,
+            message="Number of workers installing non-conflicting pakkage types simultaneously",
+            inquire=False,
+            value_getter=int,
+        )
+        """
+        Number of workers installing non-conflicting pakkage types simultaneously.
+        Types sharing a resource (see `TypeBase.EXCLUSIVE_RESOURCES`) never run simultaneously
+        and the environment variables shared by the installations are guarded by a lock.
+        Values above 1 require sudo to run without password prompt,
+        otherwise the prompts of simultaneous installations interleave.
+        """
+
+        self.resolver = section.Option(
+            option="resolver",
+            default="fitting",
+            message="Resolver selecting the versions to install (fitting or conflict-driven)",
+            inquire=False,
+        )
+        """Resolver selecting the versions to install (fitting or conflict-driven)"""
+
+
 class MainConfig(PakkConfigBase):
     NAME = "main.cfg"
 
@@ -127,6 +216,15 @@ class MainConfig(PakkConfigBase):
         self.autoupdate = AutoUpdateConfig()
         """Autoupdate configuration for pakk."""
 
+        self.discovery = DiscoveryConfig()
+        """Discovery configuration for pakk."""
+
+        self.fetch = FetchConfig()
+        """Fetch configuration for pakk."""
+
+        self.install = InstallConfig()
+        """Install configuration for pakk."""
+
         self.pakk_cfg_files = ["pakk.cfg"]
         """
         List of pakkage cfg files.
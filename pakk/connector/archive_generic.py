@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import os
+import tarfile
+from typing import BinaryIO
+from typing import Callable
+
+from pakk.args.install_args import InstallArgs
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.git_generic import GenericGitHelper
+from pakk.helper.file_util import remove_dir
+from pakk.helper.progress import TaskPbar
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageInstallState
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODE_GIT = "git"
+FETCH_MODE_ARCHIVE = "archive"
+
+
+class GenericArchiveHelper:
+    """
+    Fetch pakkage versions as tar.gz archives instead of git checkouts.
+    The archives are stored content-addressed by their commit sha in the cache dir,
+    thus reinstalling or rolling back to an already downloaded version needs no network access.
+    """
+
+    COMMIT_FILE_NAME = "archive_commit"
+    """Name of the file in the .pakk directory of an extracted archive storing the commit sha of the archive."""
+
+    @staticmethod
+    def get_extracted_commit(path: str) -> str | None:
+        """Get the commit sha of the archive extracted into the given path, None if the path is no extracted archive."""
+        commit_path = os.path.join(path, PakkageConfig.PAKK_DIRECTORY_NAME, GenericArchiveHelper.COMMIT_FILE_NAME)
+        try:
+            with open(commit_path, "r") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def get_archive_path(commit: str) -> str:
+        archive_dir = os.path.join(MainConfig.get_config().paths.cache_dir.value, "archives")
+        os.makedirs(archive_dir, exist_ok=True)
+        return os.path.join(archive_dir, f"{commit}.tar.gz")
+
+    @staticmethod
+    def _extract_archive(archive_path: str, path: str):
+        """Extract the archive into the given path, stripping the top-level directory of the archive."""
+        with tarfile.open(archive_path, "r:gz") as tar:
+            members = []
+            for member in tar.getmembers():
+                splits = member.name.split("/", 1)
+                if len(splits) < 2 or splits[1] == "":
+                    continue
+                member.name = splits[1]
+                members.append(member)
+
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(path, members=members, filter="data")
+            else:
+                tar.extractall(path, members=members)
+
+    @staticmethod
+    def fetch_pakkage_version_with_archive(
+        target_version: PakkageConfig,
+        commit: str,
+        download: Callable[[BinaryIO], None],
+        task: TaskPbar | None,
+    ) -> None:
+        """
+        Fetch the pakkage version by extracting the archive of the given commit into the fetch dir.
+
+        Parameters
+        ----------
+        target_version: PakkageConfig
+            The pakkage version to fetch.
+        commit: str
+            The commit sha of the version, used as key of the archive in the cache.
+        download: Callable[[BinaryIO], None]
+            Connector specific function streaming the tar.gz archive of the commit into the given file.
+        task: TaskPbar | None
+            The pbar to display the progress.
+        """
+
+        fetched_dir = MainConfig.get_config().paths.fetch_dir.value
+        path = os.path.join(fetched_dir, target_version.basename)
+
+        if GenericGitHelper.prepare_fetch_dir(path):
+            archive_path = GenericArchiveHelper.get_archive_path(commit)
+            if InstallArgs.get().clear_cache and os.path.exists(archive_path):
+                os.remove(archive_path)
+
+            if not os.path.exists(archive_path):
+                if task is not None:
+                    task.update(pakkage=target_version.id, info=f"Downloading archive of {commit[:8]}")
+
+                # Download to a temporary file first, so no incomplete archives are stored in the cache
+                tmp_path = archive_path + ".part"
+                try:
+                    with open(tmp_path, "wb") as f:
+                        download(f)
+                    os.replace(tmp_path, archive_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            else:
+                logger.debug(f"Using cached archive {archive_path}")
+
+            if task is not None:
+                task.update(pakkage=target_version.id, info="Extracting archive")
+
+            try:
+                GenericArchiveHelper._extract_archive(archive_path, path)
+            except (tarfile.TarError, OSError) as e:
+                # Remove the broken archive, so it is downloaded again with the next fetch
+                remove_dir(path)
+                os.remove(archive_path)
+                raise e
+
+            # Archives contain no git directory, the commit identifies the extracted contents instead (e.g. for caches)
+            pakk_dir = os.path.join(path, PakkageConfig.PAKK_DIRECTORY_NAME)
+            os.makedirs(pakk_dir, exist_ok=True)
+            with open(os.path.join(pakk_dir, GenericArchiveHelper.COMMIT_FILE_NAME), "w") as f:
+                f.write(commit)
+
+        # Load the PakkageConfig from the fetched directory
+        if PakkageConfig.from_directory(path) is None:
+            raise Exception(f"Could not load PakkageConfig from {path}")
+
+        # Set the local_path and the state to fetched (in this order, since the state signals a finished fetch)
+        target_version.local_path = path
+        target_version.state.install_state = PakkageInstallState.FETCHED
+
+        if task is not None:
+            task.update(pakkage="Done", info="")
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import wait
 from typing import Type
 from typing import TypeVar
 
 from pakk.config.base import ConnectorConfiguration
+from pakk.config.main_cfg import MainConfig
+from pakk.helper.progress import release_shared_progress
 from pakk.module import Module
 from pakk.pakkage.core import Pakkage
 from pakk.pakkage.core import PakkageConfig
@@ -179,9 +185,18 @@ class PakkageCollection:
         if not quiet:
             Module.print_rule(f"Discovering pakkages")
 
-        for connector in connectors:
-            discovered_pakkages = connector.discover(pakkage_ids)
-            self.merge(discovered_pakkages)
+        # Connectors are merged by priority, so the first connector that discovers a pakkage is the source of truth
+        connectors = sorted(connectors, key=lambda c: c.PRIORITY)
+
+        discovery_config = MainConfig.get_config().discovery
+        if discovery_config.concurrent.value and len(connectors) > 1:
+            results = self._discover_concurrently(connectors, pakkage_ids, discovery_config.connector_timeout.value)
+        else:
+            results = [self._discover_with_connector(connector, pakkage_ids) for connector in connectors]
+
+        for discovered_pakkages in results:
+            if discovered_pakkages is not None:
+                self.merge(discovered_pakkages)
 
         # Check if all installed versions are also available, otherwise there are problems with reinstalling
         for pakkage in self.pakkages.values():
@@ -196,6 +211,73 @@ class PakkageCollection:
 
         return self
 
+    @staticmethod
+    def _discover_with_connector(connector: Connector, pakkage_ids: list[str] | None) -> PakkageCollection:
+        """Run the discovery of a single connector and log its latency."""
+        start = time.perf_counter()
+        discovered_pakkages = connector.discover(pakkage_ids)
+        logger.debug(
+            f"{connector.__class__.__name__}: discovered {len(discovered_pakkages)} pakkages in {time.perf_counter() - start:.2f}s"
+        )
+        return discovered_pakkages
+
+    @staticmethod
+    def _discover_concurrently(
+        connectors: list[Connector], pakkage_ids: list[str] | None, timeout: float | None
+    ) -> list[PakkageCollection | None]:
+        """
+        Run the discovery of all connectors in parallel threads.
+
+        Parameters
+        ----------
+        connectors : list[Connector]
+            The connectors to discover with, sorted by priority.
+        pakkage_ids : list[str] | None
+            The pakkage ids to discover, see `Connector.discover`.
+        timeout : float | None
+            Timeout in seconds for each connector. If the timeout is exceeded, the results of the connector are ignored.
+            If None or 0, there is no timeout.
+
+        Returns
+        -------
+        list[PakkageCollection | None]
+            The discovered pakkages in the order of the given connectors.
+            None for connectors that failed or exceeded the timeout.
+        """
+        # Every worker only writes its own future, results of timed out connectors are never read
+        futures: list[Future[PakkageCollection]] = [Future() for _ in connectors]
+
+        def discover(connector: Connector, future: Future[PakkageCollection]):
+            try:
+                future.set_result(PakkageCollection._discover_with_connector(connector, pakkage_ids))
+            except Exception as e:
+                future.set_exception(e)
+
+        # Daemon threads, so that a hanging connector does not block the exit of pakk
+        threads = [
+            threading.Thread(target=discover, args=(c, f), name=f"discover-{c.__class__.__name__}", daemon=True)
+            for c, f in zip(connectors, futures)
+        ]
+        for thread in threads:
+            thread.start()
+
+        done, _ = wait(futures, timeout=timeout or None)
+
+        results: list[PakkageCollection | None] = []
+        for connector, future, thread in zip(connectors, futures, threads):
+            if future not in done:
+                logger.warning(
+                    f"{connector.__class__.__name__}: discovery timed out after {timeout}s, skipping its pakkages"
+                )
+                # The abandoned thread must not keep the progress display alive
+                release_shared_progress(thread)
+                results.append(None)
+            else:
+                # Keep the sequential behavior: errors of a connector are not swallowed
+                results.append(future.result())
+
+        return results
+
     def fetch(self, connectors: list[Connector], quiet: bool = False) -> PakkageCollection:
         """
         Fetch pakkages with the given connectors.
@@ -207,6 +289,17 @@ class PakkageCollection:
             Module.print_rule(f"Fetching pakkages")
 
         pakkages_to_fetch = self.pakkages_to_fetch
+        self.fetch_with_connectors(connectors)
+
+        for pakkage in pakkages_to_fetch.values():
+            self.finish_fetch(pakkage)
+
+        logger.info(f"Finished fetching of {len(pakkages_to_fetch)} pakkages.")
+
+        return self
+
+    def fetch_with_connectors(self, connectors: list[Connector]) -> None:
+        """Download the target versions of all pakkages to fetch with the given connectors."""
         configs_to_fetch = self.pakkage_configs_to_fetch
 
         for connector in connectors:
@@ -217,21 +310,117 @@ class PakkageCollection:
                 logger.info(f"{connector.__class__.__name__}: fetching {len(configs)} pakkages")
                 connector.fetch(configs)
 
-        for pakkage in pakkages_to_fetch.values():
-            # If there was an installed version, copy the state
-            if pakkage.versions.target is not None:
-                if pakkage.versions.target.state.install_state == PakkageInstallState.FETCHED:
-                    pakkage.versions.target.state.copy_from(pakkage.versions.installed)
-                    pakkage.versions.target.save_state()
-                else:
-                    logger.error(
-                        f"Target version {pakkage.versions.target.version} of {pakkage.id} has not been fetched properly."
-                    )
+    def finish_fetch(self, pakkage: Pakkage) -> bool:
+        """
+        Finish the fetch of the target version of the given pakkage.
 
-        logger.info(f"Finished fetching of {len(pakkages_to_fetch)} pakkages.")
+        Returns
+        -------
+        bool
+            True if the target version has been fetched properly.
+        """
+        if pakkage.versions.target is None:
+            return False
+
+        # If there was an installed version, copy the state
+        if pakkage.versions.target.state.install_state == PakkageInstallState.FETCHED:
+            pakkage.versions.target.state.copy_from(pakkage.versions.installed)
+            pakkage.versions.target.save_state()
+            return True
+
+        logger.error(f"Target version {pakkage.versions.target.version} of {pakkage.id} has not been fetched properly.")
+        return False
+
+
+class FetchPipeline:
+    """
+    Fetch the pakkages of a collection in a background thread.
+    The installer consumes the finished fetches and starts installing pakkages,
+    whose dependencies are installed, while the remaining pakkages are still downloading.
+    """
 
+    POLL_INTERVAL = 0.2
+    """Interval in seconds to check the fetch state of the pakkages."""
+
+    def __init__(self, pakkages: PakkageCollection, connectors: list[Connector]):
+        self.pakkages = pakkages
+        self.connectors = connectors
+
+        self.pending_ids: set[str] = set(pakkages.pakkages_to_fetch.keys())
+        """Ids of the pakkages that are fetched by the pipeline and not yet consumed."""
+        self.num_pakkages = len(self.pending_ids)
+
+        self._finished = threading.Event()
+        self._exception: Exception | None = None
+        self._thread = threading.Thread(target=self._run, name="pakk-fetch", daemon=True)
+
+    def start(self) -> FetchPipeline:
+        Module.print_rule(f"Fetching and installing pakkages")
+        self._thread.start()
         return self
 
+    def _run(self):
+        try:
+            self.pakkages.fetch_with_connectors(self.connectors)
+        except Exception as e:
+            self._exception = e
+        finally:
+            self._finished.set()
+
+    @property
+    def finished(self) -> bool:
+        """True if all fetches are done."""
+        return self._finished.is_set()
+
+    def _is_fetched(self, pakkage_id: str) -> bool:
+        target = self.pakkages.pakkages[pakkage_id].versions.target
+        return target is not None and target.state.install_state == PakkageInstallState.FETCHED
+
+    def wait_for_fetched(self, block: bool = True) -> tuple[list[Pakkage], list[Pakkage]]:
+        """
+        Get the pending pakkages that finished fetching since the last call.
+
+        Parameters
+        ----------
+        block: bool
+            If True, wait until at least one pending pakkage is finished.
+
+        Returns
+        -------
+        tuple[list[Pakkage], list[Pakkage]]
+            The pakkages fetched properly and the pakkages whose fetch failed.
+        """
+        while True:
+            finished = self.finished
+            fetched_ids = [i for i in self.pending_ids if self._is_fetched(i)]
+            failed_ids = [i for i in self.pending_ids if finished and i not in fetched_ids]
+
+            if len(fetched_ids) > 0 or len(failed_ids) > 0 or len(self.pending_ids) == 0 or not block:
+                break
+            self._finished.wait(FetchPipeline.POLL_INTERVAL)
+
+        if len(failed_ids) > 0 and self._exception is not None:
+            raise self._exception
+
+        self.pending_ids.difference_update(fetched_ids)
+        self.pending_ids.difference_update(failed_ids)
+
+        fetched: list[Pakkage] = []
+        failed: list[Pakkage] = []
+        for pakkage_id in sorted(fetched_ids):
+            pakkage = self.pakkages.pakkages[pakkage_id]
+            (fetched if self.pakkages.finish_fetch(pakkage) else failed).append(pakkage)
+        for pakkage_id in sorted(failed_ids):
+            pakkage = self.pakkages.pakkages[pakkage_id]
+            self.pakkages.finish_fetch(pakkage)
+            failed.append(pakkage)
+
+        if len(self.pending_ids) == 0 and (len(fetched) > 0 or len(failed) > 0):
+            self._thread.join()
+            logger.info(f"Finished fetching of {self.num_pakkages} pakkages.")
+
+        return fetched, failed
+
 
 C = TypeVar("C", bound=ConnectorConfiguration)
 
@@ -303,7 +492,7 @@ class Connector(Module):
     def fetch(self, pakkages_to_fetch: list[PakkageConfig]) -> None:
         """
         Fetch all the packages with the implemented fetcher.
-        The fetch method should set the local_path attribute and the state to FETCHED.
+        The fetch method should set the local_path attribute and then the state to FETCHED.
         """
         logger.error("Fetch method not implemented for %s", self.__class__.__name__)
         raise NotImplementedError()
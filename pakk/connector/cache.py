@@ -1,16 +1,25 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import sqlite3
+import threading
 from datetime import datetime
 
 import pytz
 
 from pakk.args.install_args import InstallArgs
 from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageVersionDescriptor
+
+logger = logging.getLogger(__name__)
 
 CACHING_VERSION = "0.1.0"
 
+CACHE_INDEX_FILE_NAME = "cache.sqlite"
+CACHE_INDEX_SCHEMA_VERSION = 1
+
 
 class CachedRepository:
     def __init__(self):
@@ -100,6 +109,13 @@ class CachedTag:
         self.is_pakk_version = False
         self.cache_version: str = CACHING_VERSION
 
+        self.pakk_id: str = ""
+        """The pakkage id parsed from the pakk config of this tag."""
+        self.pakk_version: str = ""
+        """The pakkage version parsed from the pakk config of this tag."""
+        self.dependencies: dict[str, str] = dict()
+        """The dependencies parsed from the pakk config of this tag."""
+
     def to_json_dict(self):
         return {
             "tag": self.tag,
@@ -132,13 +148,274 @@ class CachedTag:
         except KeyError:
             return None
 
+    def parse_pakk_config(self):
+        """Parse the pakk config string once and store the id, version and dependencies of the tag."""
+        if not self.is_pakk_version:
+            return
+
+        pakk_cfg = self.pakk_config
+        self.pakk_id = pakk_cfg.id
+        self.pakk_version = pakk_cfg.version
+        self.dependencies = pakk_cfg.dependencies
+
     @property
     def pakk_config(self) -> PakkageConfig:
         return PakkageConfig.from_string(self.pakk_config_str)
 
+    @property
+    def version_descriptor(self) -> PakkageVersionDescriptor:
+        """Lightweight descriptor of the pakk version, the pakk config is only parsed if needed."""
+        if self.pakk_id == "":
+            self.parse_pakk_config()
+
+        pakk_config_str = self.pakk_config_str
+        return PakkageVersionDescriptor(
+            self.pakk_id,
+            self.pakk_version,
+            self.dependencies,
+            lambda: PakkageConfig.from_string(pakk_config_str),
+        )
+
     @property
     def version(self) -> str:
         v = self.tag
         if v.startswith("v"):
             v = v[1:]
         return v
+
+
+class CachedListingPage:
+    """
+    A cached page of a paginated api listing (e.g. the repositories of an organization)
+    together with the validators to revalidate the page with a conditional request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        body: str = "[]",
+        next_url: str | None = None,
+    ):
+        self.url: str = url
+        """The url of the page, used as key in the cache."""
+        self.etag: str | None = etag
+        """The ETag header of the last response."""
+        self.last_modified: str | None = last_modified
+        """The Last-Modified header of the last response."""
+        self.body: str = body
+        """The json body of the page."""
+        self.next_url: str | None = next_url
+        """The url of the next page or None if this is the last page."""
+
+    @property
+    def items(self) -> list[dict]:
+        return json.loads(self.body)
+
+    def get_conditional_headers(self) -> dict[str, str]:
+        """Get the headers to revalidate the page, the server answers with 304 Not Modified if the page is unchanged."""
+        headers = dict()
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CacheIndex:
+    """
+    Single-file cache of all repositories of a connector, stored in a SQLite database in the cache directory.
+    Besides the raw pakk config, the parsed id, version and dependencies of every tag are stored,
+    thus the discovery does not need to open one file per repository.
+
+    Existing json cache files (see `CachedRepository.write`) in the cache directory are migrated into the index.
+    """
+
+    def __init__(self, dir_path: str):
+        self.dir_path = dir_path
+        self.path = os.path.join(dir_path, CACHE_INDEX_FILE_NAME)
+
+        os.makedirs(dir_path, exist_ok=True)
+
+        # The connectors update their cache with multiple workers, thus the connection is shared and locked
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        self._init_tables()
+        self._migrate_json_files()
+
+    def _init_tables(self):
+        with self._lock, self._connection as con:
+            schema_version = con.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version != CACHE_INDEX_SCHEMA_VERSION:
+                con.execute("DROP TABLE IF EXISTS tags")
+                con.execute("DROP TABLE IF EXISTS repositories")
+
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS repositories (
+                    key TEXT PRIMARY KEY,
+                    id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    last_activity TEXT NOT NULL
+                )
+                """
+            )
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tags (
+                    repo_key TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    commit_sha TEXT NOT NULL,
+                    last_activity TEXT NOT NULL,
+                    is_pakk_version INTEGER NOT NULL,
+                    pakk_config_str TEXT NOT NULL,
+                    pakk_id TEXT NOT NULL,
+                    pakk_version TEXT NOT NULL,
+                    dependencies TEXT NOT NULL,
+                    PRIMARY KEY (repo_key, tag)
+                )
+                """
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS tags_by_pakk_id ON tags (pakk_id)")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listing_pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body TEXT NOT NULL,
+                    next_url TEXT
+                )
+                """
+            )
+            con.execute(f"PRAGMA user_version = {CACHE_INDEX_SCHEMA_VERSION}")
+
+    def _migrate_json_files(self):
+        """Move the repositories of the old per-repository json cache files into the index."""
+        json_files = [f for f in os.listdir(self.dir_path) if f.endswith(".json")]
+        if len(json_files) == 0:
+            return
+
+        logger.info(f"Migrating {len(json_files)} cache files in {self.dir_path} to {CACHE_INDEX_FILE_NAME}")
+        for file in json_files:
+            file_path = os.path.join(self.dir_path, file)
+            try:
+                repo = CachedRepository.from_file(file_path)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping migration of invalid cache file {file_path}: {e}")
+                repo = None
+
+            if repo is not None:
+                self.put(file[: -len(".json")], repo)
+
+            os.remove(file_path)
+
+    @staticmethod
+    def _to_datetime(s: str) -> datetime:
+        dt = datetime.fromisoformat(s)
+        if dt.tzinfo is None:
+            dt = pytz.utc.localize(dt)
+        return dt
+
+    def _tag_from_row(self, row: tuple) -> CachedTag:
+        tag = CachedTag()
+        (
+            tag.tag,
+            tag.commit,
+            last_activity,
+            is_pakk_version,
+            tag.pakk_config_str,
+            tag.pakk_id,
+            tag.pakk_version,
+            dependencies,
+        ) = row
+        tag.last_activity = self._to_datetime(last_activity)
+        tag.is_pakk_version = bool(is_pakk_version)
+        tag.dependencies = json.loads(dependencies)
+        return tag
+
+    def _repo_from_row(self, row: tuple) -> CachedRepository:
+        repo = CachedRepository()
+        key, repo.id, repo.url, last_activity = row
+        repo.last_activity = self._to_datetime(last_activity)
+
+        tag_rows = self._connection.execute(
+            "SELECT tag, commit_sha, last_activity, is_pakk_version, pakk_config_str, pakk_id, pakk_version, dependencies "
+            "FROM tags WHERE repo_key = ?",
+            (key,),
+        ).fetchall()
+        tags = [self._tag_from_row(tag_row) for tag_row in tag_rows]
+        repo.tags = {tag.tag: tag for tag in tags}
+        return repo
+
+    def get(self, key: str) -> CachedRepository | None:
+        """Get the cached repository stored with the given key."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT key, id, url, last_activity FROM repositories WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._repo_from_row(row)
+
+    def get_all(self) -> list[CachedRepository]:
+        """Get all cached repositories."""
+        with self._lock:
+            rows = self._connection.execute("SELECT key, id, url, last_activity FROM repositories").fetchall()
+            return [self._repo_from_row(row) for row in rows]
+
+    def put(self, key: str, repo: CachedRepository):
+        """Store the cached repository with the given key, replacing an existing entry."""
+        tag_rows = []
+        for tag in repo.tags.values():
+            if tag.is_pakk_version and tag.pakk_id == "":
+                tag.parse_pakk_config()
+
+            tag_rows.append(
+                (
+                    key,
+                    tag.tag,
+                    tag.commit,
+                    tag.last_activity.isoformat(),
+                    int(tag.is_pakk_version),
+                    tag.pakk_config_str,
+                    tag.pakk_id,
+                    tag.pakk_version,
+                    json.dumps(tag.dependencies),
+                )
+            )
+
+        with self._lock, self._connection as con:
+            con.execute(
+                "INSERT OR REPLACE INTO repositories (key, id, url, last_activity) VALUES (?, ?, ?, ?)",
+                (key, str(repo.id), repo.url, repo.last_activity.isoformat()),
+            )
+            con.execute("DELETE FROM tags WHERE repo_key = ?", (key,))
+            con.executemany("INSERT INTO tags VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", tag_rows)
+
+    def get_listing_page(self, url: str) -> CachedListingPage | None:
+        """Get the cached listing page with the given url."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, etag, last_modified, body, next_url FROM listing_pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedListingPage(*row)
+
+    def put_listing_page(self, page: CachedListingPage):
+        """Store the listing page, replacing an existing entry with the same url."""
+        with self._lock, self._connection as con:
+            con.execute(
+                "INSERT OR REPLACE INTO listing_pages (url, etag, last_modified, body, next_url) VALUES (?, ?, ?, ?, ?)",
+                (page.url, page.etag, page.last_modified, page.body, page.next_url),
+            )
+
+    def clear(self):
+        """Remove all cached repositories and listing pages."""
+        with self._lock, self._connection as con:
+            con.execute("DELETE FROM tags")
+            con.execute("DELETE FROM repositories")
+            con.execute("DELETE FROM listing_pages")
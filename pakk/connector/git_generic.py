@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import subprocess
+import threading
 
 from pakk.args.install_args import InstallArgs
 from pakk.config.main_cfg import MainConfig
@@ -15,16 +17,102 @@ logger = logging.getLogger(__name__)
 
 
 class GenericGitHelper:
+
+    _mirror_locks: dict[str, threading.Lock] = dict()
+    """Locks for the local git mirrors, since multiple fetcher threads can fetch versions of the same repository."""
+    _mirror_locks_lock = threading.Lock()
+
     @staticmethod
-    def fetch_pakkage_version_with_git(
-        target_version: PakkageConfig, url: str, branch: str, task: TaskPbar | None
-    ) -> None:
+    def _run_git_command(cmd: str, cwd: str, target_version: PakkageConfig, task: TaskPbar | None) -> int:
+        """Run the git command and print its output in the pbar of the task. Returns the return code."""
+        with subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            universal_newlines=True,
+        ) as p:
+
+            # Capture the output of the subprocess to print the info in the pbar
+            if p.stdout is not None:
+                for line in p.stdout:
+                    if task is not None:
+                        task.update(pakkage=target_version.id, info=line.strip().replace("\r", ""))
+                    # self._pbar_progress.update(pbar, pakkage=target_version.id, info=line.strip().replace("\r", ""))
+
+        return p.returncode
 
-        # Get the destination path
-        fetched_dir = MainConfig.get_config().paths.fetch_dir.value
+    @staticmethod
+    def get_mirror_path(url: str) -> str:
+        """
+        Get the path of the local bare mirror for the repository url.
+        Credentials in the url are not part of the path.
+        """
+        mirrors_dir = MainConfig.get_config().fetch.git_mirrors_dir.value
+        name = re.sub(r"^[a-z+]+://([^@/]*@)?", "", url)
+        name = re.sub(r"\.git$", "", name)
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", name)
+        return os.path.join(mirrors_dir, name + ".git")
+
+    @staticmethod
+    def _get_mirror_lock(mirror_path: str) -> threading.Lock:
+        with GenericGitHelper._mirror_locks_lock:
+            if mirror_path not in GenericGitHelper._mirror_locks:
+                GenericGitHelper._mirror_locks[mirror_path] = threading.Lock()
+            return GenericGitHelper._mirror_locks[mirror_path]
+
+    @staticmethod
+    def _clone_from_mirror(
+        target_version: PakkageConfig, url: str, branch: str, fetched_dir: str, task: TaskPbar | None
+    ) -> bool:
+        """
+        Fetch the tag into the local bare mirror of the repository and clone it from there into the fetch dir.
+        Since the mirror already contains the objects of previously fetched versions, only the changes are downloaded.
+        Returns True if the clone was successful.
+        """
         name = target_version.basename
-        path = os.path.join(fetched_dir, name)
+        mirror_path = GenericGitHelper.get_mirror_path(url)
+
+        with GenericGitHelper._get_mirror_lock(mirror_path):
+            if not os.path.exists(os.path.join(mirror_path, "HEAD")):
+                os.makedirs(mirror_path, exist_ok=True)
+                if GenericGitHelper._run_git_command("git init --bare --quiet", mirror_path, target_version, task) != 0:
+                    return False
+
+            # The url is only given as argument and not stored as remote, so no credentials are written to the mirror.
+            # We don't need git history, so we use --depth=1. Objects already in the mirror are not downloaded again.
+            cmd = f"git fetch --depth=1 --force --progress {url} refs/tags/{branch}:refs/tags/{branch}"
+            if GenericGitHelper._run_git_command(cmd, mirror_path, target_version, task) != 0:
+                logger.debug(f"Fetching {branch} into mirror {mirror_path} failed")
+                return False
+
+        # Clone from the local mirror, no network traffic needed anymore
+        cmd = f"git clone -c advice.detachedHead=false --depth=1 --branch {branch} file://{mirror_path} {name} --progress"
+        if GenericGitHelper._run_git_command(cmd, fetched_dir, target_version, task) != 0:
+            return False
+
+        # Let the origin point to the actual remote repository again
+        cmd = f"git remote set-url origin {url}"
+        return GenericGitHelper._run_git_command(cmd, os.path.join(fetched_dir, name), target_version, task) == 0
 
+    @staticmethod
+    def prepare_fetch_dir(path: str) -> bool:
+        """
+        Prepare the fetch directory of a pakkage version.
+        Existing directories are removed if a refetch is requested or if they are empty.
+
+        Parameters
+        ----------
+        path: str
+            The path of the pakkage version in the fetch dir.
+
+        Returns
+        -------
+        bool
+            True if the version needs to be fetched, False if the existing directory can be used.
+        """
         args = InstallArgs.get()
 
         fetch = True
@@ -45,6 +133,29 @@ class GenericGitHelper:
                         fetch = False
                         logger.debug(f"Directory {path} already exists. Skipping fetch and using local version.")
 
+        return fetch
+
+    @staticmethod
+    def fetch_pakkage_version_with_git(
+        target_version: PakkageConfig, url: str, branch: str, task: TaskPbar | None
+    ) -> None:
+
+        # Get the destination path
+        fetched_dir = MainConfig.get_config().paths.fetch_dir.value
+        name = target_version.basename
+        path = os.path.join(fetched_dir, name)
+
+        fetch = GenericGitHelper.prepare_fetch_dir(path)
+
+        if fetch and MainConfig.get_config().fetch.use_git_mirrors.value:
+            if GenericGitHelper._clone_from_mirror(target_version, url, branch, fetched_dir, task):
+                fetch = PakkageConfig.from_directory(path) is None
+            else:
+                logger.warning(f"Fetch of {target_version.id} via local mirror failed. Cloning directly...")
+
+            if fetch and os.path.exists(path):
+                remove_dir(path)
+
         if fetch:
             os.makedirs(path, exist_ok=True)
 
@@ -57,22 +168,7 @@ class GenericGitHelper:
             tries = 0
 
             while tries < retry_count:
-                with subprocess.Popen(
-                    cmd,
-                    cwd=fetched_dir,
-                    shell=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    bufsize=1,
-                    universal_newlines=True,
-                ) as p:
-
-                    # Capture the output of the subprocess to print the info in the pbar
-                    if p.stdout is not None:
-                        for line in p.stdout:
-                            if task is not None:
-                                task.update(pakkage=target_version.id, info=line.strip().replace("\r", ""))
-                            # self._pbar_progress.update(pbar, pakkage=target_version.id, info=line.strip().replace("\r", ""))
+                GenericGitHelper._run_git_command(cmd, fetched_dir, target_version, task)
 
                 if PakkageConfig.from_directory(path):
                     break
@@ -85,9 +181,9 @@ class GenericGitHelper:
         if PakkageConfig.from_directory(path) is None:
             raise Exception(f"Could not load PakkageConfig from {path}")
 
-        # Set the state to fetched and the local_path
-        target_version.state.install_state = PakkageInstallState.FETCHED
+        # Set the local_path and the state to fetched (in this order, since the state signals a finished fetch)
         target_version.local_path = path
+        target_version.state.install_state = PakkageInstallState.FETCHED
 
         if task is not None:
             task.update(pakkage="Done", info="")
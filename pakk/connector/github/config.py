@@ -62,6 +62,12 @@ class GithubConfig(ConnectorConfiguration):
             value_getter=int,
             long_instruction="If num_workers is > 1, the fetcher will use multithreading",
         )
+        self.fetch_mode = self.github_section.Option(
+            "fetch_mode",
+            "git",
+            "How to fetch pakkages: 'git' for a git checkout or 'archive' for the tag archive without git history",
+            inquire=False,
+        )
 
     def is_enabled(self) -> bool:
         return self.enabled.value
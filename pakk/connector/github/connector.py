@@ -1,25 +1,37 @@
 from __future__ import annotations
 
+import json
 import logging
-import os
 import re
+import time
+from typing import BinaryIO
 
 import pytz
+import requests
 from github import Github
 from github.ContentFile import ContentFile
 from github.GithubException import BadCredentialsException
+from github.GithubException import GithubException
+from github.GithubException import UnknownObjectException
 from github.Organization import Organization
 from github.PaginatedList import PaginatedList
 from github.Repository import Repository
 
 from pakk.args.install_args import InstallArgs
 from pakk.config.main_cfg import MainConfig
+from pakk.connector.archive_generic import FETCH_MODE_ARCHIVE
+from pakk.connector.archive_generic import GenericArchiveHelper
 from pakk.connector.base import Connector
 from pakk.connector.base import PakkageCollection
+from pakk.connector.cache import CachedListingPage
+from pakk.connector.cache import CacheIndex
 from pakk.connector.cache import CachedRepository
 from pakk.connector.cache import CachedTag
 from pakk.connector.git_generic import GenericGitHelper
 from pakk.connector.github.config import GithubConfig
+from pakk.connector.rate_limit import RateLimitQuota
+from pakk.connector.rate_limit import RateLimitScheduler
+from pakk.helper.http import get_pool_size
 from pakk.helper.progress import ProgressManager
 from pakk.helper.progress import TaskPbar
 from pakk.helper.progress import execute_process_and_display_progress
@@ -41,7 +53,19 @@ class GithubConnector(Connector):
         self._token = self.config.private_token.value
 
         # TODO: Catch connection exceptions
-        self._github = Github(self._token)
+        self._github = self._create_github(self._token)
+        self._cache_index: CacheIndex | None = None
+
+    def _create_github(self, token: str | None) -> Github:
+        """
+        Create the GitHub api client.
+        The discover and fetch workers share the keep-alive connection pool of the client,
+        which has a connection for each of them.
+        """
+        pool_size = get_pool_size(
+            int(self.config.num_discover_workers.value), int(self.config.num_fetcher_workers.value)
+        )
+        return Github(token, timeout=int(self.config._timeout.value), pool_size=pool_size)
 
     def get_organization(self, name: str) -> Organization:
         return self._github.get_organization(name)
@@ -49,22 +73,80 @@ class GithubConnector(Connector):
     def get_repos_of_organization(self, organization: Organization) -> PaginatedList[Repository]:
         return organization.get_repos()
 
+    def get_repos_of_organization_conditional(self, org_name: str) -> list[Repository]:
+        """
+        List all repositories of an organization, revalidating the cached listing pages with conditional requests.
+        Unchanged pages are answered with 304 Not Modified by GitHub, which does not count against the rate limit.
+
+        Parameters
+        ----------
+        org_name: str
+            The name of the organization.
+
+        Returns
+        -------
+        list[Repository]
+            All repositories of the organization.
+        """
+        repos: list[Repository] = []
+        url: str | None = f"/orgs/{org_name}/repos?per_page=100"
+        while url is not None:
+            cached_page = None if InstallArgs.get().clear_cache else self.cache_index.get_listing_page(url)
+            request_headers = cached_page.get_conditional_headers() if cached_page is not None else None
+
+            headers, data = self._github.requester.requestJsonAndCheck("GET", url, headers=request_headers)
+            if data is None and cached_page is not None:
+                # 304 Not Modified, the response has no body
+                logger.debug(f"Listing page {url} not modified")
+                page = cached_page
+            else:
+                page = CachedListingPage(
+                    url,
+                    etag=headers.get("etag"),
+                    last_modified=headers.get("last-modified"),
+                    body=json.dumps(data or []),
+                    next_url=self.get_next_page_url(headers.get("link")),
+                )
+                self.cache_index.put_listing_page(page)
+
+            repos.extend(self._github.create_from_raw_data(Repository, raw_repo) for raw_repo in page.items)
+            url = page.next_url
+
+        return repos
+
+    @staticmethod
+    def get_next_page_url(link_header: str | None) -> str | None:
+        """Get the url of the next page from the Link header of a paginated GitHub response."""
+        if link_header is None:
+            return None
+
+        for link in link_header.split(","):
+            match = re.match(r'\s*<([^>]+)>;\s*rel="next"', link)
+            if match is not None:
+                return match.group(1)
+
+        return None
+
     def get_repo(self, name: str) -> Repository:
         return self._github.get_repo(name)
 
     def get_cache_dir_path(self):
         return self.config.cache_dir.value
 
-    def get_repo_cache_file_path(self, repo: Repository) -> str:
-        name = repo.full_name.replace("/", "_")
-        return os.path.join(self.get_cache_dir_path(), name + ".json")
+    @property
+    def cache_index(self) -> CacheIndex:
+        if self._cache_index is None:
+            self._cache_index = CacheIndex(self.get_cache_dir_path())
+        return self._cache_index
+
+    def get_repo_cache_key(self, repo: Repository) -> str:
+        return repo.full_name.replace("/", "_")
 
     def _get_cached_repo(
         self, repo: Repository, existing_cached_repo: CachedRepository | None = None
     ) -> CachedRepository:
 
         cached_repo = existing_cached_repo or CachedRepository()
-        pakk_cfg_file_name = MainConfig.get_config().pakk_cfg_files[0]
 
         cached_repo.id = repo.full_name
         cached_repo.url = repo.clone_url
@@ -80,33 +162,90 @@ class GithubConnector(Connector):
             if commit is None:
                 continue
 
-            # Check if the tag is a pakk version
-            pakk_config_str = ""
-            is_pakk_version = False
-            try:
-                # Get root directory contents
-                contents: list[ContentFile] = repo.get_contents("", ref=tag.name)  # type: ignore
-                file_exists = any(file.path == pakk_cfg_file_name for file in contents)
-                if file_exists:
-                    file_content: ContentFile = repo.get_contents(pakk_cfg_file_name, ref=tag.name)  # type: ignore
-                    pakk_config_str = file_content.decoded_content.decode("utf-8")
-                    is_pakk_version = True
-
-                logger.debug(f"\t Added {tag.name} (pakk version: {is_pakk_version})")
-            except Exception as e:
-                logger.warning(f"Error checking file presence in tag {tag.name} of repo {repo.name}: {str(e)}")
+            # Check if the tag is a pakk version.
+            # Errors are raised, so the repo is retried instead of caching the tag as non-pakk version.
+            pakk_config_str = self._get_pakk_file_content(repo, tag.name)
+            is_pakk_version = pakk_config_str is not None
+            logger.debug(f"\t Added {tag.name} (pakk version: {is_pakk_version})")
 
             cached_tag = CachedTag()
             cached_tag.tag = tag.name
             cached_tag.commit = commit.sha
-            cached_tag.last_activity = tag.commit.commit.committer.date
-            cached_tag.pakk_config_str = pakk_config_str
+            # Use the last push of the repo instead of the commit date, since accessing
+            # tag.commit.commit lazily requests every single commit from the api
+            cached_tag.last_activity = repo.pushed_at
+            cached_tag.pakk_config_str = pakk_config_str or ""
             cached_tag.is_pakk_version = is_pakk_version
 
+            # Tags without pakk configuration are cached as well, so they are never checked again
             cached_repo.tags[tag.name] = cached_tag
 
         return cached_repo
 
+    @staticmethod
+    def _get_pakk_file_content(repo: Repository, ref: str) -> str | None:
+        """
+        Get the content of the pakk configuration file at the given ref with a single contents request.
+
+        Parameters
+        ----------
+        repo: Repository
+            The repository to load the file from.
+        ref: str
+            The tag, branch or commit to load the file from.
+
+        Returns
+        -------
+        str | None
+            The content of the pakk configuration file or None if the ref contains no pakk configuration file.
+        """
+        for pakk_file in MainConfig.get_config().pakk_cfg_files:
+            try:
+                file_content = repo.get_contents(pakk_file, ref=ref)
+            except UnknownObjectException:
+                # 404: The file does not exist at this ref
+                continue
+
+            # A directory with the name of the pakk file is not a pakk configuration
+            if isinstance(file_content, ContentFile):
+                return file_content.decoded_content.decode("utf-8")
+
+        return None
+
+    def _get_rate_limit_quota(self) -> RateLimitQuota | None:
+        """Get the rate limit quota from the headers of the last response."""
+        requester = self._github.requester
+        remaining, limit = requester.rate_limiting
+        if remaining < 0:
+            return None
+        return RateLimitQuota(remaining, limit, max(0, requester.rate_limiting_resettime - time.time()))
+
+    @staticmethod
+    def _get_transient_error_delay(e: Exception) -> float | None:
+        """
+        Check if the exception is a transient error, that should be retried.
+        Returns the delay requested by GitHub, 0 for an exponential backoff or None if the error is not transient.
+        """
+        if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            return 0
+
+        if not isinstance(e, GithubException):
+            return None
+
+        if e.status in (500, 502, 503, 504):
+            return 0
+
+        # Primary and secondary rate limits
+        if e.status == 429 or (e.status == 403 and "rate limit" in str(e).lower()):
+            headers = e.headers or {}
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+            if "x-ratelimit-reset" in headers and headers.get("x-ratelimit-remaining") == "0":
+                return max(0, float(headers["x-ratelimit-reset"]) - time.time())
+            return 0
+
+        return None
+
     def _update_cache(self, pakkage_ids: list[str] | None = None):
         """Helper method to update the cached projects"""
 
@@ -133,20 +272,23 @@ class GithubConnector(Connector):
         logger.info(f"Updating GitHub cache...")
 
         for org_name in org_names:
-            # Find the organization
+            # List all repos in the organization
             logger.debug(f"Updating cache for organization '{org_name}':")
-            org = self._github.get_organization(org_name)
+            repos = self.get_repos_of_organization_conditional(org_name)
 
-            # # List all repos in the organization
-            # for repo in org.get_repos():
+            scheduler = RateLimitScheduler(
+                int(self.config.num_discover_workers.value),
+                self._get_transient_error_delay,
+                self._get_rate_limit_quota,
+            )
 
             def process_repo(repo: Repository):
                 # Load the cached repository
-                cache_file_path = self.get_repo_cache_file_path(repo)
+                cache_key = self.get_repo_cache_key(repo)
                 if InstallArgs.get().clear_cache:
                     cache_file = None
                 else:
-                    cache_file = CachedRepository.from_file(cache_file_path)
+                    cache_file = self.cache_index.get(cache_key)
 
                 repo_dt = repo.pushed_at
                 if repo_dt.tzinfo is None:
@@ -159,18 +301,23 @@ class GithubConnector(Connector):
 
                 logger.debug(f"Updating cache for repo {repo.name}")
 
-                cache_file = self._get_cached_repo(repo, cache_file)
-                cache_file.write(cache_file_path)
+                try:
+                    cache_file = scheduler.execute(self._get_cached_repo, repo, cache_file)
+                except BadCredentialsException as e:
+                    raise e
+                except (GithubException, requests.RequestException) as e:
+                    # Don't cache the repo, so it is updated again with the next update
+                    logger.warning(f"Failed to update cache for repo {repo.name}: {str(e)}")
+                    return
 
-            n_public = org.total_private_repos or 0
-            n_private = org.public_repos or 0
+                self.cache_index.put(cache_key, cache_file)
 
             execute_process_and_display_progress(
-                items=org.get_repos(),
+                items=repos,
                 item_processing_callback=process_repo,
-                num_workers=int(self.config.num_discover_workers.value),
-                item_count=n_public + n_private,
+                num_workers=scheduler.max_workers,
                 message=f"Updating github cache for {org_name}",
+                status_getter=lambda: scheduler.description,
             )
 
     def discover(self, pakkage_ids: list[str] | None) -> PakkageCollection:
@@ -181,10 +328,10 @@ class GithubConnector(Connector):
             self._update_cache(pakkage_ids)
         except BadCredentialsException as e:
             logger.warning("Github Token is invalid. Only taking public repositories into account.")
-            self._github = Github()
+            self._github = self._create_github(None)
             self._update_cache(pakkage_ids)
 
-        repos = CachedRepository.from_directory(self.get_cache_dir_path())
+        repos = self.cache_index.get_all()
 
         n_repos, n_tags, n_pakk = 0, 0, 0
 
@@ -198,15 +345,15 @@ class GithubConnector(Connector):
 
                 n_pakk += 1
 
-                pakk_cfg = tag.pakk_config
+                pakk_version = tag.version_descriptor
                 # Set attributes for the fetch process
                 attr = ConnectorAttributes()
                 attr.url = repo.url
                 attr.branch = tag.tag
                 attr.commit = tag.commit
-                pakk_cfg.set_attributes(self, attr)
+                pakk_version.set_attributes(self, attr)
 
-                pakkage_versions.available[tag.version] = pakk_cfg
+                pakkage_versions.available[tag.version] = pakk_version
 
             if len(pakkage_versions.available) == 0:
                 continue
@@ -256,6 +403,34 @@ class GithubConnector(Connector):
         http = re.sub(r"https+://", "", http_url_to_repo)
         return f"https://oauth2:{token}@{http}"
 
+    def download_archive(self, url: str, commit: str, file: BinaryIO):
+        """
+        Stream the tar.gz archive of the commit of the repository with the given clone url into the file.
+
+        Parameters
+        ----------
+        url: str
+            The clone url of the repository, e.g. https://github.com/icampus-wildau/pakk.git
+        commit: str
+            The commit sha to download.
+        file: BinaryIO
+            The file to write the archive to.
+        """
+        full_name = re.sub(r"\.git$", "", re.sub(r"https?://[^/]+/", "", url))
+        headers = {"Accept": "application/vnd.github+json"}
+        if self._token:
+            headers["Authorization"] = f"token {self._token}"
+
+        with requests.get(
+            f"https://api.github.com/repos/{full_name}/tarball/{commit}",
+            headers=headers,
+            stream=True,
+            timeout=int(self.config._timeout.value),
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                file.write(chunk)
+
     def checkout_version(self, target_version: PakkageConfig, task: TaskPbar) -> None:
 
         # Check if gitlab attributes are set
@@ -273,6 +448,18 @@ class GithubConnector(Connector):
             # return target_version
             return
 
+        if self.config.fetch_mode.value == FETCH_MODE_ARCHIVE and attr.commit is not None:
+            try:
+                GenericArchiveHelper.fetch_pakkage_version_with_archive(
+                    target_version,
+                    attr.commit,
+                    lambda f: self.download_archive(url, attr.commit, f),  # type: ignore
+                    task,
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Fetching archive of {target_version.id} failed, falling back to git: {e}")
+
         # Get the url to download the repository
         url_with_token = self.get_github_http_with_token(url)
 
@@ -54,6 +54,12 @@ class GitlabConfig(ConnectorConfiguration):
             value_getter=int,
             long_instruction="If num_workers is > 1, the fetcher will use multithreading",
         )
+        self.fetch_mode = section_connector.Option(
+            "fetch_mode",
+            "git",
+            "How to fetch pakkages: 'git' for a git checkout or 'archive' for the tag archive without git history",
+            inquire=False,
+        )
 
         self.cache_dir = section_connector.Option(
             "cache_dir",
@@ -1,26 +1,37 @@
 from __future__ import annotations
 
-import base64
 import inspect
+import json
 import logging
-import os
 import re
 from datetime import datetime
+from typing import BinaryIO
 
 import gitlab
 import gitlab.v4.objects as gl_objects
 import pytz
+import requests
 from gitlab.exceptions import GitlabAuthenticationError
+from gitlab.exceptions import GitlabError
+from gitlab.exceptions import GitlabGetError
+from gitlab.exceptions import GitlabHttpError
 from requests import ConnectTimeout
 
 from pakk.args.install_args import InstallArgs
 from pakk.config.main_cfg import MainConfig
+from pakk.connector.archive_generic import FETCH_MODE_ARCHIVE
+from pakk.connector.archive_generic import GenericArchiveHelper
 from pakk.connector.base import Connector
 from pakk.connector.base import PakkageCollection
+from pakk.connector.cache import CachedListingPage
+from pakk.connector.cache import CacheIndex
 from pakk.connector.cache import CachedRepository
 from pakk.connector.cache import CachedTag
 from pakk.connector.git_generic import GenericGitHelper
 from pakk.connector.gitlab.config import GitlabConfig
+from pakk.connector.rate_limit import RateLimitScheduler
+from pakk.helper.http import get_pool_size
+from pakk.helper.http import mount_connection_pool
 from pakk.helper.progress import ProgressManager
 from pakk.helper.progress import TaskPbar
 from pakk.helper.progress import execute_process_and_display_progress
@@ -50,6 +61,7 @@ class GitlabConnector(Connector):
         self.config = GitlabConfig.get_config()
 
         self.gl = self.get_gitlab_instance()
+        self._cache_index: CacheIndex | None = None
         self.connected = False
         try:
             self.gl.auth()
@@ -85,6 +97,12 @@ class GitlabConnector(Connector):
 
         # gl = gitlab.Gitlab(**init_dict)
         gl = gitlab.Gitlab.from_config("GitLab.Connection", [c.get_path()])
+
+        # The discover and fetch workers share the keep-alive connection pool of the session
+        pool_size = get_pool_size(int(c.num_discover_workers.value), int(c.num_fetcher_workers.value))
+        mount_connection_pool(gl.session, pool_size)
+
+        GitlabConnector.gl_instance = gl
         return gl
 
     @staticmethod
@@ -114,10 +132,59 @@ class GitlabConnector(Connector):
     def get_cache_dir_path(self):
         return self.config.cache_dir.value
 
-    def get_repo_cache_file_path(self, repo: gl_objects.GroupProject) -> str:
-        name = (str(repo.attributes["id"]) + "_" + repo.attributes["name"]).replace("/", "_")
-        # name = repo.full_name.replace("/", "_")
-        return os.path.join(self.get_cache_dir_path(), name + ".json")
+    @property
+    def cache_index(self) -> CacheIndex:
+        if self._cache_index is None:
+            self._cache_index = CacheIndex(self.get_cache_dir_path())
+        return self._cache_index
+
+    def get_repo_cache_key(self, repo: gl_objects.GroupProject) -> str:
+        return (str(repo.attributes["id"]) + "_" + repo.attributes["name"]).replace("/", "_")
+
+    def get_group_projects_conditional(self, group: gl_objects.Group) -> list[gl_objects.GroupProject]:
+        """
+        List all projects of a group including subgroups, revalidating the cached listing pages with conditional requests.
+        Unchanged pages are answered with 304 Not Modified and are loaded from the cache.
+
+        Parameters
+        ----------
+        group: Group
+            The (lazy) group object from the gitlab api
+
+        Returns
+        -------
+        list[GroupProject]
+            All projects of the group.
+        """
+        projects: list[gl_objects.GroupProject] = []
+        url: str | None = f"{group.projects.path}?include_subgroups=true&per_page=100&page=1"
+        while url is not None:
+            cached_page = None if InstallArgs.get().clear_cache else self.cache_index.get_listing_page(url)
+            request_headers = cached_page.get_conditional_headers() if cached_page is not None else None
+
+            try:
+                response = self.gl.http_request("get", url, extra_headers=request_headers)
+                next_page = response.headers.get("X-Next-Page")
+                page = CachedListingPage(
+                    url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    body=json.dumps(response.json()),
+                    next_url=f"{group.projects.path}?include_subgroups=true&per_page=100&page={next_page}"
+                    if next_page
+                    else None,
+                )
+                self.cache_index.put_listing_page(page)
+            except GitlabHttpError as e:
+                if e.response_code != 304 or cached_page is None:
+                    raise e
+                logger.debug(f"Listing page {url} not modified")
+                page = cached_page
+
+            projects.extend(gl_objects.GroupProject(group.projects, attrs) for attrs in page.items)
+            url = page.next_url
+
+        return projects
 
     @staticmethod
     def datetime_string_to_datetime(s: str) -> datetime:
@@ -153,11 +220,9 @@ class GitlabConnector(Connector):
             project.attributes["last_activity_at"]
         )
 
-        pakk_files = MainConfig.get_config().pakk_cfg_files
-
-        # Load project to access tags
-        gl_project = self.gl.projects.get(cache_project.id)
-        tags = gl_project.tags.list()
+        # Lazy project object, the tags and files can be requested without loading the project itself
+        gl_project = self.gl.projects.get(cache_project.id, lazy=True)
+        tags = gl_project.tags.list(iterator=True, get_all=True)
         for tag in tags:
 
             tag_str = tag.attributes["name"]
@@ -175,27 +240,60 @@ class GitlabConnector(Connector):
             # TODO: http.client.RemoteDisconnected: Remote end closed connection without response
             # TODO: urllib3.exceptions.ProtocolError: ('Connection aborted.', RemoteDisconnected('Remote end closed connection without response'))
             # TODO: requests.exceptions.ConnectionError ("Connection aborted.", ...)
-            repo_tree = gl_project.repository_tree(ref=cached_tag.commit, all=True)
-
-            for item in repo_tree:
-                if item["name"] in pakk_files:
-                    file_info = gl_project.repository_blob(item["id"])
-                    file_content = base64.b64decode(file_info["content"])  # type: ignore
-                    pakk_content_str = file_content.decode("utf-8")
-                    # pakk_cfg = PakkageConfig.from_string(pakk_content_str)
-
-                    cached_tag.pakk_config_str = pakk_content_str
-                    cached_tag.is_pakk_version = True
-                    cache_project.tags[cached_tag.tag] = cached_tag
-                    break
-                    # if pakk_cfg is None:
-                    #     logger.warning("Failed to load pakk configuration from %s", item["name"])
-                    #     continue
-            # else:
-            #     logger.warning("Failed to load pakk configuration from %s", item["name"])
+            # Errors are raised, so the project is retried instead of caching the tag as non-pakk version.
+            pakk_content_str = self._get_pakk_file_content(gl_project, cached_tag.commit)
+            if pakk_content_str is not None:
+                cached_tag.pakk_config_str = pakk_content_str
+                cached_tag.is_pakk_version = True
+
+            # Tags without pakk configuration are cached as well, so they are not checked again
+            cache_project.tags[cached_tag.tag] = cached_tag
 
         return cache_project
 
+    @staticmethod
+    def _get_pakk_file_content(gl_project: gl_objects.Project, ref: str) -> str | None:
+        """
+        Get the content of the pakk configuration file at the given ref with a single raw file request.
+
+        Parameters
+        ----------
+        gl_project: Project
+            The (lazy) project object from the gitlab api
+        ref: str
+            The commit, tag or branch to load the file from
+
+        Returns
+        -------
+        str | None
+            The content of the pakk configuration file or None if the ref contains no pakk configuration file.
+        """
+
+        for pakk_file in MainConfig.get_config().pakk_cfg_files:
+            try:
+                file_content: bytes = gl_project.files.raw(file_path=pakk_file, ref=ref)  # type: ignore
+                return file_content.decode("utf-8")
+            except GitlabGetError as e:
+                if e.response_code != 404:
+                    raise e
+
+        return None
+
+    @staticmethod
+    def _get_transient_error_delay(e: Exception) -> float | None:
+        """
+        Check if the exception is a transient error, that should be retried.
+        Returns 0 for an exponential backoff or None if the error is not transient.
+        Rate limit responses with a Retry-After header are already handled by python-gitlab itself.
+        """
+        if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+            return 0
+
+        if isinstance(e, GitlabError) and e.response_code in (429, 500, 502, 503, 504):
+            return 0
+
+        return None
+
     def _update_cache(self) -> list[CachedRepository]:
         """Helper method to update the cached projects"""
         cached_projects: list[CachedRepository] = list()
@@ -211,9 +309,9 @@ class GitlabConnector(Connector):
         logger.debug(f"Including archived projects: {self.config.include_archived.value}")
         logger.debug(f"Using {num_workers} workers" if num_workers > 1 else None)
 
-        main_group = self.gl.groups.get(main_group_id)
+        main_group = self.gl.groups.get(main_group_id, lazy=True)
 
-        projects = main_group.projects.list(iterator=True, get_all=True, include_subgroups=True)
+        projects = self.get_group_projects_conditional(main_group)
         include_archived = self.config.include_archived.value
 
         logger.debug(f"Looking at {len(projects)} projects...")
@@ -222,12 +320,14 @@ class GitlabConnector(Connector):
             filter(lambda gp: include_archived or not gp.attributes.get("archived"), projects)
         )  # type: ignore
 
+        scheduler = RateLimitScheduler(num_workers, self._get_transient_error_delay)
+
         def project_processing(gp: gl_objects.GroupProject):
-            cache_file_path = self.get_repo_cache_file_path(gp)
+            cache_key = self.get_repo_cache_key(gp)
             if InstallArgs.get().clear_cache:
                 cached_project = None
             else:
-                cached_project = CachedRepository.from_file(cache_file_path)
+                cached_project = self.cache_index.get(cache_key)
 
             repo_dt = self.datetime_string_to_datetime(gp.attributes["last_activity_at"])
 
@@ -238,16 +338,24 @@ class GitlabConnector(Connector):
 
             logger.debug(f"Updating cache for Gitlab repo {gp.attributes['name']}")
 
-            cached_project = self._get_cached_repo(gp, cached_project)
-            if cached_project is not None:
-                cached_project.write(cache_file_path)
-                cached_projects.append(cached_project)
+            try:
+                updated_project = scheduler.execute(self._get_cached_repo, gp, cached_project)
+            except (GitlabError, requests.RequestException) as e:
+                # Don't cache the project, so it is updated again with the next update
+                logger.warning(f"Failed to update cache for Gitlab repo {gp.attributes['name']}: {e}")
+                if cached_project is not None:
+                    cached_projects.append(cached_project)
+                return
+
+            self.cache_index.put(cache_key, updated_project)
+            cached_projects.append(updated_project)
 
         execute_process_and_display_progress(
             items=filtered_group_projects,
             item_processing_callback=project_processing,
             num_workers=num_workers,
             message="Updating gitlab cache",
+            status_getter=lambda: scheduler.description,
         )
 
         return cached_projects
@@ -275,16 +383,16 @@ class GitlabConnector(Connector):
                     continue
 
                 n_pakk += 1
-                pakk_cfg = tag.pakk_config
+                pakk_version = tag.version_descriptor
 
                 # Set attributes for the fetch process
                 attr = ConnectorAttributes()
                 attr.url = project.url
                 attr.branch = tag.tag
                 attr.commit = tag.commit
-                pakk_cfg.set_attributes(self, attr)
+                pakk_version.set_attributes(self, attr)
 
-                pakkage_versions.available[pakk_cfg.version] = pakk_cfg
+                pakkage_versions.available[pakk_version.version] = pakk_version
                 is_valid_pakkage = True
 
             if is_valid_pakkage:
@@ -308,6 +416,23 @@ class GitlabConnector(Connector):
 
         manager.execute()
 
+    def download_archive(self, url: str, commit: str, file: BinaryIO):
+        """
+        Stream the tar.gz archive of the commit of the project with the given http url into the file.
+
+        Parameters
+        ----------
+        url: str
+            The http url of the project repository, e.g. https://gitlab.com/group/project.git
+        commit: str
+            The commit sha to download.
+        file: BinaryIO
+            The file to write the archive to.
+        """
+        project_path = re.sub(r"\.git$", "", url.removeprefix(self.gl.url).strip("/"))
+        gl_project = self.gl.projects.get(project_path, lazy=True)
+        gl_project.repository_archive(sha=commit, format="tar.gz", streamed=True, action=file.write, chunk_size=1024 * 1024)
+
     def checkout_version(self, target_version: PakkageConfig, task: TaskPbar) -> None:
 
         # Check if gitlab attributes are set
@@ -325,6 +450,18 @@ class GitlabConnector(Connector):
             # return target_version
             return
 
+        if self.config.fetch_mode.value == FETCH_MODE_ARCHIVE and attr.commit is not None:
+            try:
+                GenericArchiveHelper.fetch_pakkage_version_with_archive(
+                    target_version,
+                    attr.commit,
+                    lambda f: self.download_archive(url, attr.commit, f),  # type: ignore
+                    task,
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Fetching archive of {target_version.id} failed, falling back to git: {e}")
+
         # Get the url to download the repository
         url_with_token = self.get_gitlab_http_with_token(url)
 
@@ -16,6 +16,7 @@ from pakk.pakkage.core import PakkageConfig
 from pakk.pakkage.core import PakkageInstallState
 from pakk.pakkage.core import PakkageState
 from pakk.pakkage.core import PakkageVersions
+from pakk.pakkage.installed_index import InstalledStateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -65,43 +66,63 @@ class LocalConnector(Connector):
 
         logger.debug("Discovering installed pakkages...")
 
-        all_pakkges_dir = self.all_pakkges_dir
         pakkages = PakkageCollection()
 
+        for pakkage_config in self.get_installed_configs():
+            versions = PakkageVersions()
+
+            if pakkage_config.state is None:
+                logger.warning(f"Pakkage state is None for {pakkage_config.id}")
+                pakkage_config.state = PakkageState(PakkageInstallState.FETCHED)
+
+            if (
+                pakkage_config.state.install_state == PakkageInstallState.INSTALLED
+                or pakkage_config.state.install_state == PakkageInstallState.FAILED
+            ):
+                versions.installed = pakkage_config
+            elif (
+                pakkage_config.state.install_state == PakkageInstallState.FETCHED
+                or pakkage_config.state.install_state == PakkageInstallState.DISCOVERED
+            ):
+                versions.target = pakkage_config
+            else:
+                logger.debug(f"Unknown install state: {pakkage_config.state.install_state}")
+
+            pakkage = Pakkage(versions)
+            pakkages[pakkage.id] = pakkage
+
+        return pakkages
+
+    def get_installed_configs(self) -> list[PakkageConfig]:
+        """
+        Get the pakkage configs of all directories in the all pakkages dir.
+        The configs are read from the installed state index if it is up to date, otherwise the directories are scanned.
+        """
+        configs = InstalledStateIndex.load()
+        if configs is not None:
+            logger.debug(f"Loaded {len(configs)} installed pakkages from the index")
+            return configs
+
+        configs = []
+        ignored_dirs = []
+
         # Go over each pakkage in the all directory and add it to the list
-        for subdir, dirs, _ in os.walk(all_pakkges_dir):
+        for subdir, dirs, _ in os.walk(self.all_pakkges_dir):
             for d in dirs:
                 abs_path = os.path.join(subdir, d)
 
                 # Check if the directory contains a pakkage file
                 pakkage_config = PakkageConfig.from_directory(abs_path)
                 if pakkage_config is not None:
-                    versions = PakkageVersions()
-
-                    if pakkage_config.state is None:
-                        logger.warning(f"Pakkage state is None for {pakkage_config.id}")
-                        pakkage_config.state = PakkageState(PakkageInstallState.FETCHED)
-
-                    if (
-                        pakkage_config.state.install_state == PakkageInstallState.INSTALLED
-                        or pakkage_config.state.install_state == PakkageInstallState.FAILED
-                    ):
-                        versions.installed = pakkage_config
-                    elif (
-                        pakkage_config.state.install_state == PakkageInstallState.FETCHED
-                        or pakkage_config.state.install_state == PakkageInstallState.DISCOVERED
-                    ):
-                        versions.target = pakkage_config
-                    else:
-                        logger.debug(f"Unknown install state: {pakkage_config.state.install_state}")
-
-                    pakkage = Pakkage(versions)
-                    pakkages[pakkage.id] = pakkage
+                    configs.append(pakkage_config)
+                else:
+                    ignored_dirs.append(d)
 
             # First entry gives us all the subdirectories we need to check
             break
 
-        return pakkages
+        InstalledStateIndex.save(configs, ignored_dirs)
+        return configs
 
     def discover_in_dir(self, pakkages: PakkageCollection, path: str, recursive: bool = True):
 
@@ -193,5 +214,5 @@ class LocalConnector(Connector):
             os.makedirs(fetch_dir, exist_ok=True)
             shutil.copytree(path, fetch_path)
 
-            pakkage.state.install_state = PakkageInstallState.FETCHED
             pakkage.local_path = fetch_path
+            pakkage.state.install_state = PakkageInstallState.FETCHED
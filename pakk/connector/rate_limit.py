@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RateLimitQuota:
+    def __init__(self, remaining: int, limit: int, reset_in: float):
+        self.remaining: int = remaining
+        """Remaining requests in the current rate limit window."""
+        self.limit: int = limit
+        """Maximal number of requests in a rate limit window."""
+        self.reset_in: float = reset_in
+        """Seconds until the rate limit window is reset."""
+
+    def __str__(self):
+        return f"{self.remaining}/{self.limit}"
+
+
+class RateLimitScheduler:
+    """
+    Scheduler for the requests of the discover workers of a connector.
+
+    The scheduler bounds the number of concurrently running workers and adapts it to the server:
+    - After every successful call, the remaining quota is read (if available).
+      If the quota is nearly exhausted, the workers are paused until the quota is reset.
+    - Transient errors (rate limits, server errors, connection errors) are retried with an exponential backoff
+      and the concurrency is halved. Successful calls increase the concurrency again up to the number of workers.
+    - Other errors and errors exceeding the retries are raised, so they are not persisted as results.
+    """
+
+    MAX_RETRIES = 5
+    """Maximal number of retries of a call failing with a transient error."""
+
+    BACKOFF_BASE = 1.0
+    """Backoff in seconds for the first retry, doubled with every further retry."""
+
+    BACKOFF_MAX = 60.0
+    """Maximal backoff in seconds, if the server does not request a longer delay."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        transient_error_delay: Callable[[Exception], float | None],
+        quota_getter: Callable[[], RateLimitQuota | None] | None = None,
+    ):
+        """
+        Create a new scheduler.
+
+        Parameters
+        ----------
+        max_workers: int
+            The maximal number of concurrently running calls.
+        transient_error_delay: Callable[[Exception], float | None]
+            Returns None if the given exception is not transient.
+            Otherwise, the delay in seconds requested by the server or 0 to use the exponential backoff.
+        quota_getter: Callable[[], RateLimitQuota | None] | None
+            Returns the remaining quota of the last response or None if not available.
+        """
+        self.max_workers: int = max(1, max_workers)
+        self.concurrency: int = self.max_workers
+        """Current number of allowed concurrent calls."""
+
+        self.transient_error_delay = transient_error_delay
+        self.quota_getter = quota_getter
+        self.quota: RateLimitQuota | None = None
+        """The last read quota."""
+
+        self._active = 0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def description(self) -> str:
+        """Short description of the quota and the concurrency to show in the progress display."""
+        s = f"{self.concurrency}/{self.max_workers} workers"
+        if self.quota is not None:
+            s = f"quota {self.quota}, " + s
+        return s
+
+    def _acquire(self):
+        with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self._active >= self.concurrency:
+                    self._condition.wait()
+                else:
+                    break
+            self._active += 1
+
+    def _release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Pause all workers for the given number of seconds."""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def _on_success(self):
+        quota = self.quota_getter() if self.quota_getter is not None else None
+        with self._condition:
+            self.quota = quota
+            if quota is not None and quota.remaining <= self.max_workers:
+                logger.warning(f"Rate limit nearly exhausted ({quota}), pausing for {quota.reset_in:.0f}s")
+                self.concurrency = 1
+                self._paused_until = max(self._paused_until, time.monotonic() + quota.reset_in)
+            elif self.concurrency < self.max_workers:
+                self.concurrency += 1
+            self._condition.notify_all()
+
+    def _on_transient_error(self, delay: float):
+        with self._condition:
+            self.concurrency = max(1, self.concurrency // 2)
+        self.pause(delay)
+
+    def execute(self, func: Callable[..., T], *args) -> T:
+        """
+        Execute the given function with the given arguments as soon as the scheduler allows it.
+        Transient errors are retried, other errors are raised.
+        """
+        retry = 0
+        while True:
+            self._acquire()
+            try:
+                result = func(*args)
+            except Exception as e:
+                delay = self.transient_error_delay(e)
+                if delay is None or retry >= RateLimitScheduler.MAX_RETRIES:
+                    raise e
+
+                retry += 1
+                if delay <= 0:
+                    delay = min(RateLimitScheduler.BACKOFF_MAX, RateLimitScheduler.BACKOFF_BASE * 2 ** (retry - 1))
+                logger.debug(f"Transient error ({e}), retry {retry}/{RateLimitScheduler.MAX_RETRIES} in {delay:.1f}s")
+                self._on_transient_error(delay)
+                continue
+            finally:
+                self._release()
+
+            self._on_success()
+            return result
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from typing import Iterable
+from typing import Iterator
+
+
+class GraphCycleError(ValueError):
+    """Raised if a topological order is requested for a graph containing a cycle."""
+
+
+class _GraphStorage:
+    """Node table and adjacency sets shared by a graph and its reverse view."""
+
+    __slots__ = ("ids", "index", "succ", "pred", "num_edges")
+
+    def __init__(self):
+        self.ids: list[str] = []
+        """The node ids by their integer index."""
+        self.index: dict[str, int] = {}
+        """The integer index of every node id."""
+        self.succ: list[set[int]] = []
+        """The successors of every node by integer index."""
+        self.pred: list[set[int]] = []
+        """The predecessors of every node by integer index."""
+        self.num_edges = 0
+
+
+class DependencyGraph:
+    """
+    Compact directed graph for the dependency tree.
+
+    Nodes are stored as integer indices into a node table with forward and reverse adjacency sets,
+    that are always updated together. Thus, a graph with thousands of discovered but unconnected pakkages
+    costs only a list entry per node, and the reverse direction is available as view without a second graph.
+    Removed nodes keep their index, but are not part of the graph anymore.
+    """
+
+    __slots__ = ("_storage", "_reversed")
+
+    def __init__(self, nodes: Iterable[str] | None = None):
+        self._storage = _GraphStorage()
+        self._reversed = False
+
+        if nodes is not None:
+            for node in nodes:
+                self.add_node(node)
+
+    #############################################################
+    ### Internal helpers
+    #############################################################
+
+    @property
+    def _succ(self) -> list[set[int]]:
+        return self._storage.pred if self._reversed else self._storage.succ
+
+    @property
+    def _pred(self) -> list[set[int]]:
+        return self._storage.succ if self._reversed else self._storage.pred
+
+    def _get_index(self, node: str) -> int:
+        index = self._storage.index.get(node)
+        if index is None:
+            raise KeyError(f"Node {node} is not in the graph")
+        return index
+
+    def _to_ids(self, indices: Iterable[int]) -> list[str]:
+        ids = self._storage.ids
+        return [ids[i] for i in indices]
+
+    #############################################################
+    ### Nodes and edges
+    #############################################################
+
+    def add_node(self, node: str) -> int:
+        """Add the node if it is not in the graph yet and return its integer index."""
+        storage = self._storage
+        index = storage.index.get(node)
+        if index is None:
+            index = len(storage.ids)
+            storage.ids.append(node)
+            storage.index[node] = index
+            storage.succ.append(set())
+            storage.pred.append(set())
+        return index
+
+    def remove_node(self, node: str):
+        """Remove the node and all its edges."""
+        index = self._get_index(node)
+        self.remove_successors(node)
+        for p in list(self._pred[index]):
+            self._succ[p].discard(index)
+            self._storage.num_edges -= 1
+        self._pred[index].clear()
+        del self._storage.index[node]
+
+    def add_edge(self, u: str, v: str):
+        """Add the edge u -> v, missing nodes are added."""
+        iu = self.add_node(u)
+        iv = self.add_node(v)
+        if iv not in self._succ[iu]:
+            self._succ[iu].add(iv)
+            self._pred[iv].add(iu)
+            self._storage.num_edges += 1
+
+    def remove_edge(self, u: str, v: str):
+        iu = self._get_index(u)
+        iv = self._get_index(v)
+        if iv not in self._succ[iu]:
+            raise KeyError(f"Edge {u} -> {v} is not in the graph")
+        self._succ[iu].discard(iv)
+        self._pred[iv].discard(iu)
+        self._storage.num_edges -= 1
+
+    def remove_successors(self, node: str) -> set[str]:
+        """Remove all outgoing edges of the node and return the ids of the former successors."""
+        index = self._get_index(node)
+        successors = self._succ[index]
+        for s in successors:
+            self._pred[s].discard(index)
+        self._storage.num_edges -= len(successors)
+        removed = set(self._to_ids(successors))
+        successors.clear()
+        return removed
+
+    def has_edge(self, u: str, v: str) -> bool:
+        iu = self._storage.index.get(u)
+        iv = self._storage.index.get(v)
+        return iu is not None and iv is not None and iv in self._succ[iu]
+
+    def successors(self, node: str) -> Iterator[str]:
+        return iter(self._to_ids(self._succ[self._get_index(node)]))
+
+    def predecessors(self, node: str) -> Iterator[str]:
+        return iter(self._to_ids(self._pred[self._get_index(node)]))
+
+    def neighbors(self, node: str) -> Iterator[str]:
+        """Same as successors."""
+        return self.successors(node)
+
+    def out_degree(self, node: str) -> int:
+        return len(self._succ[self._get_index(node)])
+
+    def in_degree(self, node: str) -> int:
+        return len(self._pred[self._get_index(node)])
+
+    @property
+    def nodes(self) -> list[str]:
+        """The node ids in the order they were added."""
+        return self._to_ids(self._storage.index.values())
+
+    @property
+    def edges(self) -> list[tuple[str, str]]:
+        ids = self._storage.ids
+        return [(ids[u], ids[v]) for u in self._storage.index.values() for v in self._succ[u]]
+
+    def number_of_nodes(self) -> int:
+        return len(self._storage.index)
+
+    def number_of_edges(self) -> int:
+        return self._storage.num_edges
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._storage.index
+
+    def __len__(self) -> int:
+        return self.number_of_nodes()
+
+    #############################################################
+    ### Derived graphs
+    #############################################################
+
+    def reverse_view(self) -> DependencyGraph:
+        """Get a view of the graph with reversed edges, sharing the nodes and adjacency sets with this graph."""
+        view = DependencyGraph.__new__(DependencyGraph)
+        view._storage = self._storage
+        view._reversed = not self._reversed
+        return view
+
+    def subgraph(self, nodes: Iterable[str]) -> DependencyGraph:
+        """Get a new graph only containing the given nodes (if they are in this graph) and the edges between them."""
+        graph = DependencyGraph(n for n in nodes if n in self)
+        ids = self._storage.ids
+        for u in graph.nodes:
+            for v in self._succ[self._get_index(u)]:
+                if ids[v] in graph:
+                    graph.add_edge(u, ids[v])
+        return graph
+
+    #############################################################
+    ### Topological order
+    #############################################################
+
+    def topological_generations(self, nodes: Iterable[str] | None = None) -> list[list[str]]:
+        """
+        Get the nodes grouped into generations: The first generation contains all nodes without predecessors,
+        every following generation the nodes whose predecessors are all in previous generations.
+        Runs in O(V + E) of the considered nodes and their edges.
+
+        Parameters
+        ----------
+        nodes: Iterable[str] | None
+            If given, only these nodes and the edges between them are considered, otherwise the whole graph.
+
+        Raises
+        ------
+        GraphCycleError
+            If the graph contains a cycle.
+        """
+        if nodes is None:
+            indices = list(self._storage.index.values())
+            in_degree = {i: len(self._pred[i]) for i in indices}
+        else:
+            indices = [self._get_index(n) for n in nodes]
+            selected = set(indices)
+            in_degree = {i: sum(1 for p in self._pred[i] if p in selected) for i in indices}
+
+        generation = [i for i, d in in_degree.items() if d == 0]
+        generations: list[list[str]] = []
+        visited = 0
+
+        while len(generation) > 0:
+            generations.append(self._to_ids(generation))
+            visited += len(generation)
+
+            next_generation = []
+            for i in generation:
+                for s in self._succ[i]:
+                    if s not in in_degree:
+                        continue
+                    in_degree[s] -= 1
+                    if in_degree[s] == 0:
+                        next_generation.append(s)
+            generation = next_generation
+
+        if visited != len(in_degree):
+            raise GraphCycleError("The graph contains a cycle")
+
+        return generations
+
+    def topological_sort(self, nodes: Iterable[str] | None = None) -> list[str]:
+        """Get the (given) nodes in topological order, every node is listed before its successors."""
+        return [node for generation in self.topological_generations(nodes) for node in generation]
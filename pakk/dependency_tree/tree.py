@@ -4,8 +4,7 @@ import builtins
 import logging
 from typing import TYPE_CHECKING
 
-import networkx as nx
-from graphviz import Digraph
+from pakk.dependency_tree.graph import DependencyGraph
 
 if TYPE_CHECKING:
     from pakk.pakkage.core import Pakkage
@@ -22,26 +21,23 @@ class DependencyTree:
         self.unresolved_pakkages: list[str] = list()
         self.nodes_with_new_parents: set[str] = set()
 
-        self.tree: nx.DiGraph = None  # type: ignore
-        self.tree_reverse: nx.DiGraph = None  # type: ignore
+        self.tree: DependencyGraph = None  # type: ignore
+        """Graph with edges from the pakkages to their dependencies."""
 
         self._init_nodes()
 
+    @property
+    def tree_reverse(self) -> DependencyGraph:
+        """Reversed view of the tree with edges from the dependencies to the depending pakkages."""
+        return self.tree.reverse_view()
+
     def _init_nodes(self):
         """Initialize the nodes of the graph from the pakkages"""
-        g = nx.DiGraph()
-        g_reverse = nx.DiGraph()
-
-        for pakkage in self.pakkages.values():
-            g.add_node(pakkage.id, pakkage=pakkage)
-            g_reverse.add_node(pakkage.id, pakkage=pakkage)
-
-        self.tree = g
-        self.tree_reverse = g_reverse
+        self.tree = DependencyGraph(self.pakkages.keys())
 
     def get_parent_nodes(self, pakkage: Pakkage) -> list[Pakkage]:
         """Get the parent node of a pakkage"""
-        parents = list(self.tree_reverse.neighbors(pakkage.id))
+        parents = list(self.tree.predecessors(pakkage.id))
         if len(parents) == 0:
             return []
 
@@ -51,7 +47,7 @@ class DependencyTree:
         """Get the highest parent node of a pakkage"""
         visited = visited or dict()
 
-        current_parents = list(self.tree_reverse.successors(pakkage.id))
+        current_parents = list(self.tree.predecessors(pakkage.id))
         new_parents = [p for p in current_parents if p not in visited]
 
         for p in new_parents:
@@ -83,15 +79,7 @@ class DependencyTree:
 
     def remove_dependencies(self, pakkage: Pakkage) -> set[str]:
         """Remove all dependencies of a pakkage from the tree"""
-        neighbors_to_remove = []
-        for n in self.tree.neighbors(pakkage.id):
-            neighbors_to_remove.append(n)
-
-        for n in neighbors_to_remove:
-            self.tree.remove_edge(pakkage.id, n)
-            self.tree_reverse.remove_edge(n, pakkage.id)
-
-        return set(neighbors_to_remove)
+        return self.tree.remove_successors(pakkage.id)
 
     def add_dependencies(self, pakkage: Pakkage, version: PakkageConfig):  # -> dict[str, Pakkage]:
         """Add dependencies of a pakkage to the tree"""
@@ -106,7 +94,6 @@ class DependencyTree:
                 raise Exception(f"Dependency {dependency} not found in pakkage map")
 
             self.tree.add_edge(pakkage.id, dependency)
-            self.tree_reverse.add_edge(dependency, pakkage.id)
             self.pakkages[dependency].versions.resolved = False
 
             added_deps.add(dependency)
@@ -141,23 +128,8 @@ class DependencyTree:
         list[str]: List of node ids
 
         """
-        topologic_sorting = list(reversed(list(nx.algorithms.dag.topological_sort(self.tree))))
-
-        if compact:
-            remove_ids = set()
-            for node_id in topologic_sorting:
-                n_out = len(list(self.tree.neighbors(node_id)))
-                n_in = len(list(self.tree_reverse.neighbors(node_id)))
-                installed = self.pakkages[node_id].versions.installed is not None
-                target = self.pakkages[node_id].versions.target is not None
-
-                if n_out == 0 and n_in == 0 and not installed and not target:
-                    remove_ids.add(node_id)
-
-            for node_id in remove_ids:
-                topologic_sorting.remove(node_id)
-
-        return topologic_sorting
+        nodes = self._get_interesting_nodes() if compact else None
+        return list(reversed(self.tree.topological_sort(nodes)))
 
     def get_topological_generations(self, compact=True, reversed=False) -> list[list[str]]:
         """Get the topological generations of the dependency tree.
@@ -175,31 +147,34 @@ class DependencyTree:
             List of generations, where each generation is a list of node ids
         """
 
-        generations = nx.algorithms.dag.topological_generations(self.tree)
+        nodes = self._get_interesting_nodes() if compact else None
+        generations = self.tree.topological_generations(nodes)
         sorted_generations: list[list[str]] = [sorted(generation) for generation in generations]
 
-        if compact:
-            remove_ids = set()
-            for generation in sorted_generations:
-                for node_id in generation:
-                    n_out = len(list(self.tree.neighbors(node_id)))
-                    n_in = len(list(self.tree_reverse.neighbors(node_id)))
-                    installed = self.pakkages[node_id].versions.installed is not None
-                    target = self.pakkages[node_id].versions.target is not None
-
-                    if n_out == 0 and n_in == 0 and not installed and not target:
-                        remove_ids.add(node_id)
-
-            for generation in sorted_generations:
-                for node_id in remove_ids:
-                    if node_id in generation:
-                        generation.remove(node_id)
-
         if reversed:
             sorted_generations = list(builtins.reversed(sorted_generations))
 
         return sorted_generations
 
+    def _get_interesting_nodes(self) -> list[str]:
+        """
+        Get the nodes that are installed, targets or connected to such nodes by a dependency.
+        Discovered pakkages without any relation to the installation are skipped,
+        so the topological sorting only visits the relevant subgraph.
+        """
+        nodes: dict[str, None] = dict()
+        for node_id, pakkage in self.pakkages.items():
+            if pakkage.versions.installed is None and pakkage.versions.target is None:
+                continue
+
+            nodes[node_id] = None
+            for n in self.tree.successors(node_id):
+                nodes[n] = None
+            for n in self.tree.predecessors(node_id):
+                nodes[n] = None
+
+        return list(nodes)
+
     def get_next_unresolved_pakkage(self, remove=True) -> Pakkage | None:
         if len(self.unresolved_pakkages) == 0:
             return None
@@ -217,15 +192,15 @@ class DependencyTree:
         # return p
 
     def print_graph(self):
+        # graphviz is only needed for printing, thus it is not imported with the module
+        from graphviz import Digraph
+
         # Create a new graph object
         g = Digraph()
 
         # Add nodes to the graph
-        for node_id, data in self.tree.nodes(data=True):
-            neighbors = self.tree.neighbors(node_id)
-            n_neighbors = len(list(neighbors))
-            n_in_neighbors = len(list(self.tree_reverse.neighbors(node_id)))
-            if n_neighbors > 0 or n_in_neighbors > 0:
+        for node_id in self.tree.nodes:
+            if self.tree.out_degree(node_id) > 0 or self.tree.in_degree(node_id) > 0:
                 v = self.pakkages[node_id].versions.target or self.pakkages[node_id].versions.installed
                 g.node(str(node_id), label=v.version if v else node_id)
 
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def get_pool_size(*num_workers: int) -> int:
+    """
+    Get the size of a connection pool shared by all worker threads of a connector.
+    The discover and fetch workers of a connector can use its session at the same time and each of them needs
+    its own connection. urllib3 only keeps as many idle connections as the pool size, thus whenever the workers
+    wait (e.g. for the next listing page or a rate limit pause) the other connections are closed and opened again
+    for the next requests. The pool is never smaller than the default pool of requests.
+
+    Parameters
+    ----------
+    num_workers: int
+        The number of workers of every worker pool using the session.
+
+    Returns
+    -------
+    int
+        The maximal number of connections kept alive per host.
+    """
+    return max(DEFAULT_POOLSIZE, sum(num_workers))
+
+
+def mount_connection_pool(session: requests.Session, pool_size: int) -> requests.Session:
+    """
+    Mount http adapters with a keep-alive connection pool of the given size to the session.
+    All threads using the session reuse the open connections instead of opening new ones.
+
+    Parameters
+    ----------
+    session: requests.Session
+        The session used by the api client.
+    pool_size: int
+        The maximal number of connections kept alive per host.
+
+    Returns
+    -------
+    requests.Session
+        The given session.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    logger.debug(f"Using connection pool with {pool_size} connections")
+    return session
@@ -4,7 +4,6 @@ import importlib
 import inspect
 import logging
 import os
-import pkgutil
 from typing import Type
 from typing import TypeVar
 
@@ -14,6 +13,7 @@ from pakk.connector.base import Connector
 from pakk.connector.base import PakkageCollection
 from pakk.environments.loader import get_current_environment
 from pakk.environments.loader import get_current_environment_cls
+from pakk.helper.plugin_manifest import PluginManifest
 from pakk.setup.base import SetupBase
 from pakk.types.base import TypeBase
 
@@ -27,32 +27,15 @@ class PakkLoader:
     __types_sub_paths = ["modules.types", "types"]
     __setup_sub_paths = ["modules.connector", "connector", "modules.types", "types", "setup"]
 
-    __pakk_modules: list[tuple[str, str]] = []
-
-    @staticmethod
-    def __get_pakk_modules() -> list[tuple[str, str]]:
-        if len(PakkLoader.__pakk_modules) > 0:
-            return PakkLoader.__pakk_modules
-
-        # Get all installed python packages starting with "pakk"
-        logger.debug("Fetching all installed pakk modules...")
-        pakk_modules: list[tuple[str, str]] = []
-        for module_path, module_name, _ in pkgutil.iter_modules():
-            if module_name.startswith("pakk"):
-                pakk_modules.append((module_path.path, module_name))  # type: ignore
-
-        PakkLoader.__pakk_modules = pakk_modules
-        return pakk_modules
-
     @staticmethod
     def __get_pakk_sub_modules(paths: list[str]) -> list[str]:
-        pakk_modules = PakkLoader.__get_pakk_modules()
+        pakk_modules = PluginManifest.get_pakk_modules()
         sub_modules: list[str] = []
         for module_path, pakk_module in pakk_modules:
             for sub_path in paths:
                 sub_module_path = f"{pakk_module}.{sub_path}"
                 search_path = os.path.join(module_path, sub_module_path.replace(".", os.sep))
-                for _, module_name, _ in pkgutil.iter_modules([search_path]):
+                for module_name in PluginManifest.get_module_names(search_path):
                     sub_modules.append(".".join([pakk_module, sub_path, module_name]))
         return sub_modules
 
@@ -123,17 +106,24 @@ class PakkLoader:
         return types
 
     @staticmethod
-    def get_setup_routines() -> list[SetupBase]:
+    def get_setup_routine_classes() -> list[type[SetupBase]]:
         setup_modules = PakkLoader.__get_pakk_sub_modules(PakkLoader.__setup_sub_paths)
         logger.debug(f"Found setup modules: {setup_modules}")
 
         setup_routines_cls = PakkLoader.get_module_subclasses(setup_modules, SetupBase)
         logger.debug(f"Found setup routines: {setup_routines_cls}")
+        return setup_routines_cls
 
-        from pakk.setup.checker import PakkSetupChecker
+    @staticmethod
+    def create_setup_routines(
+        setup_routines_cls: list[type[SetupBase]], parser: ExtendedConfigParser | None = None
+    ) -> list[SetupBase]:
+        """Instantiate the given setup routines sharing the parser of the setup routines config."""
+        if parser is None:
+            from pakk.setup.checker import PakkSetupChecker
 
-        parser = ExtendedConfigParser()
-        parser.read(PakkSetupChecker.path)
+            parser = ExtendedConfigParser()
+            parser.read(PakkSetupChecker.path)
 
         env = get_current_environment()
         setup_routines: list[SetupBase] = []
@@ -144,3 +134,7 @@ class PakkLoader:
                 logger.error(f"Error while creating setup routine '{setup_cls.__name__}': {e}")
 
         return setup_routines
+
+    @staticmethod
+    def get_setup_routines(parser: ExtendedConfigParser | None = None) -> list[SetupBase]:
+        return PakkLoader.create_setup_routines(PakkLoader.get_setup_routine_classes(), parser)
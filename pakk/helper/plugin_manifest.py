@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pkgutil
+import sys
+from typing import Any
+
+from pakk.config.main_cfg import MainConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PluginManifest:
+    """
+    Cached result of the plugin discovery of the PakkLoader.
+
+    Finding the pakk modules requires iterating all modules on the python path,
+    which is slow on small devices and was done for every command.
+    The manifest stores the found pakk modules and the module names of their connector, type and setup sub paths
+    in a single file in the cache dir.
+    The pakk modules are rescanned if the python path or the modification time of one of its entries changed,
+    e.g. because distributions were installed or removed.
+    The names of the sub modules are rescanned if the modification time of their directory changed.
+    """
+
+    FILE_NAME = "plugin_manifest.json"
+    """Name of the manifest file in the cache dir."""
+
+    VERSION = 1
+    """Version of the manifest format, manifests of other versions are ignored."""
+
+    _data: dict[str, Any] | None = None
+
+    @staticmethod
+    def get_path() -> str | None:
+        try:
+            return os.path.join(MainConfig.get_config().paths.cache_dir.value, PluginManifest.FILE_NAME)
+        except Exception as e:
+            logger.debug(f"Could not get the path of the plugin manifest: {e}")
+            return None
+
+    @staticmethod
+    def _get_mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _get_fingerprint() -> list[list[Any]]:
+        """Get the entries of the python path with their modification times."""
+        return [[p, PluginManifest._get_mtime(p or os.curdir)] for p in sys.path]
+
+    #############################################################
+    ### Reading and writing
+    #############################################################
+
+    @staticmethod
+    def _load_data() -> dict[str, Any] | None:
+        path = PluginManifest.get_path()
+        if path is None or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not load plugin manifest {path}: {e}")
+            return None
+
+        if data.get("version") != PluginManifest.VERSION:
+            return None
+        if data.get("fingerprint") != PluginManifest._get_fingerprint():
+            logger.debug("Plugin manifest is outdated, the python path changed")
+            return None
+        return data
+
+    @staticmethod
+    def _get_data() -> dict[str, Any]:
+        if PluginManifest._data is None:
+            data = PluginManifest._load_data()
+            if data is None:
+                data = {
+                    "version": PluginManifest.VERSION,
+                    "fingerprint": PluginManifest._get_fingerprint(),
+                    "modules": None,
+                    "sub_modules": {},
+                }
+            PluginManifest._data = data
+        return PluginManifest._data
+
+    @staticmethod
+    def _save():
+        path = PluginManifest.get_path()
+        if path is None or PluginManifest._data is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(PluginManifest._data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not write plugin manifest {path}: {e}")
+
+    @staticmethod
+    def clear():
+        PluginManifest._data = None
+        path = PluginManifest.get_path()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    #############################################################
+    ### Discovery
+    #############################################################
+
+    @staticmethod
+    def get_pakk_modules() -> list[tuple[str, str]]:
+        """Get the paths and names of all installed python modules starting with "pakk"."""
+        data = PluginManifest._get_data()
+        if data["modules"] is None:
+            logger.debug("Fetching all installed pakk modules...")
+            modules: list[list[str]] = []
+            for module_path, module_name, _ in pkgutil.iter_modules():
+                if module_name.startswith("pakk"):
+                    modules.append([module_path.path, module_name])  # type: ignore
+
+            data["modules"] = modules
+            PluginManifest._save()
+
+        return [(path, name) for path, name in data["modules"]]
+
+    @staticmethod
+    def get_module_names(search_path: str) -> list[str]:
+        """Get the names of the modules in the given directory."""
+        data = PluginManifest._get_data()
+        mtime = PluginManifest._get_mtime(search_path)
+
+        entry = data["sub_modules"].get(search_path)
+        if entry is None or entry["mtime"] != mtime:
+            names = [] if mtime is None else [name for _, name, _ in pkgutil.iter_modules([search_path])]
+            entry = {"mtime": mtime, "modules": names}
+            data["sub_modules"][search_path] = entry
+            PluginManifest._save()
+
+        return list(entry["modules"])
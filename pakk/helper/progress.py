@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
 from multiprocessing.pool import ThreadPool
 from typing import Callable
 from typing import Generic
 from typing import Iterable
+from typing import Iterator
 from typing import TypeVar
 
 from rich.progress import BarColumn
@@ -23,6 +26,64 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+_shared_progress: Progress | None = None
+_shared_progress_users: dict[int, int] = {}
+"""Number of entered contexts by the ident of the thread using the shared progress."""
+_shared_progress_lock = threading.Lock()
+
+
+@contextmanager
+def shared_progress() -> Iterator[Progress]:
+    """
+    Context manager returning a progress display that is shared by all concurrently running users.
+    Rich only allows one live display at once, thus e.g. connectors discovering in parallel add their tasks to the same display.
+    The display is stopped when the last user leaves the context.
+    """
+    global _shared_progress
+
+    ident = threading.get_ident()
+    with _shared_progress_lock:
+        if _shared_progress is None:
+            _shared_progress = Progress(
+                SpinnerColumn(),
+                *Progress.get_default_columns(),
+                MofNCompleteColumn(),
+                TimeElapsedColumn(),
+            )
+            _shared_progress.start()
+        _shared_progress_users[ident] = _shared_progress_users.get(ident, 0) + 1
+        progress = _shared_progress
+
+    try:
+        yield progress
+    finally:
+        with _shared_progress_lock:
+            # The users of the thread may have been released already, see `release_shared_progress`
+            if ident in _shared_progress_users:
+                _shared_progress_users[ident] -= 1
+                if _shared_progress_users[ident] == 0:
+                    del _shared_progress_users[ident]
+                _stop_unused_shared_progress()
+
+
+def _stop_unused_shared_progress():
+    global _shared_progress
+
+    if len(_shared_progress_users) == 0 and _shared_progress is not None:
+        _shared_progress.stop()
+        _shared_progress = None
+
+
+def release_shared_progress(thread: threading.Thread):
+    """
+    Release all uses of the shared progress by the given thread, e.g. of a thread that is abandoned after a timeout.
+    The display is stopped if there are no other users, leaving the context later in the thread has no effect.
+    """
+    with _shared_progress_lock:
+        if thread.ident is not None:
+            _shared_progress_users.pop(thread.ident, None)
+        _stop_unused_shared_progress()
+
 
 def execute_process_and_display_progress(
     items: Iterable[T],
@@ -30,14 +91,10 @@ def execute_process_and_display_progress(
     num_workers: int = 1,
     item_count: int | None = None,
     message: str = "Updating cache",
+    status_getter: Callable[[], str] | None = None,
 ) -> None:
     # with tqdm.tqdm(total=len(filtered_group_projects)) as pbar:
-    with Progress(
-        SpinnerColumn(),
-        *Progress.get_default_columns(),
-        MofNCompleteColumn(),
-        TimeElapsedColumn(),
-    ) as progress:
+    with shared_progress() as progress:
         if item_count is not None:
             total_items = item_count
         else:
@@ -48,19 +105,24 @@ def execute_process_and_display_progress(
 
         pbar = progress.add_task(f"[cyan]{message}", total=total_items)
 
+        def advance():
+            # Optional status (e.g. the remaining api quota) shown behind the message
+            description = f"[cyan]{message}" + (f" ({status_getter()})" if status_getter is not None else "")
+            progress.update(pbar, advance=1, description=description)
+
         if num_workers > 1:
             # with Pool(num_workers) as pool:
             with ThreadPool(num_workers) as pool:
                 for res in pool.imap_unordered(item_processing_callback, items):
                     # append_result(*res)
-                    progress.update(pbar, advance=1)
+                    advance()
 
             pool.join()
         else:
             for gp in items:
                 # append_result(*CachedProject.from_project(self, gp))  # type: ignore
                 item_processing_callback(gp)
-                progress.update(pbar, advance=1)
+                advance()
 
 
 class TaskPbar:
@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import heapq
+import itertools
 import logging
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from typing import Callable
 
-import networkx as nx
-
 from pakk.args.install_args import InstallArgs
 from pakk.config.main_cfg import MainConfig
+from pakk.connector.base import FetchPipeline
 from pakk.connector.base import PakkageCollection
+from pakk.dependency_tree.graph import DependencyGraph
 from pakk.dependency_tree.tree import DependencyTree
 from pakk.logger import Logger
 from pakk.module import Module
 from pakk.pakkage.core import Pakkage
 from pakk.pakkage.core import PakkageConfig
 from pakk.pakkage.core import PakkageInstallState
+from pakk.pakkage.installed_index import InstalledStateIndex
 from pakk.types.base import TypeBase
 
 logger = logging.getLogger(__name__)
@@ -22,18 +29,59 @@ logger = logging.getLogger(__name__)
 class InstallNode:
     """Node in the install graph."""
 
-    def __init__(self, pakkage_config: PakkageConfig, depth: int = 0):
+    def __init__(self, pakkage_config: PakkageConfig, depth: int = 0, prepared: bool = True):
         """Initialize the install node for the given pakkage config."""
         self.depth = depth
         self.pakkage_config = pakkage_config
         """Pakkage config for this node."""
 
-        self.types_to_install: list[TypeBase] = pakkage_config.pakk_types.copy()
+        self.prepared = False
+        """True if the pakkage is fetched and the types to install are loaded."""
+
+        self.types_to_install: list[TypeBase] = []
         """Types that still need to be installed for this node."""
 
+        self.running_types: list[TypeBase] = []
+        """Types of this node that are currently installed by a worker."""
+
+        if prepared:
+            self.prepare()
+
+    def prepare(self):
+        """Load the types to install. Requires the pakkage to be fetched."""
+        self.types_to_install = self.pakkage_config.pakk_types.copy()
+        self.prepared = True
+
+    FETCH_FAILED = "Fetch"
+    """Entry of the failed types of the pakkage state if the pakkage could not be fetched."""
+
+    @property
+    def fetch_failed(self):
+        """
+        True if the pakkage could not be fetched. The parent nodes are not installed then.
+        Failed types of a fetched pakkage don't block, the remaining types and the parents are still installed.
+        """
+        return InstallNode.FETCH_FAILED in self.pakkage_config.state.failed_types
+
     @property
     def is_finished(self):
-        return len(self.types_to_install) == 0
+        return (
+            not self.fetch_failed and self.prepared and len(self.types_to_install) == 0 and len(self.running_types) == 0
+        )
+
+    @property
+    def is_running(self):
+        return len(self.running_types) > 0
+
+    @property
+    def blocks_parents(self):
+        """True if the installation of the parent nodes can not start yet."""
+        return (
+            self.fetch_failed
+            or not self.prepared
+            or len(self.types_to_install) > 0
+            or any(t.install_type.has_impact_on_children for t in self.running_types)
+        )
 
     def __str__(self):
         return f"InstallNode: {self.pakkage_config.id} ({self.types_to_install})"
@@ -45,7 +93,7 @@ class InstallNode:
 class InstallGraph:
     """Graph representing the dependency tree as nodes of pakkage configs to be installed."""
 
-    def __init__(self, pakkages_to_install: list[Pakkage], deptree: DependencyTree):
+    def __init__(self, pakkages_to_install: list[Pakkage], deptree: DependencyTree, prepared: bool = True):
         """Initialize the install graph for the given pakkages to install and resolved dependency tree.
 
         Parameters
@@ -54,6 +102,8 @@ class InstallGraph:
             Pakkages to install.
         deptree : DependencyTree
             The resolved dependency tree.
+        prepared : bool
+            If False, the nodes must be prepared with `InstallNode.prepare` as soon as their pakkage is fetched.
         """
 
         self.deptree = deptree
@@ -63,22 +113,10 @@ class InstallGraph:
         self.package_ids_to_install = set([p.id for p in pakkages_to_install])
         """Set of pakkage ids to install."""
 
-        self.install_tree: nx.DiGraph = deptree.tree.copy()  # type: ignore
+        self.install_tree: DependencyGraph = deptree.tree.subgraph(p.id for p in pakkages_to_install)
         """The directed graph representing the dependency tree only with nodes that needs to be installed."""
-        self.install_tree_reverse: nx.DiGraph = deptree.tree_reverse.copy()  # type: ignore
-        """The reversed directed graph representing the dependency tree only with nodes that needs to be installed."""
-
-        # Remove all nodes that are not in the pakkages_to_install list
-        nodes_to_remove = set()
-        for node_id in self.install_tree.nodes:
-            if node_id not in self.package_ids_to_install:
-                nodes_to_remove.add(node_id)
-
-        for node_id in nodes_to_remove:
-            self.install_tree.remove_node(node_id)
-            self.install_tree_reverse.remove_node(node_id)
 
-        generations = nx.algorithms.dag.topological_generations(self.install_tree)
+        generations = self.install_tree.topological_generations()
         self.sorted_generations: list[list[str]] = [sorted(generation) for generation in generations]
         """List of sorted generations of pakkages to install."""
         self.topological_sorted = [node for generation in self.sorted_generations for node in generation]
@@ -98,9 +136,28 @@ class InstallGraph:
                 if p.id in generation:
                     break
 
-            install_node = InstallNode(v, depth)
+            install_node = InstallNode(v, depth, prepared)
             self.install_nodes[p.id] = install_node
 
+        # Scheduling state, updated incrementally with `update_node` whenever the state of a node changes
+        self._blocks_parents: dict[str, bool] = {n: node.blocks_parents for n, node in self.install_nodes.items()}
+        """Cached `InstallNode.blocks_parents` of every node."""
+        self._num_blocking_children: dict[str, int] = {
+            n: sum(1 for c in self.install_tree.successors(n) if self._blocks_parents[c]) for n in self.install_nodes
+        }
+        """Number of children blocking the installation of every node."""
+        self._ready_nodes: dict[type[TypeBase], dict[str, InstallNode]] = {}
+        """Installable nodes without blocking children by the class of their next type."""
+        self._ready_class: dict[str, type[TypeBase]] = {}
+        self._ready_queue: list[tuple[int, int, str]] = []
+        """Heap of the ready nodes keyed by the install priority of their next type."""
+        self._ready_counter = itertools.count()
+        self._ready_entries: dict[str, int] = {}
+        """Counter of the valid heap entry of every ready node, older entries are skipped."""
+
+        for node in self.install_nodes.values():
+            self._update_readiness(node)
+
     @property
     def unfinished_nodes(self):
         """List of unfinished install nodes."""
@@ -146,10 +203,115 @@ class InstallGraph:
             if not child.is_finished:
                 yield child
 
+    def blocking_children_of_node(self, node: str | InstallNode):
+        """Children of the given node that block the installation of the node."""
+        for child in self.children_of_node(node):
+            if child.blocks_parents:
+                yield child
+
     def __iter__(self):
         for node in self.topological_sorted:
             yield self.install_nodes[node]
 
+    def _is_ready(self, node: InstallNode) -> bool:
+        return (
+            node.prepared
+            and not node.fetch_failed
+            and not node.is_running
+            and len(node.types_to_install) > 0
+            and self._num_blocking_children[node.pakkage_config.id] == 0
+        )
+
+    def _update_readiness(self, node: InstallNode):
+        node_id = node.pakkage_config.id
+        old_class = self._ready_class.pop(node_id, None)
+        if old_class is not None:
+            del self._ready_nodes[old_class][node_id]
+            del self._ready_entries[node_id]
+
+        if self._is_ready(node):
+            t = node.types_to_install[0]
+            self._ready_class[node_id] = t.__class__
+            self._ready_nodes.setdefault(t.__class__, {})[node_id] = node
+
+            entry = next(self._ready_counter)
+            self._ready_entries[node_id] = entry
+            heapq.heappush(self._ready_queue, (-t.install_type.install_priority, entry, node_id))
+
+    def update_node(self, node: InstallNode):
+        """
+        Update the scheduling state after the state of the node changed,
+        i.e. it got prepared, types were taken for installation or finished.
+        Only the node and its parents are updated, thus scheduling is linear in the size of the graph.
+        """
+        node_id = node.pakkage_config.id
+        blocks = node.blocks_parents
+        if blocks != self._blocks_parents[node_id]:
+            self._blocks_parents[node_id] = blocks
+            for parent in self.parents_of_node(node_id):
+                self._num_blocking_children[parent.pakkage_config.id] += 1 if blocks else -1
+                self._update_readiness(parent)
+
+        self._update_readiness(node)
+
+    def select_ready_nodes(self, conflicts: Callable[[type[TypeBase]], bool]) -> list[InstallNode]:
+        """
+        Get the ready nodes whose next type has the highest install priority and does not conflict.
+        All returned nodes share the same class of their next type. The nodes stay ready until they are updated.
+
+        Parameters
+        ----------
+        conflicts: Callable[[type[TypeBase]], bool]
+            Returns True if the given type class can not be installed right now.
+        """
+        skipped: list[tuple[int, int, str]] = []
+        selected: list[InstallNode] = []
+
+        while len(self._ready_queue) > 0:
+            item = heapq.heappop(self._ready_queue)
+            node_id = item[2]
+            if self._ready_entries.get(node_id) != item[1]:
+                # Outdated entry of a node that changed in the meantime
+                continue
+
+            skipped.append(item)
+            type_class = self._ready_class[node_id]
+            if not conflicts(type_class):
+                selected = list(self._ready_nodes[type_class].values())
+                break
+
+        for item in skipped:
+            heapq.heappush(self._ready_queue, item)
+
+        return selected
+
+
+class InstallBatch:
+    """Types of the same type class that are installed together by one worker."""
+
+    def __init__(self, type_class: type[TypeBase], types: list[TypeBase], nodes: list[InstallNode]):
+        self.type_class = type_class
+        self.types = types
+        self.nodes = nodes
+        """Install nodes the types belong to."""
+
+    def conflicts_with(self, type_class: type[TypeBase]) -> bool:
+        """Return if an installation of the given type class can not run simultaneously with this batch."""
+        if type_class == self.type_class and not type_class.allows_multiple_simultaneous_installations():
+            return True
+        return len(type_class.EXCLUSIVE_RESOURCES & self.type_class.EXCLUSIVE_RESOURCES) > 0
+
+    def start(self):
+        for t in self.types:
+            next(n for n in self.nodes if n.pakkage_config is t.pakkage_version).running_types.append(t)
+
+    def finish(self):
+        for node in self.nodes:
+            node.running_types = [t for t in node.running_types if t not in self.types]
+
+    def install(self):
+        self.type_class.supervised_installation(self.types)
+
 
 class InstallerCombining(Module):
     """
@@ -250,119 +412,245 @@ class InstallerCombining(Module):
 
                 pakkage.versions.installed = None
 
-    def install(self) -> dict[str, Pakkage]:
-        """Install all the packages with the configured setup and installation modules."""
+            InstalledStateIndex.update([], [p.id for p in self.pakkages_to_uninstall])
 
-        if len(self.pakkages_to_install) > 0:
-            Module.print_rule(f"Installing pakkages")
-            logger.info(f"Installing {len(self.pakkages_to_install)} packages...")
+    @staticmethod
+    def _print_status(pakkage_name, info):
+        logger.info(f"[cyan]{pakkage_name}[/cyan]: {info}")
 
-            def callback(pakkage_name, info):
-                logger.info(f"[cyan]{pakkage_name}[/cyan]: {info}")
+    def _prepare_nodes(self, install_graph: InstallGraph, nodes: list[InstallNode]) -> list[InstallBatch]:
+        """
+        Move the fetched pakkages of the nodes to the installed dir and load their types.
 
-            # Move to installed dir and reset failed types
-            for pakkage in self.pakkages_to_install:
-                v = pakkage.versions.target
-                if v is None:
-                    raise ValueError(f"Target version of {pakkage.name} is None")
+        Returns
+        -------
+        list[InstallBatch]
+            The batches of the types that can be installed independently from dependencies.
+            They are taken from the nodes, so the nodes wait for them, and must be scheduled with `_select_next_batch`.
+        """
+        for node in nodes:
+            v = node.pakkage_config
+
+            new_dir = self.all_pakkges_dir
+            logger.debug(f"Moving {v.name} to {new_dir}")
+            v.move_to(new_dir)
+
+            # Reset failed types
+            v.state.failed_types.clear()
+
+            if not node.prepared:
+                node.prepare()
+
+        independent_types: dict[type[TypeBase], list[TypeBase]] = {}
+        # Iter all nodes and select types that can be installed independently from dependencies
+        for node in nodes:
+            while len(node.types_to_install) > 0:
+                t = node.types_to_install[0]
+                if t.install_type.is_independent:
+                    if t.__class__ not in independent_types:
+                        independent_types[t.__class__] = []
+                    independent_types[t.__class__].append(t)
+                    node.types_to_install.remove(t)
+                else:
+                    break
 
-                new_dir = self.all_pakkges_dir
-                logger.debug(f"Moving {v.name} to {new_dir}")
-                v.move_to(new_dir)
+        batches: list[InstallBatch] = []
+        for type_, type_list in independent_types.items():
+            type_nodes = [n for n in nodes if any(t.pakkage_version is n.pakkage_config for t in type_list)]
+            batch = InstallBatch(type_, type_list, type_nodes)
+            batch.start()
+            batches.append(batch)
 
-                # Reset failed types
-                v.state.failed_types.clear()
+        for node in nodes:
+            install_graph.update_node(node)
 
-            install_graph = InstallGraph(self.pakkages_to_install, self.deptree)
+        return batches
 
-            independent_types: dict[type[TypeBase], list[TypeBase]] = {}
-            # Iter all nodes and select types that can be installed independently from dependencies
-            for node in install_graph.unfinished_nodes:
-                while len(node.types_to_install) > 0:
-                    t = node.types_to_install[0]
-                    if t.install_type.is_independent:
-                        if t.__class__ not in independent_types:
-                            independent_types[t.__class__] = []
-                        independent_types[t.__class__].append(t)
-                        node.types_to_install.remove(t)
-                    else:
+    def _select_next_batch(
+        self, install_graph: InstallGraph, running: list[InstallBatch], independent: list[InstallBatch]
+    ) -> InstallBatch | None:
+        """
+        Select the next batch that can be installed simultaneously to the running batches.
+        The pending batches of independent types are installed first,
+        then the next types of the leaf nodes, i.e. the prepared nodes without blocking children.
+
+        Parameters
+        ----------
+        running: list[InstallBatch]
+            The batches that are currently installed by the workers.
+        independent: list[InstallBatch]
+            The pending batches of independent types, see `_prepare_nodes`. The selected batch is removed.
+
+        Returns
+        -------
+        InstallBatch | None
+            The next batch to install or None if there is no installable batch.
+        """
+
+        for batch in independent:
+            if not any(b.conflicts_with(batch.type_class) for b in running):
+                independent.remove(batch)
+                return batch
+        if len(independent) > 0:
+            # Install the independent types before the dependent types of their nodes and parents
+            return None
+
+        # Select the ready leaf nodes with the highest priority, the types of a node are installed one after another
+        selected_leaf_nodes = install_graph.select_ready_nodes(lambda c: any(b.conflicts_with(c) for b in running))
+        if len(selected_leaf_nodes) == 0:
+            return None
+
+        # Install the top types
+        leaf_node = selected_leaf_nodes[0]
+        top_type = leaf_node.types_to_install[0]
+
+        top_types_to_install: list[TypeBase] = []
+        selected_nodes = selected_leaf_nodes.copy()
+
+        # If selected installation does not allow combination with other installations of the same type on the children:
+        if not top_type.install_type.is_combinable_with_children:
+            # Select and remove the top types from the leaf nodes
+            for node in selected_leaf_nodes:
+                top_types_to_install.append(node.types_to_install.pop(0))
+
+        # If selected installation allows combination with other installations of the same type on the children:
+        else:
+            i = 0
+
+            # For each of the selected nodes:
+            #   If the installation type is the last in the node (ignoring TypeGeneric) then:
+            #     -> select all nodes having installations of the same type as next coming installation
+            #        from all child nodes and add them to selected nodes
+            while i < len(selected_nodes):
+                node = selected_nodes[i]
+                if len(node.types_to_install) == 0:
+                    i += 1
+                    continue
+                if node.types_to_install[0].__class__ == top_type.__class__:
+                    top_types_to_install.append(node.types_to_install.pop(0))
+
+                # if len(node.types_to_install) == 1 and node.types_to_install[0].__class__ == TypeGeneric or len(node.types_to_install) == 0:
+
+                if len(node.types_to_install) == 0 or all(
+                    [not t.install_type.has_impact_on_children for t in node.types_to_install]
+                ):
+                    parents = list(install_graph.parents_of_node(node))
+                    for parent in parents:
+                        if (
+                            len(parent.types_to_install) > 0
+                            and parent.types_to_install[0].__class__ == top_type.__class__
+                            and not parent.is_running
+                            and parent not in selected_nodes
+                            # Other children of the parent may not be fetched yet or still be installed by a worker
+                            and all(
+                                c.prepared and not c.fetch_failed and not c.is_running
+                                for c in install_graph.children_of_node(parent)
+                            )
+                        ):
+                            selected_nodes.append(parent)
+
+                i += 1
+
+        for t in top_types_to_install:
+            t.status_callback = self._print_status
+
+        batch = InstallBatch(top_type.__class__, top_types_to_install, selected_nodes)
+        batch.start()
+        for node in selected_nodes:
+            install_graph.update_node(node)
+        return batch
+
+    def _install_graph(self, install_graph: InstallGraph, fetch_pipeline: FetchPipeline | None):
+        """
+        Install the nodes of the graph with a pool of workers.
+        Batches of different type classes are installed simultaneously,
+        if their installations do not conflict (see `TypeBase.EXCLUSIVE_RESOURCES`).
+        If a fetch pipeline is given, the nodes are installed as soon as their pakkages are fetched.
+        """
+        num_workers = max(1, self.config.install.num_install_workers.value)
+
+        if fetch_pipeline is None:
+            ready_nodes = list(install_graph)
+        else:
+            # Pakkages that are not fetched by the pipeline (e.g. reinstalled versions) are ready right away
+            ready_nodes = [n for n in install_graph if n.pakkage_config.id not in fetch_pipeline.pending_ids]
+
+        running: dict[Future, InstallBatch] = {}
+        independent: list[InstallBatch] = []
+        with ThreadPoolExecutor(num_workers) as executor:
+            while True:
+                independent.extend(self._prepare_nodes(install_graph, ready_nodes))
+                ready_nodes = []
+
+                while len(running) < num_workers:
+                    batch = self._select_next_batch(install_graph, list(running.values()), independent)
+                    if batch is None:
                         break
+                    running[executor.submit(batch.install)] = batch
 
-            # Execute these installations first
-            for type_, type_list in independent_types.items():
-                type_.supervised_installation(type_list)
-
-            # After that: while there are still unfinished nodes:
-            while len(unfinished_nodes := list(install_graph.unfinished_nodes)) > 0:
-                # Select all leaf nodes
-                leaf_nodes = [
-                    n for n in unfinished_nodes if len(list(install_graph.unfinished_children_of_node(n))) == 0
-                ]
-                # Get the top bubble of each leaf node
-                top_types = [(node, node.types_to_install[0]) for node in leaf_nodes]
-                # Sort the top_type installations by priority
-                top_types.sort(key=lambda t: t[1].install_type.install_priority, reverse=True)
-
-                # If the top bubble types differ, select the top bubble with the highest install priority
-                selected_leaf_nodes: list[InstallNode] = []
-                top_type_type = None
-                for node, t in top_types:
-                    if top_type_type is None:
-                        top_type_type = t.__class__
-                    if t.__class__ == top_type_type:
-                        selected_leaf_nodes.append(node)
-
-                # Install the top types
-                if len(selected_leaf_nodes) > 0:
-                    leaf_node = selected_leaf_nodes[0]
-                    top_type = leaf_node.types_to_install[0]
-
-                    top_types_to_install: list[TypeBase] = []
-
-                    # If selected installation does not allow combination with other installations of the same type on the children:
-                    if not top_type.install_type.is_combinable_with_children:
-                        # Select and remove the top types from the leaf nodes
-                        for node in selected_leaf_nodes:
-                            top_types_to_install.append(node.types_to_install.pop(0))
-
-                        for t in top_types_to_install:
-                            t.status_callback = callback
-                        top_type.supervised_installation(top_types_to_install)
-                    # If selected installation allows combination with other installations of the same type on the children:
-                    else:
-                        i = 0
-                        selected_nodes = selected_leaf_nodes.copy()
-
-                        # For each of the selected nodes:
-                        #   If the installation type is the last in the node (ignoring TypeGeneric) then:
-                        #     -> select all nodes having installations of the same type as next coming installation
-                        #        from all child nodes and add them to selected nodes
-                        while i < len(selected_nodes):
-                            node = selected_nodes[i]
-                            if len(node.types_to_install) == 0:
-                                continue
-                            if node.types_to_install[0].__class__ == top_type.__class__:
-                                top_types_to_install.append(node.types_to_install.pop(0))
-
-                            # if len(node.types_to_install) == 1 and node.types_to_install[0].__class__ == TypeGeneric or len(node.types_to_install) == 0:
-
-                            if len(node.types_to_install) == 0 or all(
-                                [not t.install_type.has_impact_on_children for t in node.types_to_install]
-                            ):
-                                parents = list(install_graph.parents_of_node(node))
-                                for parent in parents:
-                                    if (
-                                        len(parent.types_to_install) > 0
-                                        and parent.types_to_install[0].__class__ == top_type.__class__
-                                    ):
-                                        # TODO: It should work without checking if the parent node is already in the list, but maybe add this check later
-                                        selected_nodes.append(parent)
-
-                            i += 1
-
-                        for t in top_types_to_install:
-                            t.status_callback = callback
-                        top_type.supervised_installation(top_types_to_install)
+                fetching = fetch_pipeline is not None and len(fetch_pipeline.pending_ids) > 0
+                if len(running) == 0 and len(independent) == 0 and not fetching:
+                    break
+
+                if len(running) > 0:
+                    # While fetching, check the fetch state periodically
+                    done, _ = wait(
+                        running.keys(),
+                        timeout=FetchPipeline.POLL_INTERVAL if fetching else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        batch = running.pop(future)
+                        batch.finish()
+                        for node in batch.nodes:
+                            install_graph.update_node(node)
+                        future.result()
+
+                if fetch_pipeline is not None:
+                    # Only block if there is nothing else to do until the next fetch is finished
+                    fetched, failed = fetch_pipeline.wait_for_fetched(block=len(running) == 0)
+                    ready_nodes = [
+                        install_graph.install_nodes[p.id] for p in fetched if p.id in install_graph.install_nodes
+                    ]
+
+                    # Failed nodes keep blocking their parents, which are reported as failed after the installation
+                    for pakkage in failed:
+                        node = install_graph.install_nodes.get(pakkage.id)
+                        if node is not None:
+                            node.pakkage_config.state.failed_types.append(InstallNode.FETCH_FAILED)
+                            install_graph.update_node(node)
+
+    def install(self, fetch_pipeline: FetchPipeline | None = None) -> dict[str, Pakkage]:
+        """
+        Install all the packages with the configured setup and installation modules.
+
+        Parameters
+        ----------
+        fetch_pipeline: FetchPipeline | None
+            If given, the pakkages are still fetched by the started pipeline and
+            each pakkage is installed as soon as it is fetched and its dependencies are installed.
+            Otherwise, all pakkages must be fetched before.
+        """
+
+        if len(self.pakkages_to_install) > 0:
+            if fetch_pipeline is None:
+                Module.print_rule(f"Installing pakkages")
+            logger.info(f"Installing {len(self.pakkages_to_install)} packages...")
+
+            for pakkage in self.pakkages_to_install:
+                if pakkage.versions.target is None:
+                    raise ValueError(f"Target version of {pakkage.name} is None")
+
+            # The nodes are prepared as soon as their pakkages are fetched
+            install_graph = InstallGraph(self.pakkages_to_install, self.deptree, prepared=False)
+            self._install_graph(install_graph, fetch_pipeline)
+
+            for node in install_graph.unfinished_nodes:
+                if not node.fetch_failed:
+                    logger.error(f"Dependencies of {node.pakkage_config.id} could not be installed.")
+                    if not node.prepared:
+                        node.pakkage_config.state.failed_types.append(InstallNode.FETCH_FAILED)
+                node.pakkage_config.state.failed_types.extend(t.__class__.__name__ for t in node.types_to_install)
 
             # Finish the installation by saving the install state
             for pakkage in self.pakkages_to_install:
@@ -374,7 +662,8 @@ class InstallerCombining(Module):
                 if len(version.state.failed_types) > 0:
                     logger.error(f"Installation of {version.id} failed.")
                     version.state.install_state = PakkageInstallState.FAILED
-                    version.save_state()
+                    if version.local_path is not None:
+                        version.save_state()
                     continue
 
                 pakkage.versions.installed = version
@@ -389,6 +678,8 @@ class InstallerCombining(Module):
 
                 logger.info(f"Finished installation of {pakkage.name}.")
 
+            InstalledStateIndex.update([p.versions.target for p in self.pakkages_to_install if p.versions.target])
+
             Logger.get_console().print("")
 
         elif len(self.pakkages_to_install) == 0:
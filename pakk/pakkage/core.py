@@ -11,6 +11,7 @@ import shutil
 import subprocess
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Callable
 from typing import Type
 
 import dotenv
@@ -725,20 +726,87 @@ class PakkageConfig:
         return self.id < other.id
 
 
+class PakkageVersionDescriptor:
+    """
+    Lightweight placeholder for a discovered pakkage version.
+    Only the identity, version and dependency ranges needed by the resolver are stored,
+    the full PakkageConfig is built with the given factory when it is needed (e.g. when the version becomes a target).
+    Accessing any other attribute of the descriptor materializes the config and delegates to it.
+    """
+
+    _OWN_ATTRIBUTES = {"id", "version", "dependencies", "connector_attributes", "_factory", "_config"}
+
+    def __init__(
+        self,
+        id: str,
+        version: str,
+        dependencies: dict[str, str],
+        factory: Callable[[], PakkageConfig],
+    ):
+        self.id: str = id
+        """The ID of the pakkage. E.g. ros2-motors"""
+        self.version: str = version
+        """The version of the pakkage. E.g. 0.1.0"""
+        self.dependencies: dict[str, str] = dependencies
+        """The dependencies of the pakkage. E.g. {"ros2": "0.1.0"}"""
+        self.connector_attributes: dict[str, ConnectorAttributes] = dict()
+        """Custom connector attributes stored during discovery process."""
+
+        self._factory = factory
+        self._config: PakkageConfig | None = None
+
+    def set_attributes(self, connector: Connector, attributes: ConnectorAttributes):
+        self.connector_attributes[connector.connector_attributes_key] = attributes
+
+    def get_attributes(self, connector: Connector) -> ConnectorAttributes | None:
+        return self.connector_attributes.get(connector.connector_attributes_key, None)
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._config is not None
+
+    def materialize(self) -> PakkageConfig:
+        """Build the full pakkage config of this version (only once) and return it."""
+        if self._config is None:
+            config = self._factory()
+            config.connector_attributes.update(self.connector_attributes)
+            self._config = config
+        return self._config
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not stored in the descriptor itself
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        if name in PakkageVersionDescriptor._OWN_ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.materialize(), name, value)
+
+    def __str__(self):
+        return f"{self.id}@{self.version}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class PakkageVersions:
     def __init__(
         self,
-        available: list[PakkageConfig] | dict[str, PakkageConfig] | None = None,
+        available: list[PakkageConfig] | dict[str, PakkageConfig | PakkageVersionDescriptor] | None = None,
         installed: PakkageConfig | None = None,
         target: PakkageConfig | None = None,
     ):
         if isinstance(available, list):
-            self.available: dict[str, PakkageConfig] = dict()
+            self.available: dict[str, PakkageConfig | PakkageVersionDescriptor] = dict()
             for pakkage_config in available:
                 pakkage_config: PakkageConfig
                 self.available[pakkage_config.version] = pakkage_config
         else:
-            self.available: dict[str, PakkageConfig] = available or dict()
+            self.available: dict[str, PakkageConfig | PakkageVersionDescriptor] = available or dict()
+        """Available versions of the pakkage. Discovered versions may be stored as lightweight descriptors."""
 
         self.installed: PakkageConfig | None = installed
         """Installed version of the pakkage."""
@@ -763,6 +831,17 @@ class PakkageVersions:
         True if the pakkage installation is a fix for a missing pakkage as dependency of an installed pakkage.
         """
 
+    def get_available(self, version: str) -> PakkageConfig | None:
+        """
+        Return the full pakkage config of the given available version.
+        If the version is only stored as descriptor, the config is materialized and replaces the descriptor.
+        """
+        available_version = self.available.get(version, None)
+        if isinstance(available_version, PakkageVersionDescriptor):
+            available_version = available_version.materialize()
+            self.available[version] = available_version
+        return available_version
+
     def is_installed(self) -> bool:
         """Returns true if the pakkage is installed."""
         return self.installed is not None
@@ -815,22 +894,28 @@ class Pakkage:
         elif len(self.versions.available) > 0:
             info_version = list(self.versions.available.values())[0]
 
+        self._info_version: PakkageConfig | PakkageVersionDescriptor | None = info_version
+
         self.id: str = "" if info_version is None else info_version.id
         """The id of the pakkage. This is used to identify the pakkages in the CLI commands
          and the same as the id in the pakkage config file."""
 
-        self.name: str = "" if info_version is None else info_version.name
-        """The name of the pakkage."""
-
-        self.description: str = "" if info_version is None else info_version.description
-        """If available, the description of the pakkage."""
-
         # self.attributes: dict[str, Any] = dict()
         # """Custom attributes for following modules."""
 
         # self.connector_attributes: dict[Type[Connector], ConnectorAttributes] = dict()
         # """Custom connector attributes stored during discovery process."""
 
+    @property
+    def name(self) -> str:
+        """The name of the pakkage."""
+        return "" if self._info_version is None else self._info_version.name
+
+    @property
+    def description(self) -> str:
+        """If available, the description of the pakkage."""
+        return "" if self._info_version is None else self._info_version.description
+
     def __str__(self):
         s = f"{self.id} @ {self.versions.installed.version if self.versions.installed else 'None'}"
         if (
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any
+
+import jsons
+
+from pakk.config.main_cfg import MainConfig
+from pakk.pakkage.core import CompactPakkageConfig
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageState
+
+logger = logging.getLogger(__name__)
+
+
+class InstalledStateIndex:
+    """
+    Index of the pakkages in the all pakkages dir with their parsed configs and states.
+
+    Discovering the installed pakkages requires parsing the pakk config and the state file of every directory.
+    The index stores the results in a single file in the cache dir, thus read-only commands start with one file read.
+    The index is written by the installer and uninstaller and after every full scan.
+    It is stale if the directories of the all pakkages dir or the modification times of the state files changed,
+    e.g. after manual changes or changes by other tools, then the directories are scanned again.
+    """
+
+    FILE_NAME = "installed_index.json"
+    """Name of the index file in the cache dir."""
+
+    VERSION = 1
+    """Version of the index format, indices of other versions are ignored."""
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_path() -> str:
+        return os.path.join(MainConfig.get_config().paths.cache_dir.value, InstalledStateIndex.FILE_NAME)
+
+    @staticmethod
+    def get_all_pakkages_dir() -> str:
+        return MainConfig.get_config().paths.all_pakkages_dir.value
+
+    @staticmethod
+    def _get_mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _get_state_path(path: str) -> str:
+        return os.path.join(path, PakkageState.DIRECTORY_NAME, PakkageState.JSON_FILE_NAME)
+
+    @staticmethod
+    def _list_dirs(directory: str) -> list[str]:
+        try:
+            with os.scandir(directory) as it:
+                return sorted(e.name for e in it if e.is_dir())
+        except OSError:
+            return []
+
+    #############################################################
+    ### Serialization
+    #############################################################
+
+    @staticmethod
+    def _to_entry(config: PakkageConfig) -> dict[str, Any]:
+        if config.local_path is None:
+            raise ValueError(f"Pakkage {config.id} has no local path")
+
+        compact = CompactPakkageConfig.from_pakkage_config(config)
+        return {
+            "id": config.id,
+            "version": config.version,
+            "dir": os.path.basename(config.local_path),
+            "state_mtime": InstalledStateIndex._get_mtime(InstalledStateIndex._get_state_path(config.local_path)),
+            "state": jsons.dump(config.state),
+            "info": {
+                "name": compact.name,
+                "description": compact.description,
+                "author": compact.author,
+                "keywords": compact.keywords,
+                "license": compact.license,
+                "dependencies": compact.dependencies,
+            },
+            "cfg": {section: compact.options[section] for section in compact.cfg_sections},
+        }
+
+    @staticmethod
+    def _from_entry(entry: dict[str, Any], directory: str) -> PakkageConfig:
+        compact = CompactPakkageConfig()
+        compact.id = entry["id"]
+        compact.version = entry["version"]
+        for key, value in entry["info"].items():
+            setattr(compact, key, value)
+        compact.cfg_sections = list(entry["cfg"].keys())
+        compact.options = entry["cfg"]
+
+        config = PakkageConfig.from_compact_pakkage_config(compact)
+        config.local_path = os.path.join(directory, entry["dir"])
+        config.state = jsons.load(entry["state"], PakkageState)
+        return config
+
+    #############################################################
+    ### Reading and writing
+    #############################################################
+
+    @staticmethod
+    def _load_data() -> dict[str, Any] | None:
+        path = InstalledStateIndex.get_path()
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not load installed index {path}: {e}")
+            return None
+
+        if data.get("version") != InstalledStateIndex.VERSION:
+            return None
+        if data.get("directory") != InstalledStateIndex.get_all_pakkages_dir():
+            return None
+        return data
+
+    @staticmethod
+    def _write_data(entries: dict[str, dict[str, Any]], ignored_dirs: list[str]):
+        """Write the index atomically, the modification time of the directory is only stored if the listing fits."""
+        directory = InstalledStateIndex.get_all_pakkages_dir()
+        dir_mtime = InstalledStateIndex._get_mtime(directory)
+
+        listing = sorted([e["dir"] for e in entries.values()] + ignored_dirs)
+        if listing != InstalledStateIndex._list_dirs(directory):
+            dir_mtime = None
+
+        data = {
+            "version": InstalledStateIndex.VERSION,
+            "directory": directory,
+            "dir_mtime": dir_mtime,
+            "ignored_dirs": ignored_dirs,
+            "entries": entries,
+        }
+
+        path = InstalledStateIndex.get_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _is_fresh(data: dict[str, Any]) -> bool:
+        directory = data["directory"]
+        entries: dict[str, dict[str, Any]] = data["entries"]
+
+        # Any added, removed or renamed directory changes the mtime of the all pakkages dir
+        if data["dir_mtime"] is None or data["dir_mtime"] != InstalledStateIndex._get_mtime(directory):
+            listing = sorted([e["dir"] for e in entries.values()] + data["ignored_dirs"])
+            if listing != InstalledStateIndex._list_dirs(directory):
+                return False
+
+        # The states are changed in place, e.g. by enabling the autostart
+        for entry in entries.values():
+            state_path = InstalledStateIndex._get_state_path(os.path.join(directory, entry["dir"]))
+            if InstalledStateIndex._get_mtime(state_path) != entry["state_mtime"]:
+                return False
+
+        return True
+
+    @staticmethod
+    def load() -> list[PakkageConfig] | None:
+        """Load the configs of the pakkages in the all pakkages dir or None if the index is missing or stale."""
+        data = InstalledStateIndex._load_data()
+        if data is None or not InstalledStateIndex._is_fresh(data):
+            return None
+
+        try:
+            return [InstalledStateIndex._from_entry(e, data["directory"]) for e in data["entries"].values()]
+        except Exception as e:
+            logger.debug(f"Could not read installed index: {e}")
+            return None
+
+    @staticmethod
+    def save(configs: list[PakkageConfig], ignored_dirs: list[str]):
+        """
+        Store the configs found by a full scan of the all pakkages dir.
+
+        Parameters
+        ----------
+        configs: list[PakkageConfig]
+            The configs of the pakkage directories.
+        ignored_dirs: list[str]
+            The names of the directories without pakkage config.
+        """
+        with InstalledStateIndex._lock:
+            try:
+                entries = {}
+                for c in configs:
+                    entry = InstalledStateIndex._to_entry(c)
+                    entries[entry["dir"]] = entry
+                InstalledStateIndex._write_data(entries, sorted(ignored_dirs))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not write installed index: {e}")
+
+    @staticmethod
+    def update(saved: list[PakkageConfig], removed_ids: list[str] | None = None):
+        """
+        Update the index after the installer or uninstaller changed pakkages.
+        Pakkages that are not located in the all pakkages dir (anymore) are removed from the index.
+        Without an existing index nothing is written, the next discovery creates it with a full scan.
+
+        Parameters
+        ----------
+        saved: list[PakkageConfig]
+            The pakkages whose state was saved.
+        removed_ids: list[str] | None
+            The ids of the pakkages that were moved out of the all pakkages dir.
+        """
+        with InstalledStateIndex._lock:
+            data = InstalledStateIndex._load_data()
+            if data is None:
+                return
+
+            directory = data["directory"]
+            ids_to_remove = set(removed_ids or []) | set(c.id for c in saved)
+            entries: dict[str, dict[str, Any]] = {
+                d: e for d, e in data["entries"].items() if e["id"] not in ids_to_remove
+            }
+
+            try:
+                for config in saved:
+                    path = config.local_path
+                    if path is not None and os.path.dirname(os.path.normpath(path)) == os.path.normpath(directory):
+                        entry = InstalledStateIndex._to_entry(config)
+                        entries[entry["dir"]] = entry
+
+                InstalledStateIndex._write_data(entries, data["ignored_dirs"])
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not update installed index: {e}")
+                InstalledStateIndex.clear()
+
+    @staticmethod
+    def clear():
+        path = InstalledStateIndex.get_path()
+        if os.path.exists(path):
+            os.remove(path)
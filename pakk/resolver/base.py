@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import nodesemver
+import logging
 
 from pakk.connector.base import PakkageCollection
 from pakk.dependency_tree.tree import DependencyTree
@@ -8,6 +8,9 @@ from pakk.dependency_tree.tree_printer import TreePrinter
 from pakk.logger import Logger
 from pakk.module import Module
 from pakk.pakkage.core import Pakkage
+from pakk.resolver.version_index import VersionIndex
+
+logger = logging.getLogger(__name__)
 
 
 class Resolver(Module):
@@ -21,36 +24,94 @@ class Resolver(Module):
 
     @staticmethod
     def fits_version(version: str, version_ranges: list[str]) -> bool:
-        for ver_range_str in version_ranges:
-            ver_range = nodesemver.Range(ver_range_str, loose=True)
-            if not ver_range.test(version):
-                return False
-        return True
+        return VersionIndex.fits(version, version_ranges)
+
+
+Requirement = tuple[str, str | None, str | None]
+"""Id of a parent pakkage, its target version and the version range it requires of the conflicting pakkage."""
+
+
+def get_requirements(pakkage: Pakkage, parent_pakkages: list[Pakkage]) -> list[Requirement]:
+    """Get the current requirements of the parent pakkages on the given pakkage."""
+    requirements: list[Requirement] = []
+    for pp in parent_pakkages:
+        target = pp.versions.target
+        if target is None:
+            requirements.append((pp.id, None, None))
+        else:
+            requirements.append((pp.id, target.version, target.dependencies.get(pakkage.id)))
+    return requirements
+
+
+class ResolverConflict(Exception):
+    """
+    Lightweight signal of a pakkage without fitting version, raised while searching for a resolution.
+    Most conflicts are caught immediately to try the next version, thus no message is formatted here.
+    The user-visible ResolverException is only built from the final conflict.
+    """
+
+    def __init__(self, pakkage: Pakkage, parent_pakkages: list[Pakkage], cause: ResolverConflict | None = None):
+        super().__init__()
+        self.pakkage = pakkage
+        self.parent_pakkages = parent_pakkages
+        self.requirements = get_requirements(pakkage, parent_pakkages)
+        """The requirements of the parents when the conflict occurred, their targets change while backtracking."""
+        self.cause = cause
+        """The last conflict of a dependency that led to this conflict."""
+
+    def get_chain(self) -> list[ResolverConflict]:
+        """Get the chain of conflicts starting with this one and ending with the innermost cause."""
+        chain: list[ResolverConflict] = []
+        conflict: ResolverConflict | None = self
+        while conflict is not None:
+            chain.append(conflict)
+            conflict = conflict.cause
+        return chain
+
+    def __str__(self):
+        return f"Conflict of {self.pakkage.id}"
 
 
 class ResolverException(Exception):
-    def __init__(self, pakkage: Pakkage, parent_pakkages: list[Pakkage], pakkages: dict[str, Pakkage] | None = None):
+    def __init__(
+        self,
+        pakkage: Pakkage,
+        parent_pakkages: list[Pakkage],
+        pakkages: dict[str, Pakkage] | None = None,
+        conflict: ResolverConflict | None = None,
+        requirements: list[Requirement] | None = None,
+    ):
         self.pakkage = pakkage
         self.parent_pakkages = parent_pakkages
         self.versions_available = list(pakkage.versions.available.keys())
         self.pakkages: dict[str, Pakkage] = pakkages or {}
+        self.conflict = conflict
+        """The conflict raised during the resolution, its chain shows the conflicts of the dependencies."""
 
         s = f"\nCould not resolve {pakkage.id}:\n"
         s += f"  Available versions: [{', '.join(self.versions_available)}]\n"
-        for pp in parent_pakkages:
-            if pp.versions.installed is not None:
-                pp_type = f"(Installed version: {pp.versions.installed.version})"
-            elif pp.versions.target is not None:
-                pp_type = f"(Target version: {pp.versions.target.version})"
-            else:
-                pp_type = ""
+        self.requirements = requirements if requirements is not None else get_requirements(pakkage, parent_pakkages)
+        """The requirements of the parent pakkages at the time of the conflict."""
 
-            dep = pp.versions.target.dependencies[pakkage.id] if pp.versions.target is not None else "NONE"
-            s += f"  -> Dependency of {pp.id} {pp_type}: {dep}\n"
+        for parent_id, parent_version, version_range in self.requirements:
+            pp_type = f"(Target version: {parent_version})" if parent_version is not None else ""
+            s += f"  -> Dependency of {parent_id} {pp_type}: {version_range or 'NONE'}\n"
 
         super().__init__(s)
 
+    @staticmethod
+    def from_conflict(conflict: ResolverConflict, pakkages: dict[str, Pakkage]) -> ResolverException:
+        """Build the user-visible exception from the final conflict of a resolution."""
+        return ResolverException(
+            conflict.pakkage, conflict.parent_pakkages, pakkages, conflict, requirements=conflict.requirements
+        )
+
     def print_msg(self):
+        if self.conflict is not None:
+            for c in self.conflict.get_chain()[1:]:
+                requirements = [f"{p} @ {v}: {r}" for p, v, r in c.requirements]
+                logger.debug(f"  caused by conflict of {c.pakkage.id} (required by {requirements})")
+
         msg = ""
 
         current_deptree = DependencyTree(self.pakkages)
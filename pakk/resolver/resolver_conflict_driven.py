@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import logging
+
+from pakk.args.install_args import UpdateStrategy
+from pakk.connector.base import PakkageCollection
+from pakk.module import Module
+from pakk.pakkage.core import Pakkage
+from pakk.resolver.base import ResolverException
+from pakk.resolver.resolver_fitting import ResolverFitting
+from pakk.resolver.version_index import VersionIndex
+
+logger = logging.getLogger(__name__)
+
+Term = tuple[str, str]
+"""A pakkage id and one of its versions, e.g. ("ros2-motors", "1.0.0")."""
+
+Incompatibility = frozenset[Term]
+"""A set of terms, that cannot be selected together."""
+
+FIXED_LEVEL = -1
+"""Decision level of the fixed targets, these assignments are never undone."""
+
+
+class Assignment:
+    """The version selected for a pakkage during the resolution."""
+
+    def __init__(self, version: str, level: int, in_closure: bool):
+        self.version = version
+        """The selected version."""
+        self.level = level
+        """The decision level, i.e. the position in the decision trail or FIXED_LEVEL."""
+        self.in_closure = in_closure
+        """True if the pakkage is a (transitive) dependency of a fixed target."""
+
+
+class ResolverConflictDriven(ResolverFitting):
+    """
+    Resolver that learns incompatibilities from conflicts instead of retrying every fitting version.
+
+    The fixed targets, all installed pakkages and the dependencies of selected versions need a version.
+    Versions are decided one pakkage at a time. If no version of a pakkage fits the selected dependents,
+    the terms causing the conflict are stored as incompatibility and the search jumps back to the latest
+    decision involved in it. The learned incompatibility prevents selecting the same combination again,
+    thus every conflict is explored only once (conflict-directed backjumping with learning, similar to PubGrub).
+
+    Dependencies of the fixed targets are sorted by the upgrade strategy like in ResolverFitting,
+    other installed pakkages keep their installed version unless a conflict requires changing it.
+    """
+
+    def __init__(self, pakkages: PakkageCollection):
+        super().__init__(pakkages)
+
+        self.assignments: dict[str, Assignment] = dict()
+        """The selected versions of the pakkages."""
+        self.trail: list[str] = list()
+        """The decided pakkage ids in the order of the decisions, the index is the decision level."""
+        self.dependents: dict[str, dict[str, str]] = dict()
+        """The required version ranges of every pakkage by the ids of the assigned dependents."""
+        self.incompatibilities: dict[Term, list[Incompatibility]] = dict()
+        """The learned incompatibilities indexed by each of their terms."""
+        self.num_conflicts = 0
+
+        self._sorted_versions: dict[str, list[str]] = dict()
+
+    #############################################################
+    ### Assignments
+    #############################################################
+
+    def _get_dependencies(self, pakkage: Pakkage, version: str) -> dict[str, str]:
+        versions = pakkage.versions
+        if versions.target is not None and versions.target_fixed and versions.target.version == version:
+            return versions.target.dependencies
+        if versions.installed is not None and versions.installed.version == version:
+            return versions.installed.dependencies
+        return versions.available[version].dependencies
+
+    def _assign(self, pakkage_id: str, version: str, level: int, in_closure: bool):
+        self.assignments[pakkage_id] = Assignment(version, level, in_closure)
+        if level != FIXED_LEVEL:
+            self.trail.append(pakkage_id)
+
+        for dependency, version_range in self._get_dependencies(self.pakkages[pakkage_id], version).items():
+            self.dependents.setdefault(dependency, dict())[pakkage_id] = version_range
+
+    def _unassign(self, pakkage_id: str):
+        assignment = self.assignments.pop(pakkage_id)
+        for dependency in self._get_dependencies(self.pakkages[pakkage_id], assignment.version):
+            self.dependents[dependency].pop(pakkage_id, None)
+
+    def _backjump(self, level: int):
+        """Undo all decisions from the given level on."""
+        while len(self.trail) > level:
+            self._unassign(self.trail.pop())
+
+    #############################################################
+    ### Decisions
+    #############################################################
+
+    def _get_sorted_versions(self, pakkage: Pakkage) -> list[str]:
+        """Get the versions of the pakkage allowed by the install config, sorted by the upgrade strategy."""
+        if pakkage.id not in self._sorted_versions:
+            versions = self.filter_and_sort_versions(pakkage, list(pakkage.versions.available.keys()))
+
+            # Keeping the installed version is always possible, even if it is not available anymore
+            installed = pakkage.versions.installed
+            if installed is not None and not pakkage.versions.target_fixed and installed.version not in versions:
+                versions.append(installed.version)
+
+            self._sorted_versions[pakkage.id] = versions
+
+        return self._sorted_versions[pakkage.id]
+
+    def _get_priority(self, pakkage_id: str) -> tuple[int, int, str]:
+        """
+        Get the priority of deciding the pakkage, lower values are decided first.
+        Dependencies of the fixed targets are decided before the remaining pakkages, so the upgrade strategy applies to them.
+        Pakkages with less versions are decided first, since they are the most constrained ones.
+        """
+        dependents = self.dependents.get(pakkage_id, dict())
+        if any(self.assignments[d].in_closure for d in dependents):
+            group = 0
+        elif len(dependents) > 0:
+            group = 1
+        else:
+            group = 2
+
+        num_versions = len(self.pakkages[pakkage_id].versions.available) if pakkage_id in self.pakkages else 0
+        return (group, num_versions, pakkage_id)
+
+    def _get_next_pakkage(self) -> str | None:
+        """Get the id of the next pakkage to decide or None if all required pakkages are assigned."""
+        required = set(p.id for p in self.pakkages.values() if p.versions.installed is not None)
+        required.update(d for d, dependents in self.dependents.items() if len(dependents) > 0)
+        required.difference_update(self.assignments.keys())
+
+        if len(required) == 0:
+            return None
+        return min(required, key=self._get_priority)
+
+    def _get_candidates(self, pakkage_id: str) -> tuple[list[str], set[Term]]:
+        """
+        Get the versions of the pakkage fitting the assigned dependents and the learned incompatibilities.
+
+        Returns
+        -------
+        tuple[list[str], set[Term]]
+            The candidates in the order of preference and the terms that excluded the other versions.
+        """
+        dependents = self.dependents.get(pakkage_id, dict())
+        reason: set[Term] = set()
+
+        if pakkage_id not in self.pakkages:
+            reason.update((d, self.assignments[d].version) for d in dependents)
+            return [], reason
+
+        pakkage = self.pakkages[pakkage_id]
+        versions = list(self._get_sorted_versions(pakkage))
+        installed = pakkage.versions.installed
+
+        in_closure = any(self.assignments[d].in_closure for d in dependents)
+        if installed is not None and installed.version in versions:
+            if not in_closure or self.install_config.upgrade_strategy == UpdateStrategy.ONLY_IF_NEEDED:
+                versions.remove(installed.version)
+                versions.insert(0, installed.version)
+
+        candidates = []
+        for version in versions:
+            excluding = [d for d, r in dependents.items() if not VersionIndex.test(version, r)]
+            if len(excluding) > 0:
+                reason.add(self._get_earliest_term(excluding))
+                continue
+
+            # The dependencies of the version must also fit the already assigned pakkages
+            excluding = [
+                d
+                for d, r in self._get_dependencies(pakkage, version).items()
+                if d in self.assignments and not VersionIndex.test(self.assignments[d].version, r)
+            ]
+            if len(excluding) > 0:
+                reason.add(self._get_earliest_term(excluding))
+                continue
+
+            incompatibility = self._get_violated_incompatibility(pakkage_id, version)
+            if incompatibility is not None:
+                reason.update(t for t in incompatibility if t[0] != pakkage_id)
+                continue
+
+            candidates.append(version)
+
+        return candidates, reason
+
+    def _get_earliest_term(self, pakkage_ids: list[str]) -> Term:
+        """
+        Get the term of the earliest assigned pakkage of the given ones.
+        A single cause per excluded version keeps the learned incompatibilities small
+        and lets the search jump back as far as possible.
+        """
+        pakkage_id = min(pakkage_ids, key=lambda p: (self.assignments[p].level, p))
+        return (pakkage_id, self.assignments[pakkage_id].version)
+
+    def _get_required_by_term(self, pakkage_id: str) -> Term | None:
+        """
+        Get the term of the earliest assigned dependent that makes the pakkage required.
+        Installed pakkages are always required, thus None is returned for them.
+        """
+        pakkage = self.pakkages.get(pakkage_id)
+        if pakkage is not None and pakkage.versions.installed is not None:
+            return None
+
+        dependents = list(self.dependents.get(pakkage_id, dict()))
+        if len(dependents) == 0:
+            return None
+        return self._get_earliest_term(dependents)
+
+    def _get_incompatibility(self, pakkage_id: str, reason: set[Term]) -> Incompatibility:
+        """
+        Get the incompatibility of a conflict of the given pakkage.
+        The reason only explains why every version of the pakkage is excluded,
+        versions excluded by their own dependencies or by learned incompatibilities are only excluded
+        if the pakkage is required at all. Thus, a dependent requiring the pakkage is part of the incompatibility,
+        unless one of the reason terms is already such a dependent.
+        """
+        dependents = self.dependents.get(pakkage_id, dict())
+        if any(p in dependents for p, _ in reason):
+            return frozenset(reason)
+
+        required_by = self._get_required_by_term(pakkage_id)
+        if required_by is None:
+            return frozenset(reason)
+        return frozenset(reason | {required_by})
+
+    def _get_violated_incompatibility(self, pakkage_id: str, version: str) -> Incompatibility | None:
+        """Get a learned incompatibility that would be violated by selecting the version."""
+        for incompatibility in self.incompatibilities.get((pakkage_id, version), []):
+            violated = True
+            for other_id, other_version in incompatibility:
+                if other_id == pakkage_id:
+                    continue
+                assignment = self.assignments.get(other_id)
+                if assignment is None or assignment.version != other_version:
+                    violated = False
+                    break
+            if violated:
+                return incompatibility
+        return None
+
+    def _learn(self, incompatibility: Incompatibility):
+        self.num_conflicts += 1
+        logger.debug(f"Learned incompatibility: {sorted(incompatibility)}")
+        for term in incompatibility:
+            self.incompatibilities.setdefault(term, list()).append(incompatibility)
+
+    #############################################################
+    ### Main methods
+    #############################################################
+
+    def _raise_conflict(self, pakkage_id: str, reason: set[Term]):
+        """Apply the current assignments to the pakkages and raise the exception of the unresolvable pakkage."""
+        if pakkage_id not in self.pakkages:
+            raise Exception(f"Dependency {pakkage_id} not found in pakkage map")
+
+        self._apply_assignments()
+        logger.debug(f"Conflict of {pakkage_id} caused by {sorted(reason)}")
+        parent_pakkages = [self.pakkages[p] for p in sorted(self.dependents.get(pakkage_id, dict()))]
+        raise ResolverException(self.pakkages[pakkage_id], parent_pakkages, self.pakkages)
+
+    def _search(self):
+        """Select a version for every required pakkage or raise a ResolverException."""
+        for pakkage in self.pakkages.values():
+            if pakkage.versions.target is not None and pakkage.versions.target_fixed:
+                self._assign(pakkage.id, pakkage.versions.target.version, FIXED_LEVEL, True)
+
+        while (pakkage_id := self._get_next_pakkage()) is not None:
+            candidates, reason = self._get_candidates(pakkage_id)
+
+            if len(candidates) > 0:
+                dependents = self.dependents.get(pakkage_id, dict())
+                in_closure = any(self.assignments[d].in_closure for d in dependents)
+                self._assign(pakkage_id, candidates[0], len(self.trail), in_closure)
+                continue
+
+            # Conflict: the terms of the incompatibility cannot be selected together
+            incompatibility = self._get_incompatibility(pakkage_id, reason)
+            levels = [self.assignments[p].level for p, _ in incompatibility]
+            if len(incompatibility) == 0 or max(levels) == FIXED_LEVEL:
+                self._raise_conflict(pakkage_id, set(incompatibility))
+
+            self._learn(incompatibility)
+            self._backjump(max(levels))
+
+    def _apply_assignments(self):
+        """Set the targets of the pakkages to the assigned versions."""
+        for pakkage_id, assignment in self.assignments.items():
+            versions = self.pakkages[pakkage_id].versions
+            if versions.target_fixed and versions.target is not None:
+                continue
+            if versions.installed is not None and versions.installed.version == assignment.version:
+                versions.target = versions.installed
+            else:
+                versions.target = versions.get_available(assignment.version)
+
+    def resolve(self, quiet=False) -> PakkageCollection:
+        """Resolve the given packages"""
+
+        if not quiet:
+            Module.print_rule(f"Resolving pakkages")
+
+        root = self.pakkage_to_be_installed
+        try:
+            self._search()
+        except ResolverException as e:
+            logger.error(f"Could not resolve {root}")
+            raise e
+
+        logger.debug(f"Resolved {len(self.assignments)} pakkages with {self.num_conflicts} conflicts")
+
+        self._apply_assignments()
+        for pakkage_id in self.assignments:
+            pakkage = self.pakkages[pakkage_id]
+            self.deptree.add_dependencies(pakkage, pakkage.versions.target)  # type: ignore
+        for pakkage_id in self.assignments:
+            self.pakkages[pakkage_id].versions.resolved = True
+
+        return self._finish_resolution(root, quiet)
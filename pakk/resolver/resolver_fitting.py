@@ -2,8 +2,6 @@ from __future__ import annotations
 
 import logging
 
-import nodesemver
-
 from pakk.args.install_args import InstallArgs
 from pakk.args.install_args import UpdateStrategy
 from pakk.connector.base import PakkageCollection
@@ -13,7 +11,9 @@ from pakk.logger import Logger
 from pakk.module import Module
 from pakk.pakkage.core import Pakkage
 from pakk.resolver.base import Resolver
+from pakk.resolver.base import ResolverConflict
 from pakk.resolver.base import ResolverException
+from pakk.resolver.version_index import VersionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -63,11 +63,7 @@ class ResolverFitting(Resolver):
         list[str]
             All versions that fit the required versions
         """
-        fitting_versions = list(available_versions)
-        for ver_range_str in required_versions:
-            ver_range = nodesemver.Range(ver_range_str, loose=True)
-            fitting_versions = [v for v in fitting_versions if ver_range.test(v)]
-        return fitting_versions
+        return VersionIndex.filter(available_versions, required_versions)
 
     def filter_and_sort_versions(self, pakkage: Pakkage, versions: list[str]) -> list[str]:
         """Filter the given versions by the install config
@@ -95,12 +91,12 @@ class ResolverFitting(Resolver):
 
         # Filter versions by install config
         if not self.install_config.allow_downgrade and installed_version:
-            versions = [v for v in versions if nodesemver.gte(v, installed_version.version, loose=True)]
+            versions = [v for v in versions if VersionIndex.gte(v, installed_version.version)]
 
         # If eager --> sort fitting_version from newest to oldest
         # If only-if-needed --> sort fitting_version from newest to oldest but put the current version first
         update_strategy = self.install_config.upgrade_strategy  # UpdateStrategy.ONLY_IF_NEEDED
-        versions = list(reversed(nodesemver.sort(versions, loose=True)))
+        versions = VersionIndex.sort(versions, reverse=True)
 
         if update_strategy == UpdateStrategy.EAGER:
             pass
@@ -125,12 +121,14 @@ class ResolverFitting(Resolver):
         root = self.pakkage_to_be_installed
         try:
             self._resolve_node(root)
-        except ResolverException as e:
+        except ResolverConflict as c:
             logger.error(f"Could not resolve {root}")
-            raise e
+            raise ResolverException.from_conflict(c, self.pakkages)
+
+        return self._finish_resolution(root, quiet)
 
-        edges = list(self.deptree.tree.edges())
-        r_edges = list(self.deptree.tree_reverse.edges())
+    def _finish_resolution(self, root: Pakkage, quiet=False) -> PakkageCollection:
+        """Mark the repairing installations, print the resolved tree and sort the pakkages topologically."""
 
         # Detect pakkages that are fixing installations and not direct successors
         # of the fixed installation pakkages
@@ -172,7 +170,7 @@ class ResolverFitting(Resolver):
         # print(f"\nResolving {pakkage.id}")
         logger.debug(f"\nResolving {pakkage}")
 
-        parent_nodes = list(self.deptree.tree_reverse.neighbors(pakkage.id))
+        parent_nodes = list(self.deptree.tree.predecessors(pakkage.id))
         parent_pakkages = [self.pakkages[pn] for pn in parent_nodes]
 
         available_versions = list(pakkage.versions.available.keys())
@@ -197,11 +195,12 @@ class ResolverFitting(Resolver):
         fitting_versions = self.filter_and_sort_versions(pakkage, fitting_versions)
 
         if len(fitting_versions) == 0:
-            raise ResolverException(pakkage, parent_pakkages, self.pakkages)
+            raise ResolverConflict(pakkage, parent_pakkages)
 
+        last_conflict: ResolverConflict | None = None
         for fitting_version in fitting_versions:
             old_target_version = pakkage.versions.target
-            new_target_version = pakkage.versions.available[fitting_version]
+            new_target_version = pakkage.versions.get_available(fitting_version)
 
             # If the target is already the same as the new fitting version, but we don't have resolved the version yet, we need to go on.
             # Otherwise, we can stop here
@@ -209,7 +208,7 @@ class ResolverFitting(Resolver):
                 break
 
             # Select version
-            pakkage.versions.target = pakkage.versions.available[fitting_version]
+            pakkage.versions.target = new_target_version
 
             # TODO Problem: we cannot store just not working versions without knowing which different versions are currently present in the graph
             # pakkage.versions.target_versions_tried.add(fitting_version)
@@ -221,9 +220,6 @@ class ResolverFitting(Resolver):
             # Add dependencies in graph
             added_deps = self.deptree.add_dependencies(pakkage, pakkage.versions.target)
 
-            edges = list(self.deptree.tree.edges())
-            r_edges = list(self.deptree.tree_reverse.edges())
-
             try:
                 # Resolve all parents
                 for parent in parents_without_fixed_versions:
@@ -232,10 +228,11 @@ class ResolverFitting(Resolver):
                 for child_id in added_deps:
                     self._resolve_node(self.pakkages[child_id])
 
-            except ResolverException as e:
+            except ResolverConflict as c:
                 # If the version does not fit, try the next one
                 # Remove dependencies from graph
                 self.deptree.remove_dependencies(pakkage)
+                last_conflict = c
                 continue
             finally:
                 pakkage.versions.target_fixed = target_was_fixed
@@ -245,4 +242,4 @@ class ResolverFitting(Resolver):
             return
 
         if not pakkage.versions.resolved:
-            raise ResolverException(pakkage, parent_pakkages, self.pakkages)
+            raise ResolverConflict(pakkage, parent_pakkages, last_conflict)
@@ -7,6 +7,7 @@ from pakk.module import Module
 from pakk.pakkage.core import Pakkage
 from pakk.resolver.base import Resolver
 from pakk.resolver.base import ResolverException
+from pakk.resolver.version_index import VersionIndex
 
 
 class ResolverNewest(Resolver):
@@ -42,7 +43,7 @@ class ResolverNewest(Resolver):
     def resolve_node(self, pakkage: Pakkage):
         print(f"\nResolving {pakkage.id}")
 
-        parent_nodes = list(self.deptree.tree_reverse.neighbors(pakkage.id))
+        parent_nodes = list(self.deptree.tree.predecessors(pakkage.id))
         versions_available = list(pakkage.versions.available.keys())
 
         # If there is no target version, the node is a not yet resolved dep of a resolved
@@ -58,8 +59,7 @@ class ResolverNewest(Resolver):
             for pn in parent_nodes:
                 p_pakkage = self.pakkages[pn]
                 dep = p_pakkage.versions.target.dependencies[pakkage.id]
-                ver_range = nodesemver.Range(dep, loose=True)
-                versions_available = [v for v in versions_available if ver_range.test(v)]
+                versions_available = VersionIndex.filter(versions_available, [dep])
 
             if len(versions_available) == 0:
                 raise ResolverException(pakkage, [self.pakkages[pn] for pn in parent_nodes])
@@ -69,7 +69,7 @@ class ResolverNewest(Resolver):
                     raise ResolverException(pakkage, [self.pakkages[pn] for pn in parent_nodes])
             else:
                 version = nodesemver.max_satisfying(versions_available, "*")
-                pakkage.versions.target = pakkage.versions.available[version]
+                pakkage.versions.target = pakkage.versions.get_available(version)
 
             self.deptree.add_dependencies(pakkage, pakkage.versions.target)
 
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+
+from pakk.args.install_args import InstallArgs
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.base import PakkageCollection
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutionSnapshot:
+    """
+    Snapshot of the inputs of an installation that did not lead to any changes.
+
+    The snapshot stores a hash over the discovered catalog (available versions of all pakkages with their dependencies),
+    the installed set and the requested pakkages with the relevant install arguments.
+    If the hash of a new installation request equals the stored one, the resolution and installation
+    would have the same result as before, i.e. nothing to do, and can be skipped.
+    This saves the resolution, fetching and installation e.g. for the auto update on system start,
+    that mostly does not find any new version.
+
+    The hash is computed after the discovery, since a hash of the cached catalog can not notice newly released versions.
+    Thus, the discovery still runs, but its cache updates are cheap if nothing changed (see the conditional requests).
+    """
+
+    FILE_NAME = "resolution_snapshot.json"
+    """Name of the snapshot file in the cache dir."""
+
+    VERSION = 2
+    """Version of the snapshot format, older snapshots are ignored."""
+
+    @staticmethod
+    def get_path() -> str:
+        return os.path.join(MainConfig.get_config().paths.cache_dir.value, ResolutionSnapshot.FILE_NAME)
+
+    @staticmethod
+    def is_applicable() -> bool:
+        """Return if the install arguments allow to skip the installation with a snapshot."""
+        args = InstallArgs.get()
+        return not (args.force_reinstall or args.refetch or args.clear_cache or args.dry_run or args.repair)
+
+    @staticmethod
+    def compute_key(pakkages: PakkageCollection, pakkage_names: list[str]) -> str:
+        """
+        Compute the hash of the discovered catalog, the installed set and the request.
+
+        Parameters
+        ----------
+        pakkages: PakkageCollection
+            The discovered pakkages.
+        pakkage_names: list[str]
+            The requested pakkages of the installation.
+        """
+        args = InstallArgs.get()
+
+        h = hashlib.sha256()
+        request = [
+            sorted(pakkage_names),
+            args.upgrade,
+            args.upgrade_strategy,
+            args.allow_downgrade,
+            args.no_deps,
+            args.ignore_installed,
+        ]
+        h.update(json.dumps(request).encode())
+
+        for pakkage_id in sorted(pakkages.pakkages.keys()):
+            versions = pakkages.pakkages[pakkage_id].versions
+            installed = versions.installed
+            entry = [
+                pakkage_id,
+                # The dependency ranges of a release may be edited without releasing a new version
+                sorted([v, sorted(config.dependencies.items())] for v, config in versions.available.items()),
+                None if installed is None else installed.version,
+                None if installed is None else sorted(installed.dependencies.items()),
+                None if installed is None else str(installed.state.install_state),
+            ]
+            h.update(json.dumps(entry).encode())
+
+        return h.hexdigest()
+
+    @staticmethod
+    def load() -> str | None:
+        """Load the key of the stored snapshot."""
+        path = ResolutionSnapshot.get_path()
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not load resolution snapshot {path}: {e}")
+            return None
+
+        if data.get("version") != ResolutionSnapshot.VERSION:
+            return None
+        return data.get("key")
+
+    @staticmethod
+    def save(key: str):
+        """Store the key of an installation without changes."""
+        path = ResolutionSnapshot.get_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": ResolutionSnapshot.VERSION, "key": key}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def clear():
+        """Remove the stored snapshot, e.g. after a failed installation."""
+        path = ResolutionSnapshot.get_path()
+        if os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def is_unchanged(pakkages: PakkageCollection, pakkage_names: list[str]) -> bool:
+        """Return if the installation request equals the stored snapshot."""
+        if not ResolutionSnapshot.is_applicable():
+            return False
+        return ResolutionSnapshot.load() == ResolutionSnapshot.compute_key(pakkages, pakkage_names)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+from typing import Tuple
+from typing import Union
+
+import nodesemver
+
+VersionKey = Tuple[int, int, int, int, Tuple[Tuple[int, Union[int, str]], ...]]
+"""Comparable tuple form of a semantic version."""
+
+
+class VersionIndex:
+    """
+    Memoized semver operations for the resolvers.
+
+    Versions are parsed once into comparable tuples and ranges are compiled once per range string,
+    thus sorting and filtering versions during backtracking does not parse the same strings again.
+    """
+
+    CACHE_SIZE = 8192
+    """Maximal number of cached entries per memoized function."""
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def get_range(range_str: str) -> nodesemver.Range:
+        """Get the compiled (loose) range for the given range string."""
+        return nodesemver.Range(range_str, loose=True)
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def get_key(version: str) -> VersionKey:
+        """
+        Get the comparable tuple form of the given version following the semver precedence:
+        Pre-releases are lower than the release, numeric identifiers are lower than alphanumeric ones.
+
+        Raises
+        ------
+        ValueError
+            If the version is no valid (loose) semantic version.
+        """
+        semver = nodesemver.make_semver(version, loose=True)
+        prerelease = tuple((0, p) if isinstance(p, int) else (1, str(p)) for p in semver.prerelease)
+        return (semver.major, semver.minor, semver.patch, 0 if len(prerelease) > 0 else 1, prerelease)
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE * 8)
+    def test(version: str, range_str: str) -> bool:
+        """Return if the version satisfies the range."""
+        return VersionIndex.get_range(range_str).test(version)
+
+    @staticmethod
+    def fits(version: str, range_strs: Iterable[str]) -> bool:
+        """Return if the version satisfies all given ranges."""
+        return all(VersionIndex.test(version, r) for r in range_strs)
+
+    @staticmethod
+    def filter(versions: Iterable[str], range_strs: Iterable[str]) -> list[str]:
+        """Return the versions satisfying all given ranges, keeping their order."""
+        range_strs = list(range_strs)
+        return [v for v in versions if VersionIndex.fits(v, range_strs)]
+
+    @staticmethod
+    def sort(versions: Iterable[str], reverse: bool = False) -> list[str]:
+        """Sort the versions by their semver precedence."""
+        return sorted(versions, key=VersionIndex.get_key, reverse=reverse)
+
+    @staticmethod
+    def gte(version: str, other: str) -> bool:
+        """Return if the version is greater or equal than the other one."""
+        return VersionIndex.get_key(version) >= VersionIndex.get_key(other)
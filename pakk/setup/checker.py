@@ -19,17 +19,50 @@ class SetupRequiredException(Exception):
 
 class PakkSetupChecker:
     _setup_routines: list[SetupBase] = []
+    _required_routines: dict[type[SetupBase], SetupBase | None] = {}
+    _parser: ExtendedConfigParser | None = None
     path = os.path.abspath(os.path.join(PakkConfigBase.get_configs_dir(), "setup_routines.cfg"))
 
+    @staticmethod
+    def get_parser() -> ExtendedConfigParser:
+        """Get the parser of the setup routines config shared by all setup routines."""
+        if PakkSetupChecker._parser is None:
+            PakkSetupChecker._parser = ExtendedConfigParser()
+            PakkSetupChecker._parser.read(PakkSetupChecker.path)
+        return PakkSetupChecker._parser
+
     @staticmethod
     def get_setup_routines() -> list[SetupBase]:
         if len(PakkSetupChecker._setup_routines) == 0:
-            PakkSetupChecker._setup_routines = PakkLoader.get_setup_routines()
+            # Reuse the routines already created for required setups
+            routines = [r for r in PakkSetupChecker._required_routines.values() if r is not None]
+            setup_routines_cls = [
+                c for c in PakkLoader.get_setup_routine_classes() if c not in PakkSetupChecker._required_routines
+            ]
+            routines += PakkLoader.create_setup_routines(setup_routines_cls, PakkSetupChecker.get_parser())
+
+            PakkSetupChecker._setup_routines = routines
             # Sort setup routines by priority
             PakkSetupChecker._setup_routines.sort(key=lambda x: x.PRIORITY)
 
         return PakkSetupChecker._setup_routines
 
+    @staticmethod
+    def get_setup_routine(setup_cls: type[SetupBase]) -> SetupBase | None:
+        """
+        Get the routine of the given setup class.
+        In contrast to get_setup_routines, only the given class is instantiated,
+        thus the modules of all connectors and types are not imported on every command.
+        """
+        if len(PakkSetupChecker._setup_routines) > 0:
+            return next((r for r in PakkSetupChecker._setup_routines if isinstance(r, setup_cls)), None)
+
+        if setup_cls not in PakkSetupChecker._required_routines:
+            routines = PakkLoader.create_setup_routines([setup_cls], PakkSetupChecker.get_parser())
+            PakkSetupChecker._required_routines[setup_cls] = routines[0] if len(routines) > 0 else None
+
+        return PakkSetupChecker._required_routines[setup_cls]
+
     @staticmethod
     def require_setups(setups: list[SetupBase | type[SetupBase]], run_if_not_up_to_date: bool = True):
         not_up_to_date = PakkSetupChecker.check_setups(setups)
@@ -61,11 +94,10 @@ class PakkSetupChecker:
         list[SetupBase]
             All setups that are not up to date.
         """
-        routines = PakkSetupChecker.get_setup_routines()
         not_up_to_date: list[SetupBase] = []
         for setup in setups:
             if isinstance(setup, type):
-                routine = next((r for r in routines if isinstance(r, setup)), None)
+                routine = PakkSetupChecker.get_setup_routine(setup)
                 if routine is not None:
                     if not routine.is_up_to_date():
                         logger.info(f"Setup routine {routine.NAME} is not up to date.")
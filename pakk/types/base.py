@@ -45,9 +45,15 @@ TB = TypeVar("TB", bound="TypeBase")
 class InstallationFailedException(Exception):
     """Exception raised when the installation of a pakkage failed."""
 
-    def __init__(self, message: str):
+    def __init__(self, message: str, failed_types: list[TypeBase] | None = None):
         super().__init__(message)
 
+        self.failed_types = failed_types
+        """
+        The types of a combined installation that failed.
+        If None, all types of the installation are considered as failed.
+        """
+
 
 class TypeBase(Module, Generic[TB]):
     PAKKAGE_TYPE: str | None = None
@@ -67,6 +73,12 @@ class TypeBase(Module, Generic[TB]):
     ALLOWS_MULTIPLE_SIMULTANEOUS_INSTALLATIONS = True
     """If True, multiple installations of the same pakkage are allowed."""
 
+    EXCLUSIVE_RESOURCES: set[str] = set()
+    """
+    Resources used exclusively by installations of this type, e.g. the apt lock or the colcon workspace.
+    Installations of types sharing a resource are never executed simultaneously.
+    """
+
     _imported_type_classes: list[type[TypeBase]] | None = None
     """List of all imported type classes."""
 
@@ -329,7 +341,8 @@ class TypeBase(Module, Generic[TB]):
         except InstallationFailedException as e:
             logger.error(f"Installation failed: {e}")
 
-            for type_ in types:
+            failed_types = e.failed_types if e.failed_types is not None else types
+            for type_ in failed_types:
                 type_.pakkage_version.state.failed_types.append(type_.__class__.__name__)
 
             if raise_exception:
@@ -30,6 +30,9 @@ class InstructionParser:
     def __init__(self, environment: Environment):
         self.env = environment
 
+        self.cwd: str | None = None
+        """The working directory the instruction is executed in, set before the execution."""
+
     def has_cmd(self):
         raise NotImplementedError()
 
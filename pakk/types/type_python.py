@@ -9,6 +9,7 @@ from pakk.environments.base import Environment
 from pakk.pakkage.core import PakkageConfig
 from pakk.pakkage.init_helper import InitConfigSection
 from pakk.pakkage.init_helper import InitHelperBase
+from pakk.types.base import InstallationFailedException
 from pakk.types.base import TypeBase
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,14 @@ class PythonTypeConfiguration(TypeConfiguration):
             value_getter=lambda x: x if x != "default" else None,
         )
 
+        self.combine_pip_installs = self.python_section.ConfirmationOption(
+            "combine_pip_installs",
+            True,
+            "Install all python packages of an installation step with a single pip call",
+            long_instruction="If the combined pip call fails, the packages are installed one by one to find the failing pakkages.",
+            inquire=False,
+        )
+
     # @staticmethod
     def get_cmd_pip_install_package(
         self,
@@ -36,17 +45,20 @@ class PythonTypeConfiguration(TypeConfiguration):
         editable=True,
         requirements_file: str | None = None,
         packages: list[str] | None = None,
+        paths: list[str] | None = None,
+        requirements_files: list[str] | None = None,
     ):
         pip = Environment.get_pip()
         parts = [f"{pip} install"]
-        if path is not None:
+
+        for p in ([path] if path is not None else []) + (paths or []):
             if editable:
                 parts.append("-e")
-            parts.append(path)
+            parts.append(p)
 
-        if requirements_file is not None:
+        for r in ([requirements_file] if requirements_file is not None else []) + (requirements_files or []):
             parts.append("-r")
-            parts.append(requirements_file)
+            parts.append(r)
 
         if packages is not None:
             parts.extend(packages)
@@ -68,16 +80,23 @@ class TypePython(TypeBase):
 
     PAKKAGE_TYPE: str = "Python"
     ALLOWS_MULTIPLE_SIMULTANEOUS_INSTALLATIONS = False
+    EXCLUSIVE_RESOURCES = {"pip"}
 
     def __init__(self, pakkage_version: PakkageConfig, env: Environment):
         super().__init__(pakkage_version, env)
         self.config = PythonTypeConfiguration.get_config()
 
-    def install_package(self, path: str, editable=True):
-        path = self.env.get_path_in_environment(path)
-        cmd = self.config.get_cmd_pip_install_package(path, editable)
-        cmd = self.env.get_cmd_in_environment(cmd)
-        self.run_commands_with_output(cmd)
+    def get_cmd_install_packages(self, paths: list[str], editable=True) -> str:
+        """Get the pip command installing the python packages at the given local paths in the environment."""
+        paths = [self.env.get_path_in_environment(p) for p in paths]
+        cmd = self.config.get_cmd_pip_install_package(paths=paths, editable=editable)
+        return self.env.get_cmd_in_environment(cmd)
+
+    def install_package(self, path: str, editable=True) -> int:
+        """Install the python package at the given local path and return the exit code of pip."""
+        cmd = self.get_cmd_install_packages([path], editable)
+        code, _, _ = self.run_commands_with_returncode(cmd, print_output=True)
+        return code
 
     def install(self) -> None:
         """Install a ROS pakkage."""
@@ -97,6 +116,49 @@ class TypePython(TypeBase):
             # TODO: Better exception
             raise Exception("No local path to install python package")
 
+    @staticmethod
+    def install_multiple(types: list[TypePython]):
+        """
+        Install multiple python pakkages with a single pip call, so pip resolves the environment only once.
+        If the combined installation fails, the pakkages are installed one by one to find the failing ones.
+        """
+        if len(types) == 0:
+            return
+        if len(types) == 1 or not types[0].config.combine_pip_installs.value:
+            TypeBase.install_multiple(types)
+            return
+
+        logger.info(f"Installing Python pakkages {[t.pakkage_version.id for t in types]}...")
+
+        paths = []
+        for t in types:
+            v = t.pakkage_version
+            if v.local_path is None:
+                # TODO: Better exception
+                raise Exception("No local path to install python package")
+
+            t.set_status(v.name, f"Linking {v.basename} into modules directory...")
+            t.symlink_pakkage_in_pakkages_dir(v)
+            paths.append(v.local_path)
+
+        code, _, _ = types[0].run_commands_with_returncode(types[0].get_cmd_install_packages(paths), print_output=True)
+        if code == 0:
+            return
+
+        logger.warning(f"Combined pip installation failed with code {code}. Installing the pakkages one by one...")
+        failed_types: list[TypeBase] = []
+        for t in types:
+            v = t.pakkage_version
+            t.set_status(v.name, f"Installing python package in {v.basename}...")
+            if t.install_package(v.local_path) > 0:  # type: ignore
+                failed_types.append(t)
+
+        if len(failed_types) > 0:
+            raise InstallationFailedException(
+                f"pip installation of {[t.pakkage_version.id for t in failed_types]} failed",
+                failed_types=failed_types,
+            )
+
     def uninstall(self) -> None:
         TypePython.unlink_pakkage_in_pakkages_dir(self.pakkage_version)
 
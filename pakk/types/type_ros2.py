@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
+import re
+import threading
+import xml.etree.ElementTree as ET
 
 from extended_configparser.configuration.entries.section import ConfigSection
 
 from pakk.config.base import TypeConfiguration
 from pakk.config.process import Process
+from pakk.connector.archive_generic import GenericArchiveHelper
 from pakk.environments.base import Environment
 from pakk.environments.linux import LinuxEnvironment
 from pakk.helper.file_util import remove_dir
+from pakk.module import Module
 from pakk.pakkage.core import PakkageConfig
 from pakk.pakkage.init_helper import InitConfigOption
 from pakk.pakkage.init_helper import InitConfigSection
@@ -51,6 +57,14 @@ class Ros2TypeConfiguration(TypeConfiguration):
             inquire=True,
         )
 
+        self.parallel_workers = self.ros_section.Option(
+            "parallel_workers",
+            0,
+            "Number of packages colcon builds in parallel (0 to use the colcon default)",
+            inquire=False,
+            value_getter=int,
+        )
+
     def get_cmd_setup_ws(self):
         return f". {os.path.join(self.path_ros_ws.value, 'install', 'setup.bash')}"
 
@@ -62,11 +76,216 @@ class Ros2TypeConfiguration(TypeConfiguration):
         return f"colcon list --names-only {path_cmd} {search_path}"
 
     @staticmethod
-    def get_cmd_colcon_build(package_names: list[str], symlink_install: bool = False):
-        """Get the colcon command to build the given packages."""
-        return (
-            f'colcon build {"--symlink-install " if symlink_install else ""}--packages-select {" ".join(package_names)}'
+    def get_cmd_colcon_build(
+        package_names: list[str],
+        symlink_install: bool = False,
+        up_to: bool = False,
+        skip_build_finished: bool = False,
+        parallel_workers: int = 0,
+    ):
+        """
+        Get the colcon command to build the given packages.
+
+        Parameters
+        ----------
+        package_names: list[str]
+            The names of the packages to build.
+        symlink_install: bool
+            Use --symlink-install.
+        up_to: bool
+            Build the packages including their dependencies in the workspace (--packages-up-to) instead of only the given packages.
+        skip_build_finished: bool
+            Skip packages whose last build finished successfully (--packages-skip-build-finished).
+        parallel_workers: int
+            Number of packages built in parallel, 0 to use the colcon default.
+        """
+        cmd = "colcon build "
+        if symlink_install:
+            cmd += "--symlink-install "
+        if parallel_workers > 0:
+            cmd += f"--parallel-workers {parallel_workers} "
+        if skip_build_finished:
+            cmd += "--packages-skip-build-finished "
+        cmd += "--packages-up-to " if up_to else "--packages-select "
+        return cmd + " ".join(package_names)
+
+
+class Ros2BuildEngine:
+    """
+    Incremental colcon builds in the ROS2 workspace.
+
+    The engine keeps a persistent map from the installed pakkages to their ROS packages in the workspace.
+    The map is used to remove the installed ROS packages of uninstalled pakkages from the workspace,
+    since their sources are not available anymore at that point.
+    Builds use `--packages-up-to` together with `--packages-skip-build-finished`,
+    so dependencies already built in the workspace are skipped and only the invalidated packages are rebuilt.
+    If a build fails, only the failed packages are cleaned and built again.
+    """
+
+    MAP_FILE_NAME = "pakk_packages.json"
+    """Name of the file in the workspace root storing the map from pakkage ids to ROS packages."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, config: Ros2TypeConfiguration):
+        self.config = config
+        self.ws_dir: str = config.path_ros_ws.value
+
+        self.timings: dict[str, float] = dict()
+        """Build durations in seconds of the packages built with the last build."""
+
+    @property
+    def map_path(self) -> str:
+        return os.path.join(self.ws_dir, Ros2BuildEngine.MAP_FILE_NAME)
+
+    def load_map(self) -> dict[str, list[str]]:
+        """Load the map from pakkage ids to the names of their ROS packages."""
+        if not os.path.exists(self.map_path):
+            return dict()
+        try:
+            with open(self.map_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load ROS package map {self.map_path}: {e}")
+            return dict()
+
+    def _update_map(self, pakkage_id: str, package_names: list[str] | None):
+        with Ros2BuildEngine._lock:
+            ws_map = self.load_map()
+            if package_names is None:
+                ws_map.pop(pakkage_id, None)
+            else:
+                ws_map[pakkage_id] = package_names
+
+            os.makedirs(self.ws_dir, exist_ok=True)
+            tmp_path = self.map_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(ws_map, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.map_path)
+
+    def set_packages(self, pakkage_id: str, package_names: list[str]):
+        """Store the ROS packages of the given pakkage in the map."""
+        self._update_map(pakkage_id, package_names)
+
+    def remove_packages(self, pakkage_id: str):
+        """
+        Remove the ROS packages of the given pakkage from the workspace and the pakkage from the map.
+        The build directories are kept for incremental builds if the pakkage is installed again,
+        but the packages are invalidated, so they are not skipped by following builds.
+        """
+        package_names = self.load_map().get(pakkage_id, [])
+        if len(package_names) > 0:
+            logger.debug(f"Removing ROS packages {package_names} of {pakkage_id} from the workspace")
+            self.invalidate(package_names)
+            self.clean(package_names, ["install"])
+        self._update_map(pakkage_id, None)
+
+    def _get_build_rc_path(self, package_name: str) -> str:
+        return os.path.join(self.ws_dir, "build", package_name, "colcon_build.rc")
+
+    def invalidate(self, package_names: list[str]):
+        """Mark the given packages as not built, so they are rebuilt despite --packages-skip-build-finished."""
+        for p in package_names:
+            rc_path = self._get_build_rc_path(p)
+            if os.path.exists(rc_path):
+                os.remove(rc_path)
+
+    def get_failed_packages(self, package_names: list[str]) -> list[str]:
+        """Get the packages of the given ones whose last build did not finish successfully."""
+        failed = []
+        for p in package_names:
+            rc_path = self._get_build_rc_path(p)
+            try:
+                with open(rc_path, "r") as f:
+                    if f.read().strip() == "0":
+                        continue
+            except OSError:
+                pass
+            failed.append(p)
+        return failed
+
+    def clean(self, package_names: list[str], dirs: list[str] = ["build", "install"]):
+        """Delete the build and install directories of the given packages."""
+        for p in package_names:
+            for d in dirs:
+                path = os.path.join(self.ws_dir, d, p)
+                if os.path.exists(path):
+                    remove_dir(path)
+
+    def read_build_timings(self) -> dict[str, float]:
+        """Read the build durations of the packages of the latest build from the colcon events log."""
+        events_path = os.path.join(self.ws_dir, "log", "latest_build", "events.log")
+        pattern = re.compile(r"^\[(\d+(?:\.\d+)?)\] \(([^)]+)\) (JobStarted|JobEnded)")
+
+        started: dict[str, float] = dict()
+        timings: dict[str, float] = dict()
+        try:
+            with open(events_path, "r") as f:
+                for line in f:
+                    m = pattern.match(line)
+                    if m is None:
+                        continue
+                    t, package_name, event = float(m.group(1)), m.group(2), m.group(3)
+                    if event == "JobStarted":
+                        started[package_name] = t
+                    elif package_name in started:
+                        timings[package_name] = t - started[package_name]
+        except OSError:
+            logger.debug(f"No colcon events log found at {events_path}")
+
+        return timings
+
+    def _run_build(self, package_names: list[str], up_to: bool) -> int:
+        cmd = self.config.get_cmd_colcon_build(
+            package_names,
+            symlink_install=False,
+            up_to=up_to,
+            skip_build_finished=up_to,
+            parallel_workers=self.config.parallel_workers.value,
         )
+        code, _, _ = Module.run_commands_with_returncode([cmd], cwd=self.ws_dir, print_output=True)
+
+        timings = self.read_build_timings()
+        self.timings.update(timings)
+        for name, duration in sorted(timings.items(), key=lambda x: x[1], reverse=True):
+            logger.info(f"Built ROS package {name} in {duration:.1f}s")
+
+        return code
+
+    def build(self, package_names: list[str]):
+        """
+        Build the given ROS packages and their not yet built dependencies in the workspace.
+
+        Parameters
+        ----------
+        package_names:
+            The names of the ROS packages to build.
+
+        Raises
+        ------
+        InstallationFailedException
+            If the packages still fail after cleaning and rebuilding the failed packages.
+        """
+        if len(package_names) == 0:
+            return
+
+        self.timings = dict()
+
+        # The given packages are (re)installed, thus they have to be built even if an older build finished
+        self.invalidate(package_names)
+        code = self._run_build(package_names, up_to=True)
+
+        # If the packages could not be built, delete the build and install directories of the failed packages
+        if code > 0:
+            failed = self.get_failed_packages(package_names) or package_names
+            logger.warning(f"Build failed. Deleting build and install directories of {failed} and trying again...")
+            self.clean(failed)
+
+            code = self._run_build(failed, up_to=True)
+
+            if code > 0:
+                failed = self.get_failed_packages(package_names) or failed
+                raise InstallationFailedException(f"Building ROS packages ({failed}) failed with code {code}")
 
 
 class RosStartInstructionParser(RunInstructionParser):
@@ -112,6 +331,7 @@ class TypeRos2(TypeBase):
 
     PAKKAGE_TYPE: str = "ROS2"
     ALLOWS_MULTIPLE_SIMULTANEOUS_INSTALLATIONS = False
+    EXCLUSIVE_RESOURCES = {"colcon_workspace"}
 
     CONFIG_CLS = Ros2TypeConfiguration
 
@@ -125,9 +345,126 @@ class TypeRos2(TypeBase):
         self.install_type.is_combinable_with_children = True
         self.config = Ros2TypeConfiguration.get_config()
 
+    PACKAGE_NAMES_CACHE_FILE_NAME = "ros_packages.json"
+    """Name of the file in the .pakk directory caching the ROS package names of the checkout."""
+
+    IGNORE_MARKERS = ("COLCON_IGNORE", "AMENT_IGNORE", "CATKIN_IGNORE")
+    """Files marking directories that are skipped by colcon, including their subdirectories."""
+
+    @staticmethod
+    def get_checkout_key(path: str) -> str | None:
+        """
+        Get the commit sha of the checkout in the given path.
+        For git checkouts, the git files are read directly.
+        For extracted archives (fetch mode archive), the commit sha of the archive is used.
+        Returns None if the commit of the path is unknown.
+        """
+        git_dir = os.path.join(path, ".git")
+        try:
+            with open(os.path.join(git_dir, "HEAD"), "r") as f:
+                head = f.read().strip()
+            if not head.startswith("ref:"):
+                return head
+
+            ref = head[len("ref:") :].strip()
+            ref_path = os.path.join(git_dir, ref)
+            if os.path.exists(ref_path):
+                with open(ref_path, "r") as f:
+                    return f.read().strip()
+
+            with open(os.path.join(git_dir, "packed-refs"), "r") as f:
+                for line in f:
+                    splits = line.strip().split(" ")
+                    if len(splits) == 2 and splits[1] == ref:
+                        return splits[0]
+        except OSError:
+            pass
+
+        return GenericArchiveHelper.get_extracted_commit(path)
+
+    @staticmethod
+    def find_ros_package_names(path: str) -> list[str]:
+        """
+        Find the ROS packages below the subdirectories of the given path by parsing their package.xml files.
+        Like colcon, directories containing one of the `IGNORE_MARKERS` and subdirectories of packages are skipped.
+
+        Parameters
+        ----------
+        path: str
+            The path of the pakkage.
+
+        Returns
+        -------
+        list[str]: The names of the ROS packages.
+        """
+        names: list[str] = []
+
+        with os.scandir(path) as it:
+            base_paths = sorted(e.path for e in it if e.is_dir() and not e.name.startswith("."))
+
+        for base_path in base_paths:
+            for root, dirs, files in os.walk(base_path, followlinks=True):
+                if any(marker in files for marker in TypeRos2.IGNORE_MARKERS):
+                    dirs.clear()
+                    continue
+
+                if "package.xml" in files:
+                    dirs.clear()
+                    try:
+                        name = ET.parse(os.path.join(root, "package.xml")).getroot().findtext("name")
+                    except ET.ParseError as e:
+                        logger.warning(f"Could not parse {os.path.join(root, 'package.xml')}: {e}")
+                        continue
+                    if name is not None and name.strip() != "":
+                        names.append(name.strip())
+                    continue
+
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+
+        return names
+
     def get_ros_package_names(self) -> list[str]:
         """
         Get the names of the ROS packages for the given pakkage.
+        The names are cached in the .pakk directory of the pakkage with the commit sha of the checkout as key,
+        thus they are only computed again if the checkout changes.
+
+        Returns
+        -------
+        list[str]: The names of the ROS packages in the pakkage.
+        """
+        local_path = self.pakkage_version.local_path
+        if local_path is None or not os.path.isdir(local_path):
+            return self.list_ros_package_names()
+
+        cache_path = os.path.join(
+            local_path, PakkageConfig.PAKK_DIRECTORY_NAME, TypeRos2.PACKAGE_NAMES_CACHE_FILE_NAME
+        )
+        key = TypeRos2.get_checkout_key(local_path)
+        if key is not None and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r") as f:
+                    cached = json.load(f)
+                if cached.get("key") == key:
+                    return cached["names"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        names = TypeRos2.find_ros_package_names(local_path)
+        if len(names) == 0:
+            # E.g. packages without package.xml are only found by colcon itself
+            names = self.list_ros_package_names()
+
+        if key is not None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump({"key": key, "names": names}, f)
+
+        return names
+
+    def list_ros_package_names(self) -> list[str]:
+        """
+        Get the names of the ROS packages for the given pakkage with colcon list.
 
         Returns
         -------
@@ -147,7 +484,7 @@ class TypeRos2(TypeBase):
         else:
             raise NotImplementedError()
 
-    def build_ros_packages(self, package_names: list[str]):
+    def build_ros_packages(self, package_names: list[str]) -> dict[str, float]:
         """
         Build the ROS packages in the given pakkage version.
 
@@ -155,6 +492,10 @@ class TypeRos2(TypeBase):
         ----------
         package_names:
             The names of the ROS packages to build.
+
+        Returns
+        -------
+        dict[str, float]: The build durations in seconds of the built packages.
         """
 
         # Is symlink really needed?
@@ -163,28 +504,12 @@ class TypeRos2(TypeBase):
         # See https://answers.ros.org/question/364060/colcon-fails-to-build-python-package-error-in-egg_base/
 
         if isinstance(self.env, LinuxEnvironment):
-            cmds = [self.config.get_cmd_colcon_build(package_names, symlink_install=False)]
-
-            code, _, _ = self.run_commands_with_returncode(cmds, cwd=self.config.path_ros_ws.value, print_output=True)
+            engine = Ros2BuildEngine(self.config)
+            engine.build(package_names)
+            return engine.timings
 
-            # If the packages could not be built, try to delete the build and install directories
-            if code > 0:
-                logger.warning("Build failed. Trying to delete build and install directories...")
-                for p in package_names:
-                    for d in ["build", "install"]:
-                        path = os.path.join(self.config.path_ros_ws.value, d, p)
-                        if os.path.exists(path):
-                            remove_dir(path)
-
-                logger.warning("Trying to build again...")
-                code, _, _ = self.run_commands_with_returncode(
-                    cmds, cwd=self.config.path_ros_ws.value, print_output=True
-                )
-
-                if code > 0:
-                    raise InstallationFailedException(
-                        f"Building ROS packages ({package_names}) failed with code {code}"
-                    )
+        logger.warning(f"Building ROS packages is not supported in {self.env.__class__.__name__}, skipping build")
+        return dict()
 
     def install(self) -> None:
         """Install a ROS pakkage."""
@@ -205,6 +530,7 @@ class TypeRos2(TypeBase):
         logger.info(f"Installing ROS2 pakkages for {[t.pakkage_version.id for t in types]}...")
 
         ros_p_names = []
+        ros_p_names_by_type: dict[TypeRos2, list[str]] = dict()
 
         # Link into pakkages_dir
         for t in types:
@@ -219,16 +545,25 @@ class TypeRos2(TypeBase):
 
             # Get ROS packages present in the pakkage
             t.set_status(t.pakkage_version.name, f"Retrieving ROS package names in {t.pakkage_version.basename}...")
-            ros_p_names.extend(t.get_ros_package_names())
+            names = t.get_ros_package_names()
+            Ros2BuildEngine(t.config).set_packages(t.pakkage_version.id, names)
+            ros_p_names.extend(names)
+            ros_p_names_by_type[t] = names
 
         # Build the ROS packages
         logger.info(f"Building ROS packages for {[t.pakkage_version.id for t in types]}...")
-        types[0].build_ros_packages(ros_p_names)
+        timings = types[0].build_ros_packages(ros_p_names)
+
+        for t, names in ros_p_names_by_type.items():
+            durations = [timings[n] for n in names if n in timings]
+            if len(durations) > 0:
+                t.set_status(t.pakkage_version.name, f"Built {len(durations)} ROS packages in {sum(durations):.1f}s")
 
     def uninstall(self) -> None:
         TypeRos2.unlink_pakkage_in_pakkages_dir(self.pakkage_version)
         ros_src_pakkage_path = os.path.join(self.config.path_ros_ws_src.value, self.pakkage_version.id)
         TypeRos2.unlink_pakkage_from(ros_src_pakkage_path)
+        Ros2BuildEngine(self.config).remove_packages(self.pakkage_version.id)
 
 
 class InitHelper(InitHelperBase):
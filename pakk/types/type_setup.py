@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 import shlex
+import subprocess
+import time
 
 import braceexpand
+from extended_configparser.configuration.entries.section import ConfigSection
 
 from pakk.args.base_args import BaseArgs
+from pakk.config.base import TypeConfiguration
+from pakk.config.main_cfg import MainConfig
 from pakk.config.process import Process
 from pakk.environments.base import Environment
 from pakk.environments.linux import LinuxEnvironment
@@ -27,6 +33,107 @@ from pakk.types.type_python import PythonTypeConfiguration
 logger = logging.getLogger(__name__)
 
 
+class SetupTypeConfiguration(TypeConfiguration):
+    def __init__(self):
+        super().__init__()
+
+        self.setup_section = ConfigSection("Setup")
+        self.apt_update_ttl = self.setup_section.Option(
+            "apt_update_ttl",
+            3600,
+            "Seconds after which the apt package lists are considered outdated and apt update is executed",
+            inquire=False,
+            value_getter=float,
+        )
+
+
+class AptPlanner:
+    """
+    Plans apt transactions: already installed packages are skipped with a single dpkg-query call
+    and apt update is only executed if the package lists are older than the configured ttl.
+    """
+
+    LISTS_DIR = "/var/lib/apt/lists"
+    """Directory of the apt package lists, its modification time is updated by apt update."""
+
+    UPDATE_STAMP_FILE_NAME = "apt_update.stamp"
+    """Name of the file in the cache dir touched after apt updates executed by pakk."""
+
+    PACKAGE_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9+.-]*(:[a-z0-9-]+)?$")
+    """Plain package names (optionally with architecture), other specs like versions or patterns are not checked."""
+
+    @staticmethod
+    def get_installed_packages(package_names: list[str]) -> set[str]:
+        """Get the names of the given packages that are installed by querying the dpkg database once."""
+        names = [p for p in package_names if AptPlanner.PACKAGE_NAME_PATTERN.match(p)]
+        if len(names) == 0:
+            return set()
+
+        try:
+            # dpkg-query returns with code 1 if a package is unknown, but still prints the known ones
+            result = subprocess.run(
+                ["dpkg-query", "-W", "-f=${Package}:${Architecture}\t${db:Status-Abbrev}\n", *names],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError as e:
+            logger.debug(f"Could not query dpkg database: {e}")
+            return set()
+
+        installed: set[str] = set()
+        for line in result.stdout.splitlines():
+            splits = line.split("\t")
+            if len(splits) != 2 or not splits[1].startswith("ii"):
+                continue
+            name_arch = splits[0]
+            installed.add(name_arch)
+            installed.add(name_arch.split(":")[0])
+
+        return {n for n in names if n in installed}
+
+    @staticmethod
+    def get_update_stamp_path() -> str:
+        return os.path.join(MainConfig.get_config().paths.cache_dir.value, AptPlanner.UPDATE_STAMP_FILE_NAME)
+
+    @staticmethod
+    def get_lists_age() -> float:
+        """Get the seconds since the last apt update."""
+        last_update = 0.0
+        for path in [AptPlanner.LISTS_DIR, AptPlanner.get_update_stamp_path()]:
+            if os.path.exists(path):
+                last_update = max(last_update, os.path.getmtime(path))
+        return time.time() - last_update
+
+    @staticmethod
+    def plan(packages: list[str]) -> str | None:
+        """
+        Get the command to install the given apt packages.
+
+        Returns
+        -------
+        str | None: The command or None if all packages are already installed.
+        """
+        installed = AptPlanner.get_installed_packages(packages)
+        missing = list(dict.fromkeys(p for p in packages if p not in installed))
+        if len(missing) == 0:
+            logger.info(f"apt packages already installed: {packages}")
+            return None
+        if len(installed) > 0:
+            logger.debug(f"Skipping installed apt packages: {sorted(installed)}")
+
+        stamp_path = AptPlanner.get_update_stamp_path()
+        update = f"sudo apt update && touch {shlex.quote(stamp_path)}"
+        install = f"sudo apt install -y {' '.join(missing)}"
+
+        ttl = SetupTypeConfiguration.get_config().apt_update_ttl.value
+        if AptPlanner.get_lists_age() > ttl:
+            return f"{update} && {install}"
+
+        # The lists are up to date, update only if the installation fails, e.g. because of moved package files
+        return f"{install} || ({update} && {install})"
+
+
 class AptInstructionParser(CombinableInstallInstructionParser):
     INSTRUCTION_NAME = "apt"
     DEFAULT_SUBINSTRUCTION = "install"
@@ -43,7 +150,7 @@ class AptInstructionParser(CombinableInstallInstructionParser):
         expanded_packages = []
         for p in self.apt_packages:
             expanded_packages.extend(braceexpand.braceexpand(p))
-        return f"sudo apt update && sudo apt install -y {' '.join(expanded_packages)}"
+        return AptPlanner.plan(expanded_packages)
 
     def parse_install(self, instruction_content: str):
         self.apt_packages.extend(shlex.split(instruction_content))
@@ -66,7 +173,7 @@ class AptInstructionParser(CombinableInstallInstructionParser):
         return None
 
 
-class PipInstructionParser(InstallInstructionParser):
+class PipInstructionParser(CombinableInstallInstructionParser):
     INSTRUCTION_NAME = "pip"
     DEFAULT_SUBINSTRUCTION = "install"
 
@@ -108,6 +215,35 @@ class PipInstructionParser(InstallInstructionParser):
     def parse_packages(self, instruction_content: str):
         self.pip_packages.extend(shlex.split(instruction_content))
 
+    @staticmethod
+    def get_combined_cmd(parser: list[PipInstructionParser]):
+        """Get a single pip command installing the requirements and packages of all parsers."""
+        if len(parser) == 0:
+            return None
+        if not parser[0].python_config.combine_pip_installs.value:
+            # One pip call per pakkage, executed in the pakkage directory
+            return " && ".join(
+                f"(cd {shlex.quote(p.cwd)} && {p.get_cmd()})" if p.cwd is not None else p.get_cmd() for p in parser
+            )
+
+        requirements_files = []
+        pip_packages = []
+        for p in parser:
+            if p.requirement_file is not None:
+                # The combined command is not executed in the pakkage directory
+                if p.cwd is not None and not os.path.isabs(p.requirement_file):
+                    requirements_files.append(os.path.join(p.cwd, p.requirement_file))
+                else:
+                    requirements_files.append(p.requirement_file)
+            pip_packages.extend(p.pip_packages)
+
+        if len(requirements_files) == 0 and len(pip_packages) == 0:
+            return None
+
+        return parser[0].python_config.get_cmd_pip_install_package(
+            requirements_files=requirements_files, packages=pip_packages
+        )
+
 
 class ScriptInstructionParser(InstallInstructionParser):
     INSTRUCTION_NAME = "script"
@@ -206,6 +342,9 @@ class TypeSetup(TypeBase):
     PAKKAGE_TYPE = "Setup"
     VISIBLE_TYPE = False
     ALLOWS_MULTIPLE_SIMULTANEOUS_INSTALLATIONS = True
+    EXCLUSIVE_RESOURCES = {"apt", "pip"}
+
+    CONFIG_CLS = SetupTypeConfiguration
 
     INSTRUCTION_PARSER = [
         LocalEnvVarParser,
@@ -229,6 +368,34 @@ class TypeSetup(TypeBase):
         """Install by executing the setup instruction."""
         self.install_multiple([self])
 
+    @staticmethod
+    def _get_envs(types: list[TypeSetup]) -> dict[str, str]:
+        """Get the environment variables including the temporal environment variables of the given types."""
+        envs = os.environ.copy()
+        for t in types:
+            envs.update(Process.get_temp_env_vars(t.pakkage_version))
+        return envs
+
+    @staticmethod
+    def _execute_instruction(t: TypeSetup, instruction_parser: type[InstructionParser]) -> bool:
+        """Execute the instruction of the given type in its pakkage directory. Returns False if it failed."""
+        parser = t.get_instruction_parser_by_cls(instruction_parser)
+        if not parser.has_cmd():
+            return True
+
+        cmd = parser.get_cmd()
+        if cmd is None:
+            return True
+
+        logger.info(f"Executing '{instruction_parser.INSTRUCTION_NAME}' instruction for '{t.pakkage_version.id}'...")
+        code, _, _ = Module.run_commands_with_returncode(
+            cmd, cwd=t.pakkage_version.local_path, print_output=True, env=TypeSetup._get_envs([t])
+        )
+        if code > 0:
+            logger.warning(f"{cmd} failed with {code}")
+            return False
+        return True
+
     @staticmethod
     def install_multiple(types: list[TypeSetup]):
         """Install multiple setup types in parallel."""
@@ -245,15 +412,22 @@ class TypeSetup(TypeBase):
                 logger.info(f"Set temporal environment variables for '{t.pakkage_version.id}'...")
                 Process.update_temp_env_vars(t.pakkage_version, env_vars)
 
+        # Types with a failed instruction are skipped for the remaining instructions
+        failed_types: list[TypeSetup] = []
+
         for instruction_parser in TypeSetup.INSTRUCTION_PARSER:
             if instruction_parser == LocalEnvVarParser:
                 continue
 
+            remaining_types = [t for t in types if t not in failed_types]
+
             if issubclass(instruction_parser, CombinableInstructionParser):
                 types_with_instruction = [
-                    t for t in types if t.get_instruction_parser_by_cls(instruction_parser).has_cmd()
+                    t for t in remaining_types if t.get_instruction_parser_by_cls(instruction_parser).has_cmd()
                 ]
                 parser = [t.get_instruction_parser_by_cls(instruction_parser) for t in types_with_instruction]
+                for t, p in zip(types_with_instruction, parser):
+                    p.cwd = t.pakkage_version.local_path
 
                 cmd = instruction_parser.get_combined_cmd(parser)
 
@@ -263,28 +437,32 @@ class TypeSetup(TypeBase):
                 logger.info(
                     f"Executing '{instruction_parser.INSTRUCTION_NAME}' instruction for {[t.pakkage_version.id for t in types_with_instruction]}..."
                 )
-                code, _, _ = Module.run_commands_with_returncode(cmd, print_output=True)
-                if code > 0:
-                    logger.warning(f"{cmd} failed with {code}")
-                    raise InstallationFailedException(f"Setup command ({cmd}) failed with code {code}")
+                code, _, _ = Module.run_commands_with_returncode(
+                    cmd, print_output=True, env=TypeSetup._get_envs(types_with_instruction)
+                )
+                if code == 0:
+                    continue
+
+                logger.warning(f"{cmd} failed with {code}")
+                if len(types_with_instruction) == 1:
+                    failed_types.extend(types_with_instruction)
+                    continue
+
+                # Execute the instruction for each pakkage to find the failing pakkages
+                logger.warning(f"Executing '{instruction_parser.INSTRUCTION_NAME}' instruction for each pakkage...")
+                for t in types_with_instruction:
+                    if not TypeSetup._execute_instruction(t, instruction_parser):
+                        failed_types.append(t)
             else:
-                for t in types:
-                    parser = t.get_instruction_parser_by_cls(instruction_parser)
-                    if parser.has_cmd():
-                        logger.info(
-                            f"Executing '{instruction_parser.INSTRUCTION_NAME}' instruction for '{t.pakkage_version.id}'..."
-                        )
-                        envs = os.environ.copy()
-                        temp_env_vars = Process.get_temp_env_vars(t.pakkage_version)
-                        envs.update(temp_env_vars)
-
-                        cmd = parser.get_cmd()
-                        code, _, _ = Module.run_commands_with_returncode(
-                            cmd, cwd=t.pakkage_version.local_path, print_output=True, env=envs
-                        )
-                        if code > 0:
-                            logger.warning(f"{cmd} failed with {code}")
-                            raise InstallationFailedException(f"Setup command ({cmd}) failed with code {code}")
+                for t in remaining_types:
+                    if not TypeSetup._execute_instruction(t, instruction_parser):
+                        failed_types.append(t)
+
+        if len(failed_types) > 0:
+            raise InstallationFailedException(
+                f"Setup instructions for {[t.pakkage_version.id for t in failed_types]} failed",
+                failed_types=failed_types,  # type: ignore
+            )
 
     def uninstall(self) -> None:
         pass
@@ -138,6 +138,7 @@ class TypeWeb(TypeBase):
 
     PAKKAGE_TYPE: str = "Web"
     ALLOWS_MULTIPLE_SIMULTANEOUS_INSTALLATIONS = False
+    EXCLUSIVE_RESOURCES = {"nginx"}
 
     SECTION_NAME = "Type.Web"
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+
+from pakk.connector.base import PakkageCollection
+from pakk.pakkage.core import Pakkage
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageVersions
+from pakk.resolver.version_index import VersionIndex
+
+Catalog = dict[str, dict[str, dict[str, str]]]
+"""Versions and their dependencies by pakkage id."""
+
+
+def create_collection(catalog: Catalog, root: str) -> PakkageCollection:
+    collection = PakkageCollection()
+    for pakkage_id, versions in catalog.items():
+        configs = []
+        for version, dependencies in versions.items():
+            config = PakkageConfig()
+            config.id = pakkage_id
+            config.version = version
+            config.dependencies = dict(dependencies)
+            configs.append(config)
+        collection.add_pakkage(Pakkage(PakkageVersions(configs)))
+
+    root_versions = collection.pakkages[root].versions
+    root_versions.target = next(iter(root_versions.available.values()))  # type: ignore
+    root_versions.target_fixed = True
+    collection.ids_to_be_installed.add(root)
+    return collection
+
+
+def is_valid(catalog: Catalog, root: str, selection: dict[str, str]) -> bool:
+    """Check if the selection contains the root and fulfills all dependencies of the selected versions."""
+    if root not in selection:
+        return False
+    for pakkage_id, version in selection.items():
+        for dependency, version_range in catalog[pakkage_id][version].items():
+            if dependency not in selection or not VersionIndex.test(selection[dependency], version_range):
+                return False
+    return True
+
+
+def create_chain_catalog(length: int, num_versions: int, satisfiable: bool = False) -> Catalog:
+    """
+    Create a chain root -> p0 -> ... -> p{length - 1}, where every version of the last pakkage requires a missing
+    version of x. If satisfiable, p0 has an additional oldest version 0.1.0 without dependencies.
+    """
+    catalog: Catalog = {"root": {"1.0.0": {"p0": "*"}}, "x": {"1.0.0": {}}}
+    for i in range(length):
+        dependencies = {f"p{i + 1}": "*"} if i < length - 1 else {"x": "2"}
+        catalog[f"p{i}"] = {f"{v}.0.0": dict(dependencies) for v in range(1, num_versions + 1)}
+    if satisfiable:
+        catalog["p0"]["0.1.0"] = {}
+    return catalog
+
+
+def create_layered_catalog(num_layers: int, width: int, rnd: random.Random, ranges: list[str]) -> Catalog:
+    """
+    Create layers of pakkages with the versions 1.0.0 to 3.0.0, the root requires every pakkage of the first layer.
+    Every version requires two random pakkages of the next layer with a random range.
+    """
+    ids = [[f"l{layer}_{i}" for i in range(width)] for layer in range(num_layers)]
+    catalog: Catalog = {"root": {"1.0.0": {pakkage_id: "*" for pakkage_id in ids[0]}}}
+    for layer, layer_ids in enumerate(ids):
+        for pakkage_id in layer_ids:
+            catalog[pakkage_id] = {}
+            for major in range(1, 4):
+                dependencies = rnd.sample(ids[layer + 1], 2) if layer + 1 < num_layers else []
+                catalog[pakkage_id][f"{major}.0.0"] = {d: rnd.choice(ranges) for d in dependencies}
+    return catalog
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from pakk.types import type_setup
+from pakk.types.type_setup import AptPlanner
+from pakk.types.type_setup import SetupTypeConfiguration
+
+TTL = 3600.0
+STAMP_PATH = "/cache/apt update.stamp"
+UPDATE = "sudo apt update && touch '/cache/apt update.stamp'"
+
+
+@pytest.fixture
+def planner(monkeypatch):
+    """Plan with a fake dpkg database and a fake age of the package lists."""
+    state = SimpleNamespace(installed=set(), lists_age=0.0)
+    config = SimpleNamespace(apt_update_ttl=SimpleNamespace(value=TTL))
+
+    monkeypatch.setattr(
+        AptPlanner, "get_installed_packages", staticmethod(lambda names: {n for n in names if n in state.installed})
+    )
+    monkeypatch.setattr(AptPlanner, "get_lists_age", staticmethod(lambda: state.lists_age))
+    monkeypatch.setattr(AptPlanner, "get_update_stamp_path", staticmethod(lambda: STAMP_PATH))
+    monkeypatch.setattr(SetupTypeConfiguration, "get_config", classmethod(lambda cls: config))
+    return state
+
+
+def test_all_installed_needs_no_command(planner):
+    planner.installed = {"git", "curl"}
+    assert AptPlanner.plan(["git", "curl"]) is None
+
+
+def test_fresh_lists_update_only_on_failure(planner):
+    planner.installed = {"git"}
+    planner.lists_age = TTL - 1
+
+    install = "sudo apt install -y curl cmake"
+    assert AptPlanner.plan(["git", "curl", "cmake", "curl"]) == f"{install} || ({UPDATE} && {install})"
+
+
+def test_outdated_lists_update_first(planner):
+    planner.lists_age = TTL + 1
+
+    assert AptPlanner.plan(["curl"]) == f"{UPDATE} && sudo apt install -y curl"
+
+
+def test_installed_packages_from_single_dpkg_query(monkeypatch):
+    calls = []
+
+    def run(args, **kwargs):
+        calls.append(args)
+        stdout = "git:amd64\tii \ncurl:amd64\trc \nlibc6:i386\tii \n"
+        return subprocess.CompletedProcess(args, 1, stdout=stdout)
+
+    monkeypatch.setattr(type_setup.subprocess, "run", run)
+
+    installed = AptPlanner.get_installed_packages(["git", "curl", "libc6:i386", "python3=3.10*", "unknown"])
+
+    assert installed == {"git", "libc6:i386"}
+    assert len(calls) == 1
+    # Version specs and patterns are not queried and thus always installed by apt
+    assert "python3=3.10*" not in calls[0]
+
+
+def test_no_dpkg_query_without_plain_package_names(monkeypatch):
+    monkeypatch.setattr(type_setup.subprocess, "run", lambda *args, **kwargs: pytest.fail("dpkg-query was called"))
+    assert AptPlanner.get_installed_packages(["python3=3.10*"]) == set()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import io
+import os
+import tarfile
+from types import SimpleNamespace
+from typing import BinaryIO
+
+import pytest
+
+from pakk.args.install_args import InstallArgs
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.archive_generic import GenericArchiveHelper
+from pakk.connector.github import connector as github_connector
+from pakk.connector.github.connector import GithubConnector
+from pakk.helper.file_util import remove_dir
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageInstallState
+
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+
+PAKK_CFG = b"""
+[info]
+id = a
+version = 1.0.0
+"""
+
+
+def create_archive() -> bytes:
+    """Create a tar.gz archive as served by the git hosts, with a top-level directory named after the commit."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in [("pakk.cfg", PAKK_CFG), ("src/main.py", b"print('a')\n")]:
+            info = tarfile.TarInfo(f"a-{COMMIT}/{name}")
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class Download:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.calls = 0
+
+    def __call__(self, f: BinaryIO):
+        self.calls += 1
+        f.write(self.content)
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch) -> SimpleNamespace:
+    paths = SimpleNamespace(fetch_dir=str(tmp_path / "fetch"), cache_dir=str(tmp_path / "cache"))
+    config = SimpleNamespace(
+        paths=SimpleNamespace(
+            fetch_dir=SimpleNamespace(value=paths.fetch_dir), cache_dir=SimpleNamespace(value=paths.cache_dir)
+        ),
+        pakk_cfg_files=["pakk.cfg"],
+    )
+    args = SimpleNamespace(refetch=False, clear_cache=False)
+    monkeypatch.setattr(MainConfig, "get_config", classmethod(lambda cls: config))
+    monkeypatch.setattr(InstallArgs, "get", classmethod(lambda cls: args))
+    return paths
+
+
+def create_version() -> PakkageConfig:
+    config = PakkageConfig()
+    config.id = "a"
+    config.version = "1.0.0"
+    return config
+
+
+def fetch(download: Download) -> PakkageConfig:
+    version = create_version()
+    GenericArchiveHelper.fetch_pakkage_version_with_archive(version, COMMIT, download, None)
+    return version
+
+
+def test_archive_is_extracted_without_top_level_dir(paths):
+    download = Download(create_archive())
+    version = fetch(download)
+
+    assert version.local_path == os.path.join(paths.fetch_dir, "a@1.0.0")
+    assert version.state.install_state == PakkageInstallState.FETCHED
+    assert os.path.isfile(os.path.join(version.local_path, "src", "main.py"))
+    assert os.path.isfile(GenericArchiveHelper.get_archive_path(COMMIT))
+    assert GenericArchiveHelper.get_extracted_commit(version.local_path) == COMMIT
+    assert download.calls == 1
+
+
+def test_cached_archive_is_reused(paths):
+    download = Download(create_archive())
+    version = fetch(download)
+    remove_dir(version.local_path or "")
+
+    fetch(download)
+    assert download.calls == 1
+
+
+def test_failed_download_is_not_cached(paths):
+    def download(f: BinaryIO):
+        f.write(b"partial")
+        raise ConnectionError("connection lost")
+
+    with pytest.raises(ConnectionError):
+        GenericArchiveHelper.fetch_pakkage_version_with_archive(create_version(), COMMIT, download, None)
+
+    assert os.listdir(os.path.dirname(GenericArchiveHelper.get_archive_path(COMMIT))) == []
+
+
+def test_broken_archive_is_removed(paths):
+    with pytest.raises(tarfile.TarError):
+        fetch(Download(b"no archive"))
+
+    assert not os.path.exists(GenericArchiveHelper.get_archive_path(COMMIT))
+    assert not os.path.exists(os.path.join(paths.fetch_dir, "a@1.0.0"))
+
+    # The next fetch downloads the archive again
+    download = Download(create_archive())
+    fetch(download)
+    assert download.calls == 1
+
+
+class FakeResponse:
+    def __init__(self):
+        self.headers: dict[str, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size: int):
+        yield b"archive"
+
+
+@pytest.mark.parametrize("token, authorized", [("", False), ("secret", True)])
+def test_github_archive_download_sends_token_only_if_set(monkeypatch, token: str, authorized: bool):
+    response = FakeResponse()
+
+    def get(url: str, headers: dict[str, str], **kwargs):
+        response.headers = headers
+        return response
+
+    monkeypatch.setattr(github_connector.requests, "get", get)
+    connector = GithubConnector.__new__(GithubConnector)
+    connector._token = token
+    connector.config = SimpleNamespace(_timeout=SimpleNamespace(value=10))  # type: ignore
+
+    file = io.BytesIO()
+    connector.download_archive("https://github.com/icampus-wildau/pakk.git", COMMIT, file)
+
+    assert file.getvalue() == b"archive"
+    assert ("Authorization" in response.headers) == authorized
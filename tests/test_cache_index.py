@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+
+import pytest
+
+from pakk.connector.cache import CACHE_INDEX_FILE_NAME
+from pakk.connector.cache import CacheIndex
+from pakk.connector.cache import CachedListingPage
+from pakk.connector.cache import CachedRepository
+from pakk.connector.cache import CachedTag
+
+PAKK_CFG = """
+[info]
+id = a
+version = 1.2.0
+
+[dependencies]
+b = ^1.0.0
+"""
+
+
+def create_repo(repo_id: str = "1") -> CachedRepository:
+    repo = CachedRepository()
+    repo.id = repo_id
+    repo.url = f"https://example.com/{repo_id}.git"
+
+    tag = CachedTag()
+    tag.tag = "v1.2.0"
+    tag.commit = "abc"
+    tag.pakk_config_str = PAKK_CFG
+    tag.is_pakk_version = True
+
+    other = CachedTag()
+    other.tag = "latest"
+    other.commit = "def"
+
+    repo.tags = {tag.tag: tag, other.tag: other}
+    return repo
+
+
+@pytest.fixture
+def index(tmp_path) -> CacheIndex:
+    return CacheIndex(str(tmp_path))
+
+
+def test_put_and_get(index: CacheIndex):
+    repo = create_repo()
+    index.put("group_a", repo)
+
+    cached = index.get("group_a")
+    assert cached is not None
+    assert (cached.id, cached.url) == (repo.id, repo.url)
+    assert cached.last_activity.replace(tzinfo=None) == repo.last_activity
+    assert sorted(cached.tags) == ["latest", "v1.2.0"]
+
+    # The pakk config is parsed once when storing the tag
+    tag = cached.tags["v1.2.0"]
+    assert (tag.pakk_id, tag.pakk_version, tag.dependencies) == ("a", "1.2.0", {"b": "^1.0.0"})
+    assert tag.version == "1.2.0"
+    assert not cached.tags["latest"].is_pakk_version
+
+    assert index.get("missing") is None
+
+
+def test_put_replaces_tags(index: CacheIndex):
+    repo = create_repo()
+    index.put("group_a", repo)
+
+    del repo.tags["latest"]
+    index.put("group_a", repo)
+    index.put("group_b", create_repo("2"))
+
+    cached = index.get("group_a")
+    assert cached is not None and sorted(cached.tags) == ["v1.2.0"]
+    assert sorted(r.id for r in index.get_all()) == ["1", "2"]
+
+
+def test_json_files_are_migrated(tmp_path):
+    repo = create_repo()
+    repo.write(str(tmp_path / "group_a.json"))
+    with open(tmp_path / "invalid.json", "w") as f:
+        f.write("no json")
+
+    index = CacheIndex(str(tmp_path))
+
+    cached = index.get("group_a")
+    assert cached is not None and sorted(cached.tags) == ["latest", "v1.2.0"]
+    assert cached.tags["v1.2.0"].pakk_id == "a"
+    assert [f for f in os.listdir(tmp_path) if f.endswith(".json")] == []
+
+
+def test_other_schema_version_is_dropped(tmp_path):
+    CacheIndex(str(tmp_path)).put("group_a", create_repo())
+
+    with sqlite3.connect(str(tmp_path / CACHE_INDEX_FILE_NAME)) as con:
+        con.execute("PRAGMA user_version = 0")
+
+    assert CacheIndex(str(tmp_path)).get_all() == []
+
+
+def test_listing_pages(index: CacheIndex):
+    assert index.get_listing_page("https://example.com/page/1") is None
+
+    page = CachedListingPage("https://example.com/page/1", etag='W/"1"', body='[{"id": 1}]', next_url="next")
+    index.put_listing_page(page)
+
+    cached = index.get_listing_page(page.url)
+    assert cached is not None
+    assert cached.items == [{"id": 1}]
+    assert cached.next_url == "next"
+    assert cached.get_conditional_headers() == {"If-None-Match": 'W/"1"'}
+
+    index.clear()
+    assert index.get_listing_page(page.url) is None
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+from pakk.dependency_tree.graph import DependencyGraph
+from pakk.dependency_tree.graph import GraphCycleError
+
+
+def create_graph() -> DependencyGraph:
+    # r -> a -> c, r -> b -> c -> d, unconnected node u
+    graph = DependencyGraph(["r", "a", "b", "c", "d", "u"])
+    for u, v in [("r", "a"), ("r", "b"), ("a", "c"), ("b", "c"), ("c", "d")]:
+        graph.add_edge(u, v)
+    return graph
+
+
+def sort_generations(generations: list[list[str]]) -> list[list[str]]:
+    return [sorted(g) for g in generations]
+
+
+def test_generations():
+    graph = create_graph()
+    assert sort_generations(graph.topological_generations()) == [["r", "u"], ["a", "b"], ["c"], ["d"]]
+    assert graph.topological_sort()[:2] in (["r", "u"], ["u", "r"])
+    assert graph.topological_sort()[-2:] == ["c", "d"]
+
+
+def test_generations_of_selected_nodes():
+    graph = create_graph()
+    # Edges to nodes outside of the selection are ignored
+    assert sort_generations(graph.topological_generations(["a", "c", "d"])) == [["a"], ["c"], ["d"]]
+    assert sort_generations(graph.topological_generations(["b", "d"])) == [["b", "d"]]
+
+
+def test_reverse_view_shares_storage():
+    graph = create_graph()
+    reverse = graph.reverse_view()
+
+    assert sort_generations(reverse.topological_generations()) == [["d", "u"], ["c"], ["a", "b"], ["r"]]
+    assert sorted(reverse.successors("c")) == ["a", "b"]
+
+    graph.add_edge("d", "e")
+    assert list(reverse.successors("e")) == ["d"]
+    assert reverse.number_of_edges() == graph.number_of_edges() == 6
+
+
+def test_edges_and_degrees():
+    graph = create_graph()
+    assert graph.number_of_nodes() == 6
+    assert graph.number_of_edges() == 5
+    assert graph.has_edge("r", "a") and not graph.has_edge("a", "r")
+    assert graph.out_degree("r") == 2 and graph.in_degree("c") == 2
+
+    graph.add_edge("r", "a")
+    assert graph.number_of_edges() == 5
+
+    graph.remove_edge("r", "a")
+    assert not graph.has_edge("r", "a")
+    assert list(graph.predecessors("a")) == []
+    with pytest.raises(KeyError):
+        graph.remove_edge("r", "a")
+
+
+def test_remove_successors_and_nodes():
+    graph = create_graph()
+    assert graph.remove_successors("r") == {"a", "b"}
+    assert graph.number_of_edges() == 3
+    assert list(graph.predecessors("a")) == []
+
+    graph.remove_node("c")
+    assert "c" not in graph
+    assert graph.number_of_edges() == 0
+    assert list(graph.successors("a")) == []
+    assert graph.nodes == ["r", "a", "b", "d", "u"]
+    with pytest.raises(KeyError):
+        graph.successors("c")
+
+    # A removed node can be added again
+    graph.add_edge("a", "c")
+    assert sort_generations(graph.topological_generations()) == [["a", "b", "d", "r", "u"], ["c"]]
+
+
+def test_subgraph():
+    graph = create_graph()
+    subgraph = graph.subgraph(["r", "a", "c", "x"])
+
+    assert sorted(subgraph.nodes) == ["a", "c", "r"]
+    assert sorted(subgraph.edges) == [("a", "c"), ("r", "a")]
+    # The subgraph is independent of the graph
+    subgraph.add_edge("c", "r")
+    assert not graph.has_edge("c", "r")
+
+
+def test_cycle_raises():
+    graph = create_graph()
+    graph.add_edge("d", "a")
+
+    with pytest.raises(GraphCycleError):
+        graph.topological_sort()
+    with pytest.raises(GraphCycleError):
+        graph.topological_generations(["a", "c", "d"])
+    # The cycle is not part of the selected nodes
+    assert sort_generations(graph.topological_generations(["r", "a", "b"])) == [["r"], ["a", "b"]]
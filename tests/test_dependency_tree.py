@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from pakk.dependency_tree.graph import DependencyGraph
+from pakk.dependency_tree.tree import DependencyTree
+from pakk.pakkage.core import Pakkage
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageVersions
+
+N_NODES = 10_000
+
+
+def create_tree(n_nodes: int, seed: int = 0) -> DependencyTree:
+    """
+    Create a tree of discovered pakkages with random acyclic dependencies.
+    Only a small part of them is installed or targeted, as it is the case when discovering a whole index.
+    """
+    rng = random.Random(seed)
+    pakkages: dict[str, Pakkage] = {}
+    for i in range(n_nodes):
+        config = PakkageConfig()
+        config.id = f"p{i}"
+        config.version = "1.0.0"
+        n_deps = rng.randint(0, 3) if i < n_nodes - 1 else 0
+        config.dependencies = {f"p{j}": "*" for j in rng.sample(range(i + 1, n_nodes), min(n_deps, n_nodes - i - 1))}
+        pakkages[config.id] = Pakkage(PakkageVersions([config]))
+
+    for i in rng.sample(range(n_nodes), n_nodes // 20):
+        versions = pakkages[f"p{i}"].versions
+        if i % 2 == 0:
+            versions.installed = versions.available["1.0.0"]
+        else:
+            versions.target = versions.available["1.0.0"]
+
+    tree = DependencyTree(pakkages)
+    tree.init_pakkages()
+    return tree
+
+
+@pytest.fixture(scope="module")
+def tree() -> DependencyTree:
+    return create_tree(N_NODES)
+
+
+def assert_valid_order(graph: DependencyGraph, order: list[str]):
+    """Assert that every node of the order is listed after the nodes depending on it."""
+    position = {node: i for i, node in enumerate(order)}
+    assert len(position) == len(order)
+    for u, v in graph.edges:
+        if u in position and v in position:
+            assert position[u] < position[v], f"{u} depends on {v} but is sorted after it"
+
+
+def test_full_sorting_is_valid(tree: DependencyTree):
+    order = tree.get_topologic_sorting(compact=False)
+
+    assert sorted(order) == sorted(tree.tree.nodes)
+    # The sorting ends with the roots, so the reversed order lists the dependents first
+    assert_valid_order(tree.tree, list(reversed(order)))
+
+
+def test_relevant_subgraph_sorting_matches_full_sorting(tree: DependencyTree):
+    nodes = tree._get_interesting_nodes()
+    assert 0 < len(nodes) < N_NODES
+
+    compact = tree.get_topologic_sorting(compact=True)
+    full = tree.get_topologic_sorting(compact=False)
+
+    assert sorted(compact) == sorted(nodes)
+    assert_valid_order(tree.tree, list(reversed(compact)))
+    # Restricting the full sorting to the relevant nodes gives a valid order of the same nodes
+    relevant = set(nodes)
+    restricted = [n for n in full if n in relevant]
+    assert sorted(restricted) == sorted(compact)
+    assert_valid_order(tree.tree, list(reversed(restricted)))
+
+
+def test_relevant_subgraph_generations_match_subgraph(tree: DependencyTree):
+    nodes = tree._get_interesting_nodes()
+
+    generations = tree.get_topological_generations(compact=True)
+    expected = [sorted(g) for g in tree.tree.subgraph(nodes).topological_generations()]
+
+    assert generations == expected
+    assert tree.get_topological_generations(compact=True, reversed=True) == list(reversed(expected))
+
+
+def test_relevant_nodes_contain_installed_targets_and_their_neighbors(tree: DependencyTree):
+    nodes = set(tree._get_interesting_nodes())
+
+    for node_id, pakkage in tree.pakkages.items():
+        if pakkage.versions.installed is None and pakkage.versions.target is None:
+            continue
+        assert node_id in nodes
+        assert set(tree.tree.successors(node_id)) <= nodes
+        assert set(tree.tree.predecessors(node_id)) <= nodes
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pakk.connector.base import PakkageCollection
+from pakk.helper import progress
+from pakk.helper.progress import shared_progress
+
+
+class FastConnector:
+    def discover(self, pakkage_ids):
+        return PakkageCollection()
+
+
+class HangingConnector:
+    def __init__(self):
+        self.release = threading.Event()
+        self.finished = threading.Event()
+
+    def discover(self, pakkage_ids):
+        with shared_progress():
+            self.release.wait(5)
+        self.finished.set()
+        return PakkageCollection()
+
+
+class FailingConnector:
+    def discover(self, pakkage_ids):
+        raise RuntimeError("discovery failed")
+
+
+def test_timed_out_connector_is_skipped_and_releases_progress():
+    fast, hanging = FastConnector(), HangingConnector()
+    results = PakkageCollection._discover_concurrently([fast, hanging], None, 0.2)  # type: ignore
+
+    assert results[0] is not None
+    assert results[1] is None
+    assert progress._shared_progress is None
+    assert len(progress._shared_progress_users) == 0
+
+    # Finishing later changes neither the results nor the progress users
+    hanging.release.set()
+    assert hanging.finished.wait(5)
+    assert results[1] is None
+    assert len(progress._shared_progress_users) == 0
+
+
+def test_errors_are_raised():
+    with pytest.raises(RuntimeError):
+        PakkageCollection._discover_concurrently([FastConnector(), FailingConnector()], None, 1)  # type: ignore
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from github.ContentFile import ContentFile
+from github.GithubException import GithubException
+from github.GithubException import UnknownObjectException
+
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.github.connector import GithubConnector
+
+PAKK_CFG = "[info]\nid = a\nversion = 1.0.0\n"
+
+
+class FakeContentFile(ContentFile):
+    def __init__(self, content: str):
+        self._content_str = content
+
+    @property
+    def decoded_content(self) -> bytes:
+        return self._content_str.encode("utf-8")
+
+
+class FakeRepo:
+    """Repository answering the contents requests of the tags with the given results."""
+
+    def __init__(self, results: dict[str, str | Exception]):
+        self.results = results
+        self.full_name = "icampus-wildau/a"
+        self.clone_url = "https://github.com/icampus-wildau/a.git"
+        self.pushed_at = datetime(2024, 1, 1)
+        self.requests: list[str] = []
+
+    def get_tags(self):
+        return [SimpleNamespace(name=name, commit=SimpleNamespace(sha=f"sha_{name}")) for name in self.results]
+
+    def get_contents(self, path: str, ref: str):
+        self.requests.append(ref)
+        result = self.results[ref]
+        if isinstance(result, Exception):
+            raise result
+        return FakeContentFile(result)
+
+
+@pytest.fixture(autouse=True)
+def pakk_cfg_files(monkeypatch):
+    config = SimpleNamespace(pakk_cfg_files=["pakk.cfg"])
+    monkeypatch.setattr(MainConfig, "get_config", classmethod(lambda cls: config))
+
+
+def get_cached_repo(repo: FakeRepo, existing=None):
+    connector = GithubConnector.__new__(GithubConnector)
+    return connector._get_cached_repo(repo, existing)  # type: ignore
+
+
+def test_tags_without_pakk_cfg_are_cached():
+    repo = FakeRepo({"v1.0.0": PAKK_CFG, "latest": UnknownObjectException(404, "Not Found", None)})
+
+    cached = get_cached_repo(repo)
+
+    assert cached.tags["v1.0.0"].is_pakk_version
+    assert cached.tags["v1.0.0"].pakk_config_str == PAKK_CFG
+    assert not cached.tags["latest"].is_pakk_version
+
+    # Cached tags are not requested again
+    get_cached_repo(repo, cached)
+    assert len(repo.requests) == 2
+
+
+def test_failed_tags_are_raised():
+    # The repo is not cached then, so the tag is requested again with the next update
+    repo = FakeRepo({"v1.0.0": PAKK_CFG, "v1.1.0": GithubException(500, "Server Error", None)})
+
+    with pytest.raises(GithubException):
+        get_cached_repo(repo)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import base64
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlparse
+
+import gitlab
+import gitlab.v4.objects as gl_objects
+import pytest
+
+from pakk.args.install_args import InstallArgs
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.cache import CachedRepository
+from pakk.connector.cache import CachedTag
+from pakk.connector.gitlab.connector import GitlabConnector
+
+N_PROJECTS = 200
+N_TAGS = 2
+N_WORKERS = 4
+PAGE_SIZE = 100
+
+# Latency of every api request of the mocked server
+REQUEST_DELAY = 0.002
+
+GROUP_ID = 1
+DATE = "2024-01-01T00:00:00Z"
+
+
+def get_pakk_cfg(project_id: int, tag: int) -> str:
+    return f"[info]\nid = project{project_id}\nversion = 1.0.{tag}\n"
+
+
+class GitlabApiHandler(BaseHTTPRequestHandler):
+    """
+    Answer the requests of the GitLab api used by the cache update, for projects with the ids 1 to N_PROJECTS.
+    The commit of every tag is named after its project and tag, e.g. commit_3_1, and contains a pakk.cfg.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server: GitlabApiServer = self.server  # type: ignore
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(p) for p in url.path.removeprefix("/api/v4/").split("/")]
+
+        time.sleep(server.request_delay)
+        headers: dict[str, str] = {}
+        match parts:
+            case ["groups", _, "projects"]:
+                kind = "group_projects"
+                page = int(query["page"][0])
+                ids = range((page - 1) * PAGE_SIZE + 1, min(page * PAGE_SIZE, N_PROJECTS) + 1)
+                body = [self.get_project(i) for i in ids]
+                headers["X-Next-Page"] = str(page + 1) if page * PAGE_SIZE < N_PROJECTS else ""
+            case ["projects", project_id]:
+                kind = "project"
+                body = self.get_project(int(project_id))
+            case ["projects", project_id, "repository", "tags"]:
+                kind = "tags"
+                body = [
+                    {"name": f"v1.0.{t}", "commit": {"id": f"commit_{project_id}_{t}", "committed_date": DATE}}
+                    for t in range(N_TAGS)
+                ]
+            case ["projects", project_id, "repository", "tree"]:
+                kind = "tree"
+                tag = query["ref"][0].split("_")[-1]
+                body = [
+                    {"id": f"blob_{project_id}_{tag}", "name": "pakk.cfg", "type": "blob", "path": "pakk.cfg"},
+                    {"id": "readme", "name": "README.md", "type": "blob", "path": "README.md"},
+                ]
+            case ["projects", project_id, "repository", "blobs", sha]:
+                kind = "blob"
+                content = get_pakk_cfg(int(project_id), int(sha.split("_")[-1])).encode("utf-8")
+                body = {"sha": sha, "encoding": "base64", "content": base64.b64encode(content).decode("ascii")}
+            case ["projects", project_id, "repository", "files", "pakk.cfg", "raw"]:
+                kind = "raw"
+                body = get_pakk_cfg(int(project_id), int(query["ref"][0].split("_")[-1]))
+            case _:
+                kind = "unknown"
+                body = {"message": "404 Not Found"}
+
+        with server.lock:
+            server.requests[kind] += 1
+
+        content = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(404 if kind == "unknown" else 200)
+        self.send_header("Content-Type", "text/plain" if isinstance(body, str) else "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    @staticmethod
+    def get_project(project_id: int) -> dict:
+        return {
+            "id": project_id,
+            "name": f"project{project_id}",
+            "http_url_to_repo": f"https://gitlab.example.com/group/project{project_id}.git",
+            "last_activity_at": DATE,
+            "archived": False,
+        }
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GitlabApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), GitlabApiHandler)
+        self.request_delay = REQUEST_DELAY
+        self.lock = threading.Lock()
+        self.requests: Counter[str] = Counter()
+
+
+class TreeBlobGitlabConnector(GitlabConnector):
+    """The former cache update, listing the repository tree of every tag and loading the pakk.cfg blob."""
+
+    def _get_cached_repo(
+        self, project: gl_objects.GroupProject, existing_cache_project: CachedRepository | None
+    ) -> CachedRepository:
+        cache_project = existing_cache_project or CachedRepository()
+        cache_project.id = project.attributes["id"]
+        cache_project.url = project.attributes["http_url_to_repo"]
+        cache_project.last_activity = GitlabConnector.datetime_string_to_datetime(
+            project.attributes["last_activity_at"]
+        )
+
+        pakk_files = MainConfig.get_config().pakk_cfg_files
+
+        gl_project = self.gl.projects.get(cache_project.id)
+        tags = gl_project.tags.list()
+        for tag in tags:
+            tag_str = tag.attributes["name"]
+            last_activity = GitlabConnector.datetime_string_to_datetime(tag.attributes["commit"]["committed_date"])
+
+            if tag_str in cache_project.tags and cache_project.tags[tag_str].last_activity >= last_activity:
+                continue
+
+            cached_tag = CachedTag()
+            cached_tag.tag = tag_str
+            cached_tag.commit = tag.attributes["commit"]["id"]
+            cached_tag.last_activity = last_activity
+
+            repo_tree = gl_project.repository_tree(ref=cached_tag.commit, all=True)
+            for item in repo_tree:
+                if item["name"] in pakk_files:
+                    file_info = gl_project.repository_blob(item["id"])
+                    file_content = base64.b64decode(file_info["content"])  # type: ignore
+                    cached_tag.pakk_config_str = file_content.decode("utf-8")
+                    cached_tag.is_pakk_version = True
+                    cache_project.tags[cached_tag.tag] = cached_tag
+                    break
+
+        return cache_project
+
+
+@pytest.fixture
+def server():
+    server = GitlabApiServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def configs(monkeypatch):
+    config = SimpleNamespace(pakk_cfg_files=["pakk.cfg"])
+    args = SimpleNamespace(clear_cache=True)
+    monkeypatch.setattr(MainConfig, "get_config", classmethod(lambda cls: config))
+    monkeypatch.setattr(InstallArgs, "get", classmethod(lambda cls: args))
+
+
+def update_cache(
+    connector_cls: type[GitlabConnector], server: GitlabApiServer, cache_dir: str
+) -> tuple[list[CachedRepository], Counter[str], float]:
+    """Update the cache of all projects with the given connector and return the projects, requests and time."""
+    connector = connector_cls.__new__(connector_cls)
+    connector.gl = gitlab.Gitlab(f"http://127.0.0.1:{server.server_address[1]}")
+    connector.config = SimpleNamespace(  # type: ignore
+        num_discover_workers=SimpleNamespace(value=N_WORKERS),
+        group_id=SimpleNamespace(value=GROUP_ID),
+        include_archived=SimpleNamespace(value=False),
+        cache_dir=SimpleNamespace(value=cache_dir),
+    )
+    connector._cache_index = None
+    connector.connected = True
+
+    server.requests.clear()
+    start = time.monotonic()
+    projects = connector._update_cache()
+    return projects, Counter(server.requests), time.monotonic() - start
+
+
+def get_pakk_configs(projects: list[CachedRepository]) -> dict[tuple[int, str], str]:
+    return {(p.id, t.tag): t.pakk_config_str for p in projects for t in p.tags.values() if t.is_pakk_version}
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_benchmark_raw_file_against_tree_and_blob(server: GitlabApiServer, tmp_path):
+    tree_projects, tree_requests, tree_time = update_cache(TreeBlobGitlabConnector, server, str(tmp_path / "tree"))
+    raw_projects, raw_requests, raw_time = update_cache(GitlabConnector, server, str(tmp_path / "raw"))
+
+    assert len(raw_projects) == N_PROJECTS
+    assert get_pakk_configs(raw_projects) == get_pakk_configs(tree_projects)
+    assert len(get_pakk_configs(raw_projects)) == N_PROJECTS * N_TAGS
+
+    n_pages = -(-N_PROJECTS // PAGE_SIZE)
+    assert tree_requests == {
+        "group_projects": n_pages,
+        "project": N_PROJECTS,
+        "tags": N_PROJECTS,
+        "tree": N_PROJECTS * N_TAGS,
+        "blob": N_PROJECTS * N_TAGS,
+    }
+    # One request per tag instead of two, the project itself is not loaded
+    assert raw_requests == {"group_projects": n_pages, "tags": N_PROJECTS, "raw": N_PROJECTS * N_TAGS}
+    assert raw_time < tree_time, f"raw file {raw_time:.2f}s, tree and blob {tree_time:.2f}s"
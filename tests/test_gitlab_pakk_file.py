@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from gitlab.exceptions import GitlabGetError
+
+from pakk.config.main_cfg import MainConfig
+from pakk.connector.gitlab.connector import GitlabConnector
+
+PAKK_CFG = "[info]\nid = a\nversion = 1.0.0\n"
+
+
+class FakeFiles:
+    """Raw file endpoint of a project, counting the requests."""
+
+    def __init__(self, files: dict[tuple[str, str], str], error_code: int = 404):
+        self.files = files
+        self.error_code = error_code
+        self.requests: list[tuple[str, str]] = []
+
+    def raw(self, file_path: str, ref: str) -> bytes:
+        self.requests.append((file_path, ref))
+        if (file_path, ref) not in self.files:
+            raise GitlabGetError("File Not Found", self.error_code)
+        return self.files[(file_path, ref)].encode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def pakk_cfg_files(monkeypatch):
+    config = SimpleNamespace(pakk_cfg_files=["pakk.cfg"])
+    monkeypatch.setattr(MainConfig, "get_config", classmethod(lambda cls: config))
+
+
+def test_one_request_per_tag():
+    files = FakeFiles({("pakk.cfg", f"commit{i}"): PAKK_CFG for i in range(0, 20, 2)})
+    project = SimpleNamespace(files=files)
+
+    contents = [GitlabConnector._get_pakk_file_content(project, f"commit{i}") for i in range(20)]  # type: ignore
+
+    assert contents == [PAKK_CFG if i % 2 == 0 else None for i in range(20)]
+    assert len(files.requests) == 20
+
+
+def create_connector(files: FakeFiles, n_tags: int) -> GitlabConnector:
+    tags = [
+        SimpleNamespace(
+            attributes={"name": f"v1.0.{i}", "commit": {"id": f"commit{i}", "committed_date": "2024-01-01T00:00:00Z"}}
+        )
+        for i in range(n_tags)
+    ]
+    project = SimpleNamespace(files=files, tags=SimpleNamespace(list=lambda **kwargs: iter(tags)))
+    connector = GitlabConnector.__new__(GitlabConnector)
+    connector.gl = SimpleNamespace(projects=SimpleNamespace(get=lambda id, lazy: project))  # type: ignore
+    return connector
+
+
+def test_cached_tags_are_not_requested_again():
+    files = FakeFiles({("pakk.cfg", f"commit{i}"): PAKK_CFG for i in range(0, 20, 2)})
+    connector = create_connector(files, 20)
+    project = SimpleNamespace(
+        attributes={"id": 1, "http_url_to_repo": "https://example.com/a.git", "last_activity_at": "2024-01-01T00:00:00Z"}
+    )
+
+    cached = connector._get_cached_repo(project, None)  # type: ignore
+    assert len(cached.tags) == 20
+    assert sum(t.is_pakk_version for t in cached.tags.values()) == 10
+    assert len(files.requests) == 20
+
+    # Tags without pakk configuration are cached as well
+    connector._get_cached_repo(project, cached)  # type: ignore
+    assert len(files.requests) == 20
+
+
+def test_other_errors_are_raised():
+    project = SimpleNamespace(files=FakeFiles({}, error_code=500))
+
+    with pytest.raises(GitlabGetError):
+        GitlabConnector._get_pakk_file_content(project, "commit")  # type: ignore
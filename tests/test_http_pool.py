@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+from requests.adapters import DEFAULT_POOLSIZE
+
+from pakk.helper.http import get_pool_size
+from pakk.helper.http import mount_connection_pool
+
+N_WORKERS = 16
+N_REQUESTS = 160
+
+# Latency of opening a connection (TLS handshake with a remote host) and of answering a request
+CONNECT_DELAY = 0.05
+REQUEST_DELAY = 0.005
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        server: CountingServer = self.server  # type: ignore
+        time.sleep(server.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        server: CountingServer = self.server  # type: ignore
+        with server.lock:
+            server.connections.add(self.client_address)
+        time.sleep(server.request_delay)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    """Local server counting the opened client connections, optionally delaying new connections and requests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, connect_delay: float = 0, request_delay: float = 0):
+        super().__init__(("127.0.0.1", 0), KeepAliveHandler)
+        self.connect_delay = connect_delay
+        self.request_delay = request_delay
+        self.lock = threading.Lock()
+        self.connections: set[tuple[str, int]] = set()
+
+
+def start_server(server: CountingServer):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server():
+    yield from start_server(CountingServer())
+
+
+@pytest.fixture
+def slow_server():
+    yield from start_server(CountingServer(CONNECT_DELAY, REQUEST_DELAY))
+
+
+def test_pool_size():
+    assert get_pool_size(8, 16) == 24
+    assert get_pool_size(4, 4) == DEFAULT_POOLSIZE
+    assert get_pool_size() == DEFAULT_POOLSIZE
+
+
+def send_requests(server: CountingServer, session: requests.Session) -> float:
+    """
+    Send the requests from all workers in bursts and return the elapsed time.
+    Between the bursts all connections are idle, as between two listing pages or during a rate limit pause.
+    """
+    url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    server.connections.clear()
+
+    start = time.monotonic()
+    statuses: list[int] = []
+    with ThreadPoolExecutor(N_WORKERS) as executor:
+        for _ in range(N_REQUESTS // N_WORKERS):
+            statuses.extend(executor.map(lambda _: session.get(url).status_code, range(N_WORKERS)))
+
+    assert statuses == [200] * N_REQUESTS
+    return time.monotonic() - start
+
+
+def test_workers_reuse_pooled_connections(server: CountingServer):
+    session = mount_connection_pool(requests.Session(), get_pool_size(N_WORKERS))
+
+    send_requests(server, session)
+    # Every worker keeps its connection alive instead of opening a new one per request
+    assert len(server.connections) <= N_WORKERS
+
+
+def test_benchmark_shared_pool_against_default_session(slow_server: CountingServer):
+    # The default pool of requests keeps 10 idle connections, the others are closed after every burst
+    default_time = send_requests(slow_server, requests.Session())
+    default_connections = len(slow_server.connections)
+
+    pooled_time = send_requests(slow_server, mount_connection_pool(requests.Session(), get_pool_size(N_WORKERS)))
+    pooled_connections = len(slow_server.connections)
+
+    assert pooled_connections <= N_WORKERS < default_connections
+    assert pooled_time < default_time, f"pooled {pooled_time:.2f}s, default {default_time:.2f}s"
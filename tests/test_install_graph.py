@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+from pakk.dependency_tree.graph import DependencyGraph
+from pakk.installer.combining_installer import InstallerCombining
+from pakk.installer.combining_installer import InstallGraph
+from pakk.installer.combining_installer import InstallNode
+from pakk.pakkage.core import Pakkage
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageVersions
+from pakk.types.base import InstallType
+
+
+class FakeType:
+    def __init__(self):
+        self.install_type = InstallType()
+
+
+class FakeTree:
+    def __init__(self, ids: list[str], edges: list[tuple[str, str]]):
+        self.tree = DependencyGraph(ids)
+        for u, v in edges:
+            self.tree.add_edge(u, v)
+
+
+def create_graph(ids: list[str], edges: list[tuple[str, str]]) -> InstallGraph:
+    pakkages = []
+    for pakkage_id in ids:
+        config = PakkageConfig()
+        config.id = pakkage_id
+        config.version = "1.0.0"
+        pakkages.append(Pakkage(PakkageVersions([config], target=config)))
+    return InstallGraph(pakkages, FakeTree(ids, edges), prepared=False)  # type: ignore
+
+
+def prepare(graph: InstallGraph, node: InstallNode):
+    node.types_to_install = [FakeType()]  # type: ignore
+    node.prepared = True
+    graph.update_node(node)
+
+
+def test_failed_fetch_blocks_parents():
+    # app depends on lib, the fetch of lib failed
+    graph = create_graph(["app", "lib"], [("app", "lib")])
+    app, lib = graph.install_nodes["app"], graph.install_nodes["lib"]
+
+    prepare(graph, app)
+    lib.pakkage_config.state.failed_types.append(InstallNode.FETCH_FAILED)
+    graph.update_node(lib)
+
+    assert lib.fetch_failed and lib.blocks_parents and not lib.is_finished
+    assert graph.select_ready_nodes(lambda c: False) == []
+    assert list(graph.unfinished_nodes) == [app, lib]
+
+
+def test_failed_install_does_not_block_parents():
+    # As before the pipelining, a failed type does not stop the installation of the remaining types and the parents
+    graph = create_graph(["app", "lib"], [("app", "lib")])
+    app, lib = graph.install_nodes["app"], graph.install_nodes["lib"]
+    prepare(graph, app)
+    prepare(graph, lib)
+    lib.types_to_install.append(FakeType())  # type: ignore
+    assert graph.select_ready_nodes(lambda c: False) == [lib]
+
+    lib.types_to_install.pop(0)
+    lib.pakkage_config.state.failed_types.append("FakeType")
+    graph.update_node(lib)
+    assert not lib.fetch_failed
+    assert graph.select_ready_nodes(lambda c: False) == [lib]
+
+    lib.types_to_install.pop(0)
+    graph.update_node(lib)
+    assert lib.is_finished
+    assert graph.select_ready_nodes(lambda c: False) == [app]
+
+
+def test_finished_child_unblocks_parents():
+    graph = create_graph(["app", "lib"], [("app", "lib")])
+    app, lib = graph.install_nodes["app"], graph.install_nodes["lib"]
+    prepare(graph, app)
+    prepare(graph, lib)
+
+    lib.types_to_install.pop(0)
+    graph.update_node(lib)
+    assert lib.is_finished
+    assert graph.select_ready_nodes(lambda c: False) == [app]
+
+
+class RecordingType:
+    """Type recording which installations run at the same time."""
+
+    EXCLUSIVE_RESOURCES: set[str] = set()
+    INDEPENDENT = False
+    DURATION = 0.0
+
+    lock = threading.Lock()
+    active: set[str] = set()
+    overlaps: list[tuple[str, str]] = []
+    started = threading.Event()
+
+    def __init__(self, pakkage_version: PakkageConfig):
+        self.pakkage_version = pakkage_version
+        self.install_type = InstallType()
+        self.install_type.is_independent = self.INDEPENDENT
+        self.status_callback = None
+
+    @classmethod
+    def allows_multiple_simultaneous_installations(cls) -> bool:
+        return True
+
+    @classmethod
+    def supervised_installation(cls, types: list[RecordingType]):
+        with RecordingType.lock:
+            RecordingType.overlaps.extend((cls.__name__, other) for other in RecordingType.active)
+            RecordingType.active.add(cls.__name__)
+        RecordingType.started.set()
+        time.sleep(cls.DURATION)
+        with RecordingType.lock:
+            RecordingType.active.discard(cls.__name__)
+
+
+class FakePipType(RecordingType):
+    EXCLUSIVE_RESOURCES = {"pip"}
+    DURATION = 0.5
+
+
+class FakeSetupType(RecordingType):
+    EXCLUSIVE_RESOURCES = {"apt", "pip"}
+    INDEPENDENT = True
+
+
+class ScriptedPipeline:
+    """Fetch pipeline finishing the pip pakkage first and the setup pakkage while the pip installation runs."""
+
+    def __init__(self, graph: InstallGraph):
+        self.graph = graph
+        self.pending_ids = {"pip_pakkage", "setup_pakkage"}
+
+    def wait_for_fetched(self, block: bool = True):
+        if "pip_pakkage" in self.pending_ids:
+            pakkage_id = "pip_pakkage"
+        elif RecordingType.started.wait(1):
+            pakkage_id = "setup_pakkage"
+        else:
+            return [], []
+        self.pending_ids.discard(pakkage_id)
+        return [SimpleNamespace(id=pakkage_id)], []
+
+
+def test_independent_types_wait_for_conflicting_batches(monkeypatch):
+    monkeypatch.setattr(PakkageConfig, "move_to", lambda self, directory: None)
+    RecordingType.overlaps.clear()
+    RecordingType.started.clear()
+
+    graph = create_graph(["pip_pakkage", "setup_pakkage"], [])
+    for node in graph:
+        config = node.pakkage_config
+        type_class = FakePipType if config.id == "pip_pakkage" else FakeSetupType
+        config._types = [type_class(config)]
+
+    installer = InstallerCombining.__new__(InstallerCombining)
+    installer.config = SimpleNamespace(install=SimpleNamespace(num_install_workers=SimpleNamespace(value=2)))
+    installer.all_pakkges_dir = ""
+
+    installer._install_graph(graph, ScriptedPipeline(graph))  # type: ignore
+
+    assert all(node.is_finished for node in graph)
+    assert RecordingType.overlaps == []
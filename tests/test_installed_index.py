@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from pakk.pakkage.core import PakkageConfig
+from pakk.pakkage.core import PakkageInstallState
+from pakk.pakkage.core import PakkageState
+from pakk.pakkage.installed_index import InstalledStateIndex
+
+
+@pytest.fixture
+def all_pakkages_dir(tmp_path, monkeypatch) -> str:
+    directory = str(tmp_path / "all_pakkages")
+    os.makedirs(directory)
+    index_path = str(tmp_path / "cache" / InstalledStateIndex.FILE_NAME)
+    monkeypatch.setattr(InstalledStateIndex, "get_path", staticmethod(lambda: index_path))
+    monkeypatch.setattr(InstalledStateIndex, "get_all_pakkages_dir", staticmethod(lambda: directory))
+    return directory
+
+
+def create_pakkage(directory: str, pakkage_id: str, version: str = "1.0.0") -> PakkageConfig:
+    """Create the directory of an installed pakkage with its state file."""
+    path = os.path.join(directory, pakkage_id)
+    os.makedirs(os.path.join(path, PakkageState.DIRECTORY_NAME))
+    with open(os.path.join(path, PakkageState.DIRECTORY_NAME, PakkageState.JSON_FILE_NAME), "w") as f:
+        f.write("{}")
+
+    config = PakkageConfig()
+    config.id = pakkage_id
+    config.version = version
+    config.dependencies = {"other": "^1.0.0"}
+    config.local_path = path
+    config.state.install_state = PakkageInstallState.INSTALLED
+    return config
+
+
+def touch_state(config: PakkageConfig):
+    assert config.local_path is not None
+    state_path = os.path.join(config.local_path, PakkageState.DIRECTORY_NAME, PakkageState.JSON_FILE_NAME)
+    mtime = os.stat(state_path).st_mtime_ns + 1_000_000_000
+    os.utime(state_path, ns=(mtime, mtime))
+
+
+def get_ids(configs: list[PakkageConfig] | None) -> list[str]:
+    assert configs is not None
+    return sorted(c.id for c in configs)
+
+
+def test_missing_index(all_pakkages_dir):
+    assert InstalledStateIndex.load() is None
+
+
+def test_saved_index_is_loaded(all_pakkages_dir):
+    a = create_pakkage(all_pakkages_dir, "a")
+    a.state.auto_start_enabled = True
+    b = create_pakkage(all_pakkages_dir, "b", "2.1.0")
+    os.makedirs(os.path.join(all_pakkages_dir, "no_pakkage"))
+
+    InstalledStateIndex.save([a, b], ["no_pakkage"])
+    configs = InstalledStateIndex.load()
+
+    assert get_ids(configs) == ["a", "b"]
+    loaded = {c.id: c for c in configs or []}
+    assert loaded["b"].version == "2.1.0"
+    assert loaded["a"].local_path == a.local_path
+    assert loaded["a"].dependencies == {"other": "^1.0.0"}
+    assert loaded["a"].state.install_state == PakkageInstallState.INSTALLED
+    assert loaded["a"].state.auto_start_enabled
+
+
+@pytest.mark.parametrize("change", ["add", "remove", "rename", "state"])
+def test_changes_make_index_stale(all_pakkages_dir, change: str):
+    a = create_pakkage(all_pakkages_dir, "a")
+    b = create_pakkage(all_pakkages_dir, "b")
+    InstalledStateIndex.save([a, b], [])
+    assert InstalledStateIndex.load() is not None
+
+    if change == "add":
+        create_pakkage(all_pakkages_dir, "c")
+    elif change == "remove":
+        os.remove(os.path.join(b.local_path or "", PakkageState.DIRECTORY_NAME, PakkageState.JSON_FILE_NAME))
+        os.rmdir(os.path.join(b.local_path or "", PakkageState.DIRECTORY_NAME))
+        os.rmdir(b.local_path or "")
+    elif change == "rename":
+        os.rename(b.local_path or "", os.path.join(all_pakkages_dir, "b_renamed"))
+    else:
+        touch_state(a)
+
+    assert InstalledStateIndex.load() is None
+
+
+def test_index_of_other_directory_is_ignored(all_pakkages_dir, monkeypatch):
+    InstalledStateIndex.save([create_pakkage(all_pakkages_dir, "a")], [])
+
+    other = os.path.join(os.path.dirname(all_pakkages_dir), "other")
+    os.makedirs(other)
+    monkeypatch.setattr(InstalledStateIndex, "get_all_pakkages_dir", staticmethod(lambda: other))
+
+    assert InstalledStateIndex.load() is None
+
+
+def test_update_keeps_index_fresh(all_pakkages_dir):
+    a = create_pakkage(all_pakkages_dir, "a")
+    b = create_pakkage(all_pakkages_dir, "b")
+    InstalledStateIndex.save([a, b], [])
+
+    # Install c, change the state of a and uninstall b
+    c = create_pakkage(all_pakkages_dir, "c")
+    a.state.auto_start_enabled = True
+    touch_state(a)
+    os.rename(b.local_path or "", os.path.join(os.path.dirname(all_pakkages_dir), "b"))
+    InstalledStateIndex.update([a, c], removed_ids=["b"])
+
+    configs = InstalledStateIndex.load()
+    assert get_ids(configs) == ["a", "c"]
+    assert next(c for c in configs or [] if c.id == "a").state.auto_start_enabled
+
+
+def test_update_without_index_writes_nothing(all_pakkages_dir):
+    InstalledStateIndex.update([create_pakkage(all_pakkages_dir, "a")])
+
+    assert not os.path.exists(InstalledStateIndex.get_path())
+
+
+def test_clear(all_pakkages_dir):
+    InstalledStateIndex.save([create_pakkage(all_pakkages_dir, "a")], [])
+    InstalledStateIndex.clear()
+
+    assert InstalledStateIndex.load() is None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+from pakk.helper import plugin_manifest
+from pakk.helper.plugin_manifest import PluginManifest
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch) -> str:
+    path = str(tmp_path / "cache" / PluginManifest.FILE_NAME)
+    monkeypatch.setattr(PluginManifest, "get_path", staticmethod(lambda: path))
+    monkeypatch.setattr(PluginManifest, "_data", None)
+    return path
+
+
+@pytest.fixture
+def iter_calls(monkeypatch) -> list:
+    """Count the scans of the python path while still scanning for real."""
+    calls = []
+    iter_modules = plugin_manifest.pkgutil.iter_modules
+
+    def counting_iter_modules(path=None, prefix=""):
+        calls.append(path)
+        return iter_modules(path, prefix)
+
+    monkeypatch.setattr(plugin_manifest.pkgutil, "iter_modules", counting_iter_modules)
+    return calls
+
+
+def create_module(directory: str, name: str):
+    with open(os.path.join(directory, f"{name}.py"), "w") as f:
+        f.write("")
+
+
+def set_mtime(path: str, offset_s: int):
+    mtime = os.stat(path).st_mtime_ns + offset_s * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_pakk_modules_are_scanned_once(manifest_path, iter_calls):
+    modules = PluginManifest.get_pakk_modules()
+
+    assert "pakk" in [name for _, name in modules]
+    assert len(iter_calls) == 1
+
+    # Another process reads the manifest from the file
+    PluginManifest._data = None
+    assert PluginManifest.get_pakk_modules() == modules
+    assert len(iter_calls) == 1
+
+
+def test_changed_python_path_rescans(manifest_path, iter_calls, tmp_path, monkeypatch):
+    PluginManifest.get_pakk_modules()
+
+    monkeypatch.setattr(sys, "path", sys.path + [str(tmp_path)])
+    PluginManifest._data = None
+    PluginManifest.get_pakk_modules()
+
+    assert len(iter_calls) == 2
+
+
+def test_module_names_rescan_on_directory_change(manifest_path, iter_calls, tmp_path):
+    directory = str(tmp_path / "types")
+    os.makedirs(directory)
+    create_module(directory, "type_a")
+
+    assert PluginManifest.get_module_names(directory) == ["type_a"]
+    assert PluginManifest.get_module_names(directory) == ["type_a"]
+    assert len(iter_calls) == 1
+
+    create_module(directory, "type_b")
+    set_mtime(directory, 1)
+
+    assert sorted(PluginManifest.get_module_names(directory)) == ["type_a", "type_b"]
+    assert len(iter_calls) == 2
+
+
+def test_missing_directory_has_no_modules(manifest_path, iter_calls, tmp_path):
+    assert PluginManifest.get_module_names(str(tmp_path / "missing")) == []
+    assert len(iter_calls) == 0
+
+
+def test_manifest_of_other_version_is_ignored(manifest_path, iter_calls):
+    PluginManifest.get_pakk_modules()
+
+    with open(manifest_path, "r") as f:
+        data = json.load(f)
+    data["version"] = PluginManifest.VERSION + 1
+    with open(manifest_path, "w") as f:
+        json.dump(data, f)
+
+    PluginManifest._data = None
+    PluginManifest.get_pakk_modules()
+    assert len(iter_calls) == 2
+
+
+def test_clear(manifest_path, iter_calls):
+    PluginManifest.get_pakk_modules()
+    PluginManifest.clear()
+
+    assert not os.path.exists(manifest_path)
+    PluginManifest.get_pakk_modules()
+    assert len(iter_calls) == 2
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pakk.config.process import Process
+
+
+@pytest.fixture(autouse=True)
+def process(monkeypatch) -> Process:
+    """Run the test with a fresh process environment, the previous singleton is restored afterwards."""
+    instance = Process()
+    monkeypatch.setattr(Process, "instance", instance)
+    return instance
+
+
+def test_env_vars_are_shared_safely_between_workers():
+    errors: list[Exception] = []
+
+    def update(worker: int):
+        try:
+            for i in range(2000):
+                Process.update_env_vars({f"PAKK_TEST_{worker}_{i}": str(i)})
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            for _ in range(200):
+                Process.get_cmd_env_var_setup()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=update, args=(w,)) for w in range(2)]
+    threads += [threading.Thread(target=read) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert Process.get_env_vars()["PAKK_TEST_1_1999"] == "1999"
+
+    # The getter returns a copy, that can be changed by the caller
+    Process.get_env_vars().clear()
+    assert len(Process.get_env_vars()) > 0
+
+
+def test_process_state_is_isolated(process: Process):
+    assert Process.get() is process
+    assert Process.get_env_vars() == {}
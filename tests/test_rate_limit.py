@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pakk.connector.rate_limit import RateLimitQuota
+from pakk.connector.rate_limit import RateLimitScheduler
+
+
+class TransientError(Exception):
+    def __init__(self, delay: float = 0):
+        super().__init__("transient")
+        self.delay = delay
+
+
+def get_delay(e: Exception) -> float | None:
+    return e.delay if isinstance(e, TransientError) else None
+
+
+class FailingCall:
+    """Callable failing with the given errors before returning its number of calls."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self) -> int:
+        self.calls += 1
+        if len(self.errors) > 0:
+            raise self.errors.pop(0)
+        return self.calls
+
+
+@pytest.fixture
+def pauses(monkeypatch) -> list[float]:
+    """Record the requested pauses instead of waiting."""
+    recorded: list[float] = []
+    monkeypatch.setattr(RateLimitScheduler, "pause", lambda self, seconds: recorded.append(seconds))
+    return recorded
+
+
+def test_transient_errors_are_retried_with_backoff(pauses):
+    scheduler = RateLimitScheduler(8, get_delay)
+    call = FailingCall(TransientError(), TransientError(), TransientError(30))
+
+    assert scheduler.execute(call) == 4
+    assert pauses == [RateLimitScheduler.BACKOFF_BASE, RateLimitScheduler.BACKOFF_BASE * 2, 30]
+    # Halved with every error, increased again by the success
+    assert scheduler.concurrency == 2
+
+
+def test_backoff_is_bounded(pauses):
+    scheduler = RateLimitScheduler(1, get_delay)
+    call = FailingCall(*[TransientError() for _ in range(RateLimitScheduler.MAX_RETRIES)])
+
+    scheduler.execute(call)
+    assert max(pauses) <= RateLimitScheduler.BACKOFF_MAX
+
+
+def test_errors_exceeding_the_retries_are_raised(pauses):
+    scheduler = RateLimitScheduler(4, get_delay)
+    call = FailingCall(*[TransientError() for _ in range(RateLimitScheduler.MAX_RETRIES + 1)])
+
+    with pytest.raises(TransientError):
+        scheduler.execute(call)
+    assert call.calls == RateLimitScheduler.MAX_RETRIES + 1
+
+
+def test_other_errors_are_raised_immediately(pauses):
+    scheduler = RateLimitScheduler(4, get_delay)
+    call = FailingCall(ValueError("not transient"))
+
+    with pytest.raises(ValueError):
+        scheduler.execute(call)
+    assert call.calls == 1
+    assert pauses == []
+
+
+def test_exhausted_quota_pauses_workers():
+    quota = RateLimitQuota(remaining=2, limit=5000, reset_in=0.2)
+    scheduler = RateLimitScheduler(4, get_delay, lambda: quota)
+
+    scheduler.execute(lambda: None)
+    assert scheduler.concurrency == 1
+    assert scheduler.description == "quota 2/5000, 1/4 workers"
+
+    start = time.monotonic()
+    scheduler.execute(lambda: None)
+    assert time.monotonic() - start >= 0.15
+
+
+def test_concurrency_is_bounded():
+    scheduler = RateLimitScheduler(3, get_delay)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def call():
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: scheduler.execute(call), range(24)))
+
+    assert 1 < active[1] <= 3
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+import time
+
+import pytest
+
+from pakk.resolver.base import Resolver
+from pakk.resolver.base import ResolverException
+from pakk.resolver.resolver_conflict_driven import ResolverConflictDriven
+from pakk.resolver.resolver_fitting import ResolverFitting
+from tests.catalog import Catalog
+from tests.catalog import create_chain_catalog
+from tests.catalog import create_collection
+from tests.catalog import create_layered_catalog
+from tests.catalog import is_valid
+
+# Resolved nodes after which ResolverFitting is stopped
+MAX_FITTING_NODES = 100_000
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fitting_nodes(monkeypatch) -> list[int]:
+    """Count the nodes resolved by ResolverFitting and stop it after MAX_FITTING_NODES."""
+    counter = [0]
+    resolve_node = ResolverFitting._resolve_node
+
+    def counting_resolve_node(self, pakkage):
+        counter[0] += 1
+        if counter[0] > MAX_FITTING_NODES:
+            raise BudgetExceeded()
+        return resolve_node(self, pakkage)
+
+    monkeypatch.setattr(ResolverFitting, "_resolve_node", counting_resolve_node)
+    return counter
+
+
+def timed_resolve(resolver_cls: type[Resolver], catalog: Catalog) -> tuple[dict[str, str] | None, float]:
+    """Resolve the catalog and return the selected versions (None if the resolver failed) and the elapsed time."""
+    collection = create_collection(catalog, "root")
+    start = time.perf_counter()
+    try:
+        resolver_cls(collection).resolve(quiet=True)
+    except ResolverException:
+        return None, time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    pakkages = collection.pakkages.values()
+    return {p.id: p.versions.target.version for p in pakkages if p.versions.target is not None}, elapsed
+
+
+@pytest.mark.parametrize("satisfiable", [False, True])
+def test_benchmark_conflicting_chain(fitting_nodes: list[int], satisfiable: bool):
+    # ResolverFitting retries every version of every pakkage of the chain for the conflict at its end
+    nodes = []
+    for length in range(6, 12):
+        fitting_nodes[0] = 0
+        selection, fitting_time = timed_resolve(ResolverFitting, create_chain_catalog(length, 2, satisfiable))
+        assert (selection is not None) == satisfiable
+        nodes.append(fitting_nodes[0])
+
+    assert all(n2 >= 2 * n1 for n1, n2 in zip(nodes, nodes[1:])), nodes
+
+    catalog = create_chain_catalog(11, 2, satisfiable)
+    selection, conflict_driven_time = timed_resolve(ResolverConflictDriven, catalog)
+    if satisfiable:
+        assert selection is not None and is_valid(catalog, "root", selection)
+        assert selection["p0"] == "0.1.0"
+    else:
+        assert selection is None
+    assert conflict_driven_time < fitting_time, f"{conflict_driven_time:.3f}s, fitting {fitting_time:.3f}s"
+
+
+def test_benchmark_large_catalog_without_conflicts():
+    # 300 pakkages, every range is fulfilled by every version
+    catalog = create_layered_catalog(10, 30, random.Random(0), ["*", ">=1.0.0"])
+
+    fitting_selection, fitting_time = timed_resolve(ResolverFitting, catalog)
+    selection, conflict_driven_time = timed_resolve(ResolverConflictDriven, catalog)
+
+    assert fitting_selection is not None and is_valid(catalog, "root", fitting_selection)
+    assert selection is not None and is_valid(catalog, "root", selection)
+    assert conflict_driven_time < fitting_time, f"{conflict_driven_time:.3f}s, fitting {fitting_time:.3f}s"
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_benchmark_large_catalog_with_conflicts(seed: int):
+    # 300 pakkages, the newest versions conflict, but selecting 2.0.0 everywhere fulfills every range
+    catalog = create_layered_catalog(10, 30, random.Random(seed), ["*", ">=2.0.0", "<3.0.0"])
+
+    selection, conflict_driven_time = timed_resolve(ResolverConflictDriven, catalog)
+    assert selection is not None and is_valid(catalog, "root", selection)
+
+    start = time.perf_counter()
+    with pytest.raises(BudgetExceeded):
+        timed_resolve(ResolverFitting, catalog)
+    fitting_time = time.perf_counter() - start
+    assert conflict_driven_time < fitting_time, f"{conflict_driven_time:.3f}s, fitting stopped at {fitting_time:.3f}s"
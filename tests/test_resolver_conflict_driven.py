@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pytest
+
+from pakk.resolver.base import ResolverException
+from pakk.resolver.resolver_conflict_driven import ResolverConflictDriven
+from tests.catalog import Catalog
+from tests.catalog import create_collection
+from tests.catalog import is_valid
+
+
+def resolve(catalog: Catalog, root: str) -> dict[str, str] | None:
+    """Resolve the catalog and return the selected versions or None if the resolver failed."""
+    collection = create_collection(catalog, root)
+    try:
+        ResolverConflictDriven(collection).resolve(quiet=True)
+    except ResolverException:
+        return None
+    return {p.id: p.versions.target.version for p in collection.pakkages.values() if p.versions.target is not None}
+
+
+def is_satisfiable(catalog: Catalog, root: str) -> bool:
+    """Brute force: try every combination of a version or absence for every pakkage."""
+    ids = list(catalog.keys())
+    options = [[None, *catalog[pakkage_id].keys()] for pakkage_id in ids]
+    for combination in itertools.product(*options):
+        selection = {pakkage_id: v for pakkage_id, v in zip(ids, combination) if v is not None}
+        if is_valid(catalog, root, selection):
+            return True
+    return False
+
+
+def create_random_catalog(rnd: random.Random) -> Catalog:
+    ids = ["root", "a", "b", "c", "d", "e"]
+    ranges = ["*", "1", "2", "3", ">=2.0.0", "<3.0.0", "^1.0.0"]
+    catalog: Catalog = {}
+    for i, pakkage_id in enumerate(ids):
+        num_versions = 1 if pakkage_id == "root" else rnd.randint(1, 3)
+        catalog[pakkage_id] = {}
+        for major in range(1, num_versions + 1):
+            # Dependencies only on later pakkages, cyclic dependencies are not supported
+            candidates = ids[i + 1 :]
+            dependencies = rnd.sample(candidates, rnd.randint(0, min(3, len(candidates))))
+            catalog[pakkage_id][f"{major}.0.0"] = {d: rnd.choice(ranges) for d in dependencies}
+    return catalog
+
+
+def test_conflict_of_dependency_requires_dependent():
+    # Only x conflicts with c@2, a learned incompatibility must not exclude c@2 on its own
+    catalog: Catalog = {
+        "r": {"1.0.0": {"a": "*", "c": "*"}},
+        "a": {"2.0.0": {"x": "*"}, "1.0.0": {}},
+        "c": {"2.0.0": {}},
+        "x": {"1.0.0": {"c": "1"}},
+    }
+    selection = resolve(catalog, "r")
+    assert selection == {"r": "1.0.0", "a": "1.0.0", "c": "2.0.0"}
+
+
+def test_unresolvable_catalog_fails():
+    catalog: Catalog = {
+        "r": {"1.0.0": {"a": "*", "c": "2"}},
+        "a": {"1.0.0": {"c": "1"}},
+        "c": {"1.0.0": {}, "2.0.0": {}},
+    }
+    assert resolve(catalog, "r") is None
+
+
+@pytest.mark.parametrize("seed", range(500))
+def test_matches_brute_force(seed: int):
+    catalog = create_random_catalog(random.Random(seed))
+    selection = resolve(catalog, "root")
+
+    assert (selection is not None) == is_satisfiable(catalog, "root")
+    if selection is not None:
+        assert is_valid(catalog, "root", selection)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+from pakk.resolver.base import ResolverException
+from pakk.resolver.resolver_fitting import ResolverFitting
+from tests.catalog import Catalog
+from tests.catalog import create_collection
+
+
+def test_conflict_message_uses_requirements_at_conflict_time():
+    # Both versions of a conflict with the root on c, the target of a is reset while backtracking
+    catalog: Catalog = {
+        "r": {"1.0.0": {"a": "*", "c": "1"}},
+        "a": {"2.0.0": {"c": "2"}, "1.0.0": {"c": "3"}},
+        "c": {"1.0.0": {}, "2.0.0": {}, "3.0.0": {}},
+    }
+    collection = create_collection(catalog, "r")
+
+    with pytest.raises(ResolverException) as info:
+        ResolverFitting(collection).resolve(quiet=True)
+
+    e = info.value
+    assert e.conflict is not None
+    for conflict in e.conflict.get_chain():
+        for parent_id, version, version_range in conflict.requirements:
+            assert version is not None
+            assert catalog[parent_id][version][conflict.pakkage.id] == version_range
+
+    for parent_id, version, version_range in e.requirements:
+        assert f"Dependency of {parent_id} (Target version: {version}): {version_range}" in str(e)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from pakk.connector.archive_generic import GenericArchiveHelper
+from pakk.pakkage.core import PakkageConfig
+from pakk.types.type_ros2 import TypeRos2
+
+
+def create_package(path: str, name: str):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "package.xml"), "w") as f:
+        f.write(f"<package format='3'><name>{name}</name></package>")
+
+
+def create_ros_type(path: str) -> TypeRos2:
+    t = TypeRos2.__new__(TypeRos2)
+    t.pakkage_version = SimpleNamespace(local_path=path)  # type: ignore
+    return t
+
+
+@pytest.mark.parametrize("marker", TypeRos2.IGNORE_MARKERS)
+def test_ignored_directories_are_skipped(tmp_path, marker: str):
+    create_package(str(tmp_path / "src" / "driver"), "driver")
+    create_package(str(tmp_path / "src" / "driver" / "test" / "nested"), "nested")
+    create_package(str(tmp_path / "src" / "ignored" / "pkg"), "ignored_pkg")
+    (tmp_path / "src" / "ignored" / marker).write_text("")
+    create_package(str(tmp_path / ".hidden" / "pkg"), "hidden_pkg")
+
+    assert TypeRos2.find_ros_package_names(str(tmp_path)) == ["driver"]
+
+
+def test_names_are_cached_for_extracted_archives(tmp_path, monkeypatch):
+    create_package(str(tmp_path / "src" / "driver"), "driver")
+    pakk_dir = tmp_path / PakkageConfig.PAKK_DIRECTORY_NAME
+    pakk_dir.mkdir()
+    (pakk_dir / GenericArchiveHelper.COMMIT_FILE_NAME).write_text("0123abc")
+
+    assert TypeRos2.get_checkout_key(str(tmp_path)) == "0123abc"
+    assert create_ros_type(str(tmp_path)).get_ros_package_names() == ["driver"]
+
+    # The second call is answered by the cache without scanning the directories
+    monkeypatch.setattr(TypeRos2, "find_ros_package_names", staticmethod(lambda path: pytest.fail("Scanned again")))
+    assert create_ros_type(str(tmp_path)).get_ros_package_names() == ["driver"]
+
+
+def test_git_checkout_key(tmp_path):
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads" / "main").write_text("fedcba\n")
+
+    assert TypeRos2.get_checkout_key(str(tmp_path)) == "fedcba"
+    assert TypeRos2.get_checkout_key(str(tmp_path / "missing")) is None
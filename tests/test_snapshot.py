@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from pakk.actions import install as install_action
+from pakk.resolver.snapshot import ResolutionSnapshot
+from tests.catalog import Catalog
+from tests.catalog import create_collection
+
+CATALOG: Catalog = {
+    "r": {"1.0.0": {"a": "^1.0.0"}},
+    "a": {"1.0.0": {}, "1.1.0": {"b": "*"}},
+    "b": {"1.0.0": {}},
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = str(tmp_path / ResolutionSnapshot.FILE_NAME)
+    monkeypatch.setattr(ResolutionSnapshot, "get_path", staticmethod(lambda: path))
+    return path
+
+
+def get_key(catalog: Catalog, names: list[str] = ["r"]) -> str:
+    return ResolutionSnapshot.compute_key(create_collection(catalog, "r"), names)
+
+
+def test_key_is_stable():
+    assert get_key(CATALOG) == get_key(CATALOG)
+
+
+def test_key_changes_with_request_and_catalog():
+    key = get_key(CATALOG)
+    assert get_key(CATALOG, ["r", "b"]) != key
+
+    with_new_version = {**CATALOG, "b": {"1.0.0": {}, "2.0.0": {}}}
+    assert get_key(with_new_version) != key
+
+
+def test_key_changes_with_edited_dependencies():
+    # The dependencies of an existing release are edited without a new version
+    edited = {**CATALOG, "a": {"1.0.0": {}, "1.1.0": {"b": ">=2.0.0"}}}
+    assert get_key(edited) != get_key(CATALOG)
+
+
+def test_save_and_load(snapshot_path):
+    assert ResolutionSnapshot.load() is None
+
+    key = get_key(CATALOG)
+    ResolutionSnapshot.save(key)
+    assert ResolutionSnapshot.load() == key
+    assert ResolutionSnapshot.is_unchanged(create_collection(CATALOG, "r"), ["r"])
+
+    ResolutionSnapshot.clear()
+    assert ResolutionSnapshot.load() is None
+
+
+def test_unchanged_install_returns_the_pakkages(snapshot_path, monkeypatch):
+    collection = create_collection(CATALOG, "r")
+    ResolutionSnapshot.save(get_key(CATALOG))
+
+    monkeypatch.setattr(install_action, "PakkLock", lambda operation: SimpleNamespace(access=True))
+    monkeypatch.setattr(install_action.TypeBase, "initialize", staticmethod(lambda: None))
+    monkeypatch.setattr(install_action.PakkLoader, "get_connector_instances", staticmethod(lambda: []))
+    monkeypatch.setattr(install_action, "PakkageCollection", lambda: collection)
+    monkeypatch.setattr(collection, "discover", lambda connectors, names: collection)
+    monkeypatch.setattr(install_action, "_get_resolver", lambda pakkages: pytest.fail("Resolved again"))
+
+    # Both the skipped and the full installation return the pakkages
+    assert install_action.install(["r"]) is collection.pakkages
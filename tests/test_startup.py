@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pakk import ENVS
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bound of the startup time of a local command, far above the ~0.1s measured locally
+MAX_STARTUP_SECONDS = 3.0
+
+# Runs a pakk command without the setup routines, since they require sudo
+SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+
+from pakk.setup.checker import PakkSetupChecker
+
+PakkSetupChecker.require_setups = staticmethod(lambda setups, run_if_not_up_to_date=True: None)
+
+from pakk.cli import cli
+
+cli(sys.argv[1:], standalone_mode=False)
+elapsed = time.perf_counter() - start
+modules = sorted({name.split(".")[0] for name in sys.modules} & {"github", "gitlab", "requests"})
+print(json.dumps({"elapsed": elapsed, "modules": modules}), file=sys.stderr)
+"""
+
+
+def run_pakk(tmp_path, *args: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "PYTHONPATH": ROOT_DIR,
+            "HOME": str(tmp_path),
+            ENVS.CONFIG_DIR: str(tmp_path / "config"),
+        }
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *args],
+        env=env,
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("command", ["status", "source"])
+def test_local_commands_start_without_remote_clients(tmp_path, command: str):
+    result = run_pakk(tmp_path, command)
+
+    assert result["modules"] == []
+    assert result["elapsed"] < MAX_STARTUP_SECONDS
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import functools
+import random
+
+import nodesemver
+import pytest
+
+from pakk.resolver.version_index import VersionIndex
+
+VERSIONS = [
+    "1.0.0",
+    "1.0.0-alpha",
+    "1.0.0-alpha.1",
+    "1.0.0-alpha.beta",
+    "1.0.0-beta",
+    "1.0.0-beta.2",
+    "1.0.0-beta.11",
+    "1.0.0-rc.1",
+    "0.9.12",
+    "1.2.3",
+    "1.10.0",
+    "2.0.0",
+    "v2.1.0",
+]
+
+RANGES = ["*", "^1.0.0", "~1.2.0", ">=1.0.0 <2.0.0", "1.x", "^2.0.0", "<1.0.0", "1.0.0 - 1.2.3", ">0.9.12 || 2.x"]
+
+
+def test_sort_follows_semver_precedence():
+    shuffled = list(VERSIONS)
+    random.Random(0).shuffle(shuffled)
+
+    expected = sorted(shuffled, key=functools.cmp_to_key(lambda a, b: nodesemver.compare(a, b, loose=True)))
+
+    assert VersionIndex.sort(shuffled) == expected
+    assert VersionIndex.sort(shuffled, reverse=True) == list(reversed(expected))
+    assert VersionIndex.sort(VERSIONS)[:8] == [
+        "0.9.12",
+        "1.0.0-alpha",
+        "1.0.0-alpha.1",
+        "1.0.0-alpha.beta",
+        "1.0.0-beta",
+        "1.0.0-beta.2",
+        "1.0.0-beta.11",
+        "1.0.0-rc.1",
+    ]
+
+
+@pytest.mark.parametrize("range_str", RANGES)
+def test_filter_matches_nodesemver(range_str: str):
+    expected = [v for v in VERSIONS if nodesemver.satisfies(v, range_str, loose=True)]
+    assert VersionIndex.filter(VERSIONS, [range_str]) == expected
+
+
+def test_fits_requires_all_ranges():
+    assert VersionIndex.fits("1.2.5", ["^1.0.0", "~1.2.0"])
+    assert not VersionIndex.fits("1.10.0", ["^1.0.0", "~1.2.0"])
+    assert VersionIndex.fits("1.10.0", [])
+
+
+def test_gte():
+    assert VersionIndex.gte("1.10.0", "1.2.3")
+    assert VersionIndex.gte("1.0.0", "1.0.0")
+    assert not VersionIndex.gte("1.0.0-rc.1", "1.0.0")
+
+
+def test_invalid_version_raises():
+    with pytest.raises(ValueError):
+        VersionIndex.get_key("not a version")
+
+
+def test_repeated_operations_use_the_cache():
+    VersionIndex.get_key.cache_clear()
+    VersionIndex.get_range.cache_clear()
+    VersionIndex.test.cache_clear()
+
+    for _ in range(3):
+        VersionIndex.sort(VERSIONS)
+        for range_str in RANGES:
+            VersionIndex.filter(VERSIONS, [range_str])
+
+    assert VersionIndex.get_key.cache_info().misses == len(VERSIONS)
+    assert VersionIndex.get_range.cache_info().misses == len(RANGES)
+    assert VersionIndex.test.cache_info().misses == len(VERSIONS) * len(RANGES)
+    assert VersionIndex.test.cache_info().hits == 2 * len(VERSIONS) * len(RANGES)
+    # A range is compiled once, no matter how many versions are tested against it
+    assert VersionIndex.get_range.cache_info().currsize == len(RANGES)